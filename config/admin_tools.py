@@ -0,0 +1,92 @@
+import json
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from config.cache import get_versions, version_key
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор админки, который на больших таблицах PostgreSQL не считает COUNT(*).
+
+    Без фильтров число строк берется из статистики таблицы (pg_class.reltuples),
+    с фильтрами — из оценки планировщика EXPLAIN. Если оценка меньше
+    ADMIN_ESTIMATED_COUNT_THRESHOLD, выполняется точный COUNT(*).
+    """
+
+    @cached_property
+    def count(self):
+        estimate = self.get_estimate()
+        if (
+            estimate is not None
+            and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD
+        ):
+            return estimate
+        return super().count
+
+    def get_estimate(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+                # -1 — таблица еще не анализировалась
+                return row[0] if row and row[0] >= 0 else None
+
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return plan[0]["Plan"]["Plan Rows"]
+
+
+class CachedChoicesListFilter(admin.SimpleListFilter):
+    """
+    Фильтр по значениям поля, список которых кэшируется на ADMIN_FILTER_CACHE_TIMEOUT.
+
+    Обычный list_filter выполняет SELECT DISTINCT по всей таблице при каждом
+    открытии списка. Поле задается атрибутом field_name. Если задан
+    cache_namespace, в ключ входит версия этого пространства из config.cache:
+    сигналы модели меняют ее, когда могли измениться значения поля.
+    """
+
+    field_name = None
+    cache_namespace = None
+
+    def __init__(self, request, params, model, model_admin):
+        self.parameter_name = self.parameter_name or self.field_name
+        self.model = model
+        super().__init__(request, params, model, model_admin)
+
+    def lookups(self, request, model_admin):
+        key = f"admin-choices:{self.model._meta.label_lower}:{self.field_name}"
+        if self.cache_namespace is not None:
+            key = f"{key}:{get_versions(version_key(self.cache_namespace))[0]}"
+        values = cache.get(key)
+        if values is None:
+            values = list(
+                self.model._default_manager.filter(**{f"{self.field_name}__gt": ""})
+                .order_by(self.field_name)
+                .values_list(self.field_name, flat=True)
+                .distinct()
+            )
+            cache.set(key, values, settings.ADMIN_FILTER_CACHE_TIMEOUT)
+        return [(value, value) for value in values]
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        return queryset.filter(**{self.field_name: self.value()})
@@ -0,0 +1,234 @@
+import base64
+import hashlib
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.relations import ManyRelatedField
+from rest_framework.utils.urls import replace_query_param
+
+from config.cache import RESPONSE_KEY_PREFIX, aget_version, version_key
+from config.db_routers import ais_pinned, use_primary, use_replica
+from config.pagination import keyset_after
+from config.renderers import OrjsonRenderer
+from config.sparse_fields import FIELDS_QUERY_PARAM
+from config.throttling import acheck_throttles
+from config.values_list import ValuesListMixin
+from users.authentication import AsyncJWTAuthentication
+
+
+class AsyncReadOnlyView(View):
+    """
+    Асинхронные list и retrieve для ASGI: запросы к БД через aiterator и aget.
+
+    Поля ответа берутся из serializer_class, значения читаются через .values()
+    и преобразуются так же, как в ValuesListMixin. Список выводится по курсору
+    (ordering), поддерживаются ?fields=, ?page_size= и точные фильтры
+    filter_fields. Ответы кэшируются по версии таблицы или объекта, как ответы
+    синхронных вьюсетов.
+    """
+
+    model = None
+    serializer_class = None
+    ordering = ("id",)
+    page_size = 100
+    max_page_size = 1000
+    filter_fields = ()
+    cache_namespace = None
+    authentication = AsyncJWTAuthentication()
+    http_method_names = ["get", "head", "options"]
+
+    async def get(self, request, pk=None):
+        try:
+            auth = await self.authentication.aauthenticate(request)
+            if auth is None:
+                raise exceptions.NotAuthenticated
+            request.user = auth[0]
+            self.action = "list" if pk is None else "retrieve"
+            await acheck_throttles(request, self)
+            if not await ais_pinned(request, request.user):
+                use_replica()
+            data = await self.cached(request, pk)
+        except exceptions.APIException as error:
+            response = self.render_exception(error)
+            if isinstance(
+                error, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+            ):
+                response["WWW-Authenticate"] = self.authentication.authenticate_header(
+                    request
+                )
+            return response
+        return self.render(data)
+
+    @classmethod
+    def render_exception(cls, error):
+        response = cls.render(error.detail, error.status_code)
+        if getattr(error, "wait", None):
+            response["Retry-After"] = "%d" % error.wait
+        return response
+
+    @staticmethod
+    def render(data, status=200):
+        if isinstance(data, str):
+            data = {"detail": data}
+        return HttpResponse(
+            OrjsonRenderer().render(data),
+            status=status,
+            content_type="application/json",
+        )
+
+    async def cached(self, request, pk):
+        handler = self.list if pk is None else self.retrieve
+        if not settings.API_CACHE_TIMEOUT or self.cache_namespace is None:
+            return await handler(request, pk)
+
+        version = await aget_version(version_key(self.cache_namespace, pk))
+        scope = "staff" if request.user.is_staff else "user"
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        key = (
+            f"{RESPONSE_KEY_PREFIX}:{self.cache_namespace}:async:{scope}:"
+            f"{version}:{path}"
+        )
+        data = await cache.aget(key)
+        if data is None:
+            # в кэш попадают только данные основной БД, см. CachedResponseMixin
+            use_primary()
+            data = await handler(request, pk)
+            await cache.aset(key, data, settings.API_CACHE_TIMEOUT)
+        return data
+
+    def get_fields(self, request):
+        fields = {
+            name: field
+            for name, field in self.serializer_class().fields.items()
+            if not field.write_only
+        }
+        requested = request.GET.get(FIELDS_QUERY_PARAM)
+        if requested:
+            requested = {name.strip() for name in requested.split(",")}
+            fields = {
+                name: field for name, field in fields.items() if name in requested
+            }
+        return fields
+
+    def get_queryset(self, fields):
+        many_to_many = [
+            name
+            for name, field in fields.items()
+            if isinstance(field, ManyRelatedField)
+        ]
+        columns = {
+            field.source for name, field in fields.items() if name not in many_to_many
+        }
+        columns.update(self.ordering, (self.model._meta.pk.attname,))
+        return self.model._default_manager.values(*columns), many_to_many
+
+    async def list(self, request, pk=None):
+        fields = self.get_fields(request)
+        queryset, many_to_many = self.get_queryset(fields)
+        queryset = self.filter_queryset(request, queryset)
+        page_size = self.get_page_size(request)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        rows = [
+            row
+            async for row in queryset.order_by(*self.ordering)[
+                : page_size + 1
+            ].aiterator()
+        ]
+        next_link = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_link = replace_query_param(
+                request.build_absolute_uri(),
+                "cursor",
+                self.encode_cursor([rows[-1][name] for name in self.ordering]),
+            )
+        await self.attach_many_to_many(rows, many_to_many)
+        return {
+            "next": next_link,
+            "previous": None,
+            "results": ValuesListMixin.represent_rows(rows, fields),
+        }
+
+    async def retrieve(self, request, pk):
+        fields = self.get_fields(request)
+        queryset, many_to_many = self.get_queryset(fields)
+        try:
+            row = await queryset.aget(pk=pk)
+        except self.model.DoesNotExist:
+            raise exceptions.NotFound
+        await self.attach_many_to_many([row], many_to_many)
+        return ValuesListMixin.represent_rows([row], fields)[0]
+
+    def filter_queryset(self, request, queryset):
+        for name in self.filter_fields:
+            value = request.GET.get(name)
+            if value in (None, ""):
+                continue
+            try:
+                value = self.model._meta.get_field(name).to_python(value)
+            except DjangoValidationError as error:
+                raise exceptions.ValidationError({name: error.messages})
+            queryset = queryset.filter(**{name: value})
+        return queryset
+
+    def after(self, position):
+        """Условие «строка после position» в порядке ordering."""
+
+        return keyset_after(self.ordering, position)
+
+    def get_page_size(self, request):
+        page_size = request.GET.get("page_size")
+        if page_size and page_size.isdigit() and int(page_size) > 0:
+            return min(int(page_size), self.max_page_size)
+        return self.page_size
+
+    def decode_cursor(self, request):
+        cursor = request.GET.get("cursor")
+        if not cursor:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return [
+                self.model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.ordering, values, strict=True)
+            ]
+        except (TypeError, ValueError, DjangoValidationError):
+            raise exceptions.NotFound("Неверный курсор.")
+
+    @staticmethod
+    def encode_cursor(values):
+        data = json.dumps([str(value) for value in values])
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    async def attach_many_to_many(self, rows, many_to_many):
+        """Собирает id связей для всей страницы одним запросом на каждое поле."""
+
+        pk_name = self.model._meta.pk.attname
+        pks = [row[pk_name] for row in rows]
+        for name in many_to_many:
+            source_field, target_field = ValuesListMixin.get_through_fields(
+                self.model, name
+            )
+            through = self.model._meta.get_field(name).remote_field.through
+            related = defaultdict(list)
+            # values(), а не values_list(): итератор values_list выполняет запрос
+            # при создании, то есть синхронно в цикле событий
+            async for link in (
+                through.objects.filter(**{f"{source_field}__in": pks})
+                .order_by(source_field, target_field)
+                .values(source_field, target_field)
+                .aiterator()
+            ):
+                related[link[source_field]].append(link[target_field])
+            for row in rows:
+                row[f"{name}_ids"] = related[row[pk_name]]
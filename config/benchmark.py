@@ -0,0 +1,315 @@
+import asyncio
+import json
+import math
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.utils import ConnectionHandler
+from django.test.utils import CaptureQueriesContext
+from rest_framework.parsers import JSONParser
+
+from config.parsers import OrjsonParser
+from config.renderers import OrjsonRenderer, StdlibJSONRenderer
+
+BENCHMARK_EMAIL = "benchmark@email.com"
+BENCHMARK_PASSWORD = "benchmark"
+
+
+def percentile(values, percent):
+    """Возвращает перцентиль по методу ближайшего ранга."""
+
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def measure(request, iterations=50, warmup=5, expected_status=200):
+    """
+    Измеряет задержку, число SQL-запросов и пиковую память одного сценария.
+
+    request — функция без аргументов, которая выполняет запрос и возвращает ответ.
+    Общий кэш не очищается: в Redis он хранит версии, сессии и отметки реплик
+    других процессов. Кэш ответов отключает вызывающий код, см. run_benchmarks.
+    Память измеряется отдельным прогоном, так как tracemalloc замедляет код.
+    """
+
+    def call():
+        response = request()
+        if response.status_code != expected_status:
+            raise AssertionError(
+                f"Ожидался статус {expected_status}, получен {response.status_code}"
+            )
+        return response
+
+    for _ in range(warmup):
+        call()
+
+    latencies, queries = [], []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            call()
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(len(context.captured_queries))
+
+    tracemalloc.start()
+    try:
+        call()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "queries": max(queries),
+        "peak_memory_kb": round(peak_memory / 1024, 1),
+    }
+
+
+def compare_with_baseline(results, baseline, tolerance=0.25):
+    """
+    Сравнивает результаты с сохраненными и возвращает список регрессий.
+
+    Число запросов не должно расти совсем, задержка и память — больше чем
+    на долю tolerance от базового значения. Сценарий без базового значения
+    тоже считается регрессией, чтобы проверка не проходила незаметно.
+    """
+
+    regressions = []
+    for name, metrics in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            regressions.append(f"{name}: нет базового значения")
+            continue
+        if metrics["queries"] > expected["queries"]:
+            regressions.append(
+                f"{name}: запросов {metrics['queries']}, было {expected['queries']}"
+            )
+        for metric in ("p50_ms", "p99_ms", "peak_memory_kb"):
+            limit = expected[metric] * (1 + tolerance)
+            if metrics[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {metrics[metric]}, было {expected[metric]}"
+                )
+    return regressions
+
+
+def get_baseline_path(path):
+    """Возвращает путь к файлу базовых значений; относительный — от корня проекта."""
+
+    path = Path(path)
+    return path if path.is_absolute() else settings.BASE_DIR / path
+
+
+def load_baseline(path, label):
+    """
+    Читает базовые значения для конфигурации label из JSON-файла.
+
+    Возвращает None, если файла или значений для label нет.
+    """
+
+    try:
+        with open(get_baseline_path(path), encoding="utf-8") as file:
+            return json.load(file).get(label)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, label, results):
+    """Сохраняет результаты как базовые для конфигурации label."""
+
+    path = get_baseline_path(path)
+    try:
+        with open(path, encoding="utf-8") as file:
+            baselines = json.load(file)
+    except FileNotFoundError:
+        baselines = {}
+    baselines[label] = results
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(baselines, file, ensure_ascii=False, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def compare_renderers(data, iterations=20):
+    """Замеряет рендеринг и разбор data стандартным JSON и orjson, p50 в мс."""
+
+    pairs = {
+        "stdlib": (StdlibJSONRenderer(), JSONParser()),
+        "orjson": (OrjsonRenderer(), OrjsonParser()),
+    }
+    results = {}
+    for name, (renderer, parser) in pairs.items():
+        render_times, parse_times = [], []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            content = renderer.render(data)
+            render_times.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            parser.parse(BytesIO(content))
+            parse_times.append((time.perf_counter() - started) * 1000)
+        results[name] = {
+            "render_ms": round(statistics.median(render_times), 3),
+            "parse_ms": round(statistics.median(parse_times), 3),
+            "bytes": len(content),
+        }
+    return results
+
+
+async def _fetch(reader, writer, request):
+    writer.write(request)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    headers = {}
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get(b"transfer-encoding") == b"chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).strip(), 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    else:
+        await reader.readexactly(int(headers.get(b"content-length", 0)))
+    return status, headers.get(b"connection") == b"close"
+
+
+async def run_load(url, concurrency=100, requests=10000, headers=None):
+    """
+    Выполняет requests GET-запросов к url из concurrency соединений keep-alive.
+
+    Возвращает число запросов в секунду, p50/p99 задержки и число ошибок.
+    Клиент написан на asyncio без зависимостей, чтобы сам не ограничивал замер.
+    """
+
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    lines = [f"GET {path} HTTP/1.1", f"Host: {parts.netloc}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    request = ("\r\n".join(lines) + "\r\n\r\n").encode()
+    port = parts.port or 80
+    remaining = iter(range(requests))
+    latencies, errors = [], 0
+
+    async def client():
+        nonlocal errors
+        connection = None
+        for _ in remaining:
+            try:
+                if connection is None:
+                    connection = await asyncio.open_connection(parts.hostname, port)
+                started = time.perf_counter()
+                status, closed = await _fetch(*connection, request)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if status != 200:
+                    errors += 1
+            except (OSError, ValueError, asyncio.IncompleteReadError):
+                errors += 1
+                closed = True
+            if closed and connection is not None:
+                connection[1].close()
+                connection = None
+        if connection is not None:
+            connection[1].close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 3) if latencies else None,
+        "errors": errors,
+    }
+
+
+def process_tree_rss_kb(pid):
+    """Возвращает суммарную резидентную память процесса и его потомков (Linux)."""
+
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        proc = Path("/proc") / str(current)
+        try:
+            for line in (proc / "status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1])
+            for task in (proc / "task").iterdir():
+                pending.extend(
+                    int(child) for child in (task / "children").read_text().split()
+                )
+        except FileNotFoundError:
+            continue
+    return total
+
+
+def compare_connection_modes(threads=50, iterations=100, pool_size=10):
+    """
+    Сравнивает задержку запросов при новых, постоянных и пуловых соединениях.
+
+    Каждый поток повторяет жизненный цикл HTTP-запроса: проверка соединения,
+    SELECT 1, закрытие или возврат соединения, как это делают сигналы
+    request_started и request_finished. Возвращает p50/p99 в мс для режимов
+    new (CONN_MAX_AGE=0), persistent и pool (только psycopg 3 и PostgreSQL).
+    """
+
+    base = dict(connections["default"].settings_dict)
+    modes = {
+        "new": {"CONN_MAX_AGE": 0},
+        "persistent": {"CONN_MAX_AGE": 600},
+    }
+    if connection.vendor == "postgresql":
+        modes["pool"] = {
+            "CONN_MAX_AGE": 0,
+            "OPTIONS": {
+                **base.get("OPTIONS", {}),
+                "pool": {"min_size": pool_size, "max_size": pool_size},
+            },
+        }
+
+    results = {}
+    for mode, overrides in modes.items():
+        alias = f"benchmark_{mode}"
+        handler = ConnectionHandler({"default": base, alias: {**base, **overrides}})
+
+        def worker(_):
+            database = handler[alias]
+            latencies = []
+            try:
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    database.close_if_unusable_or_obsolete()
+                    with database.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                    database.close_if_unusable_or_obsolete()
+                    latencies.append((time.perf_counter() - started) * 1000)
+            finally:
+                database.close()
+            return latencies
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            latencies = [
+                value
+                for values in executor.map(worker, range(threads))
+                for value in values
+            ]
+        if mode == "pool":
+            handler[alias].close_pool()
+        results[mode] = {
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+        }
+    return results
@@ -0,0 +1,220 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from config.db_routers import read_from_replica, use_primary
+
+VERSION_KEY_PREFIX = "api-version"
+RESPONSE_KEY_PREFIX = "api-response"
+
+
+def version_key(namespace, pk=None):
+    """Возвращает ключ версии таблицы или, если передан pk, версии отдельного объекта."""
+
+    if pk is None:
+        return f"{VERSION_KEY_PREFIX}:{namespace}"
+    return f"{VERSION_KEY_PREFIX}:{namespace}:{pk}"
+
+
+def get_versions(*keys):
+    """
+    Возвращает текущие версии по ключам, создавая отсутствующие.
+
+    Версии - случайные токены, а не счетчики, чтобы вытесненная из кэша версия не
+    могла совпасть со старой и вернуть устаревший ответ.
+    """
+
+    versions = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+async def aget_version(key):
+    """Асинхронный вариант get_versions для одного ключа."""
+
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, uuid.uuid4().hex, timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_versions(namespace, pks=()):
+    """
+    Инвалидирует закэшированные ответы таблицы и перечисленных объектов.
+
+    Версии меняются сразу и еще раз после коммита, чтобы в кэш не попали ответы,
+    прочитанные параллельными запросами до завершения транзакции.
+    """
+
+    keys = [version_key(namespace)] + [version_key(namespace, pk) for pk in pks]
+
+    def bump():
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+class ResourceVersionMixin:
+    """
+    Возвращает версию ресурса, который отдает текущее действие вьюсета.
+
+    Ответ детального просмотра зависит от версии объекта, остальные действия - от
+    версии всей таблицы. Версии меняются обработчиками сигналов моделей.
+    """
+
+    cache_namespace = None
+    object_cache_actions = ("retrieve",)
+
+    def get_resource_version(self):
+        if self.action in self.object_cache_actions:
+            lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+            key = version_key(self.cache_namespace, lookup)
+        else:
+            key = version_key(self.cache_namespace)
+        return get_versions(key)[0]
+
+    def get_cache_scope(self, request):
+        """Возвращает область кэша: ответы для сотрудников и остальных хранятся отдельно."""
+
+        return "staff" if request.user.is_staff else "user"
+
+
+class CachedResponseMixin(ResourceVersionMixin):
+    """
+    Кэширует ответы чтения вьюсета по параметрам запроса и области пользователя.
+
+    При промахе кэша ответ читается с основной БД: реплика может отставать, и ее
+    данные оказались бы в кэше под уже новой версией ресурса.
+    """
+
+    def get_response_cache_key(self, request):
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        return (
+            f"{RESPONSE_KEY_PREFIX}:{self.cache_namespace}:"
+            f"{self.get_cache_scope(request)}:{self.get_resource_version()}:{path}"
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        """Возвращает данные из кэша или вызывает handler и кэширует успешный ответ."""
+
+        if not settings.API_CACHE_TIMEOUT:
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        use_primary()
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+
+class ConditionalGetMixin(ResourceVersionMixin):
+    """
+    Добавляет ETag и Last-Modified к ответам чтения и отвечает 304 без рендеринга.
+
+    ETag строится из версии ресурса, параметров запроса и формата ответа, поэтому
+    проверка If-None-Match не обращается к БД. Last-Modified отдается только для
+    объектов (last_modified_actions) и берется из last_modified_field: у списка
+    максимум даты изменения не меняется при удалении строк и читается с основной
+    БД. Ответ, прочитанный с реплики, может быть старше версии ресурса и
+    заголовков не получает. Отключается настройкой API_CONDITIONAL_GET.
+    """
+
+    last_modified_field = "updated_at"
+    last_modified_actions = ("retrieve",)
+
+    def get_etag(self, request):
+        value = ":".join(
+            (
+                self.get_resource_version(),
+                self.get_cache_scope(request),
+                request.accepted_media_type or "",
+                request.get_full_path(),
+            )
+        )
+        return f'"{hashlib.md5(value.encode()).hexdigest()}"'
+
+    def get_last_modified(self, request):
+        """Возвращает дату последнего изменения, кэшируя ее до смены версии ресурса."""
+
+        if self.action not in self.last_modified_actions:
+            return None
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        key = (
+            f"{RESPONSE_KEY_PREFIX}:{self.cache_namespace}:last-modified:"
+            f"{self.get_resource_version()}:{path}"
+        )
+        last_modified = cache.get(key)
+        if last_modified is None:
+            last_modified = self.query_last_modified()
+            if last_modified is not None and settings.API_CACHE_TIMEOUT:
+                cache.set(key, last_modified, settings.API_CACHE_TIMEOUT)
+        return last_modified
+
+    def query_last_modified(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = (
+            self.get_queryset()
+            .using(DEFAULT_DB_ALIAS)
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        )
+        return queryset.aggregate(last_modified=Max(self.last_modified_field))[
+            "last_modified"
+        ]
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        """Возвращает 304, если клиент передал актуальные ETag или Last-Modified."""
+
+        if not settings.API_CONDITIONAL_GET:
+            return handler(request, *args, **kwargs)
+
+        etag = self.get_etag(request)
+        last_modified = None
+        if "If-None-Match" not in request.headers:
+            last_modified = self.get_last_modified(request)
+
+        not_modified = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified and int(last_modified.timestamp()),
+        )
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200 and not read_from_replica():
+            if last_modified is None:
+                last_modified = self.get_last_modified(request)
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,127 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_COOKIE = "db_primary"
+PIN_KEY_PREFIX = "db-primary-pin"
+
+
+class RoutingState:
+    """Маршрутизация запросов к БД в рамках одного HTTP-запроса."""
+
+    def __init__(self):
+        self.replica = None
+        self.wrote = False
+        self.read_replica = False
+
+
+_state = ContextVar("db_routing_state", default=None)
+
+
+def reset_routing():
+    """Начинает новый HTTP-запрос: чтение с основной БД, записей еще не было."""
+
+    state = RoutingState()
+    _state.set(state)
+    return state
+
+
+def use_replica():
+    """Направляет дальнейшее чтение текущего запроса на одну из реплик."""
+
+    state = _state.get()
+    if state is not None and settings.DATABASE_REPLICAS and not state.wrote:
+        state.replica = random.choice(settings.DATABASE_REPLICAS)
+
+
+def use_primary():
+    """Возвращает дальнейшее чтение текущего запроса на основную БД."""
+
+    state = _state.get()
+    if state is not None:
+        state.replica = None
+
+
+def read_from_replica():
+    """Проверяет, читал ли текущий запрос данные с реплики."""
+
+    state = _state.get()
+    return state is not None and state.read_replica
+
+
+def wrote_to_primary():
+    state = _state.get()
+    return state is not None and state.wrote
+
+
+def pin_key(user_id):
+    return f"{PIN_KEY_PREFIX}:{user_id}"
+
+
+def is_pinned(request, user):
+    """Проверяет, писал ли клиент в БД последние DB_REPLICA_PIN_SECONDS секунд."""
+
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    return bool(user.is_authenticated and cache.get(pin_key(user.pk)))
+
+
+async def ais_pinned(request, user):
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    return bool(user.is_authenticated and await cache.aget(pin_key(user.pk)))
+
+
+class ReplicaRouter:
+    """
+    Роутер чтения с реплик из DATABASE_REPLICAS.
+
+    На реплику уходит только чтение запросов, для которых вызван use_replica
+    (ReplicaReadMixin), остальное читается с основной БД. Все записи идут
+    в основную БД, и после первой записи чтение запроса тоже возвращается на нее.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.wrote:
+            return None
+        if state.replica is not None:
+            state.read_replica = True
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Читает действия replica_actions вьюсета с реплики.
+
+    Клиент, который недавно писал в БД, читает с основной БД, чтобы сразу видеть
+    свои изменения: его отмечает ReplicaPinningMiddleware.
+    """
+
+    replica_actions = ("list", "retrieve")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            self.action in self.replica_actions
+            and request.method in SAFE_METHODS
+            and not is_pinned(request, request.user)
+        ):
+            use_replica()
@@ -0,0 +1,62 @@
+"""
+Настройки gunicorn для продакшена: python -m gunicorn -c config/gunicorn.conf.py
+
+APP_SERVER_MODE=wsgi запускает config.wsgi на потоковых воркерах gthread,
+APP_SERVER_MODE=asgi — config.asgi на воркерах uvicorn. Остальные параметры
+задаются переменными окружения GUNICORN_*.
+"""
+
+import multiprocessing
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).resolve().parent.parent / ".env")
+
+APP_SERVER_MODE = os.getenv("APP_SERVER_MODE", "wsgi")
+REDIS_URL = os.getenv("REDIS_URL")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# версии кэша ответов и лимиты запросов общие для воркеров только в Redis,
+# поэтому без REDIS_URL запускается один воркер
+workers = int(
+    os.getenv(
+        "GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1 if REDIS_URL else 1
+    )
+)
+if workers > 1 and not REDIS_URL:
+    raise RuntimeError(
+        "Несколько воркеров gunicorn требуют общего кэша: укажите REDIS_URL"
+    )
+
+if APP_SERVER_MODE == "asgi":
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "config.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.getenv("GUNICORN_THREADS", 4))
+
+# перезапуск воркера после max_requests запросов ограничивает рост памяти,
+# jitter не дает всем воркерам перезапуститься одновременно
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+# приложение загружается в мастер-процессе до fork, воркеры делят его память
+preload_app = os.getenv("GUNICORN_PRELOAD", "True") == "True"
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """Закрывает соединения с БД, унаследованные от мастер-процесса при preload."""
+
+    from django.db import connections
+
+    connections.close_all()
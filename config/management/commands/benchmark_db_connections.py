@@ -0,0 +1,25 @@
+import json
+
+from django.core.management import BaseCommand
+
+from config.benchmark import compare_connection_modes
+
+
+class Command(BaseCommand):
+    """
+    Команда для сравнения новых, постоянных и пуловых соединений с БД.
+
+    Потоки одновременно выполняют короткие запросы к текущей БД, как воркеры
+    сервера под нагрузкой. Режим pool замеряется только на PostgreSQL с psycopg 3.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=50)
+        parser.add_argument("--iterations", type=int, default=100)
+        parser.add_argument("--pool-size", type=int, default=10)
+
+    def handle(self, *args, **options):
+        results = compare_connection_modes(
+            options["threads"], options["iterations"], options["pool_size"]
+        )
+        self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
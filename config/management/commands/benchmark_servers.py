@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from config.benchmark import process_tree_rss_kb, run_load
+
+# Профили запуска: команда сервера и путь, который нагружается. Серверы сравниваются
+# на одном эндпоинте /sellers/, асинхронное представление — отдельным профилем
+SERVER_PROFILES = {
+    "runserver": (
+        [sys.executable, "manage.py", "runserver", "--noreload", "127.0.0.1:{port}"],
+        "/sellers/",
+    ),
+    "gunicorn-wsgi": (
+        [sys.executable, "-m", "gunicorn", "-c", "config/gunicorn.conf.py"],
+        "/sellers/",
+    ),
+    "gunicorn-asgi": (
+        [sys.executable, "-m", "gunicorn", "-c", "config/gunicorn.conf.py"],
+        "/sellers/",
+    ),
+    "gunicorn-asgi-async": (
+        [sys.executable, "-m", "gunicorn", "-c", "config/gunicorn.conf.py"],
+        "/sellers/async/",
+    ),
+}
+
+
+class Command(BaseCommand):
+    """
+    Команда для сравнения пропускной способности runserver и профилей gunicorn.
+
+    По очереди запускает каждый сервер на свободном порту с текущими настройками
+    БД, нагружает его одинаковым числом запросов и выводит запросы в секунду,
+    задержки и память процесса сервера вместе с воркерами. Кэш ответов и ответы
+    304 отключаются, чтобы замерялась обработка запроса, а не чтение из кэша.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile",
+            action="append",
+            choices=SERVER_PROFILES,
+            help="По умолчанию все профили",
+        )
+        parser.add_argument("--concurrency", type=int, default=100)
+        parser.add_argument("--requests", type=int, default=5000)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--token", required=True, help="JWT для Authorization")
+
+    def handle(self, *args, **options):
+        if options["workers"] > 1 and not settings.REDIS_URL:
+            raise CommandError("Несколько воркеров gunicorn требуют REDIS_URL")
+
+        headers = {"Authorization": f"Bearer {options['token']}"}
+        results = {}
+        for name in options["profile"] or SERVER_PROFILES:
+            command, path = SERVER_PROFILES[name]
+            port = self.get_free_port()
+            env = dict(
+                os.environ,
+                GUNICORN_BIND=f"127.0.0.1:{port}",
+                GUNICORN_WORKERS=str(options["workers"]),
+                GUNICORN_ACCESS_LOG="",
+                APP_SERVER_MODE="asgi" if "asgi" in name else "wsgi",
+                API_CACHE_TIMEOUT="0",
+                API_CONDITIONAL_GET="False",
+                # нагрузка идет с одного адреса и пользователя
+                THROTTLE_USER_RATE="",
+                THROTTLE_IP_RATE="",
+                THROTTLE_LIST_RATE="",
+                THROTTLE_DETAIL_RATE="",
+            )
+            process = subprocess.Popen(
+                [part.format(port=port) for part in command],
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                self.wait_for_port(port)
+                results[name] = asyncio.run(
+                    run_load(
+                        f"http://127.0.0.1:{port}{path}",
+                        options["concurrency"],
+                        options["requests"],
+                        headers,
+                    )
+                )
+                results[name]["rss_kb"] = process_tree_rss_kb(process.pid)
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+        self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+
+    @staticmethod
+    def get_free_port():
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    @staticmethod
+    def wait_for_port(port, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"Сервер не запустился на порту {port}")
@@ -0,0 +1,72 @@
+import asyncio
+import json
+from urllib.parse import urljoin
+from urllib.request import Request, urlopen
+
+from django.core.management import BaseCommand, CommandError
+
+from config.benchmark import process_tree_rss_kb, run_load
+
+
+class Command(BaseCommand):
+    """
+    Команда для нагрузочного сравнения запущенных серверов, например WSGI и ASGI.
+
+    Каждая цель задается как имя=url. Для цели можно передать pid процесса
+    сервера (имя=pid), тогда после замера выводится его память вместе с воркерами.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="Например wsgi=http://127.0.0.1:8000/sellers/",
+        )
+        parser.add_argument("--pid", action="append", default=[])
+        parser.add_argument("--concurrency", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=10000)
+        parser.add_argument("--token", help="JWT для заголовка Authorization")
+        parser.add_argument("--email")
+        parser.add_argument("--password")
+
+    def handle(self, *args, **options):
+        targets = self.parse_pairs(options["target"])
+        pids = {name: int(pid) for name, pid in self.parse_pairs(options["pid"])}
+        token = options["token"] or self.login(targets[0][1], options)
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+        results = {}
+        for name, url in targets:
+            results[name] = asyncio.run(
+                run_load(url, options["concurrency"], options["requests"], headers)
+            )
+            if name in pids:
+                results[name]["rss_kb"] = process_tree_rss_kb(pids[name])
+        self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+
+    @staticmethod
+    def parse_pairs(values):
+        pairs = []
+        for value in values:
+            name, separator, target = value.partition("=")
+            if not separator:
+                raise CommandError(f"Ожидалось имя=значение: {value}")
+            pairs.append((name, target))
+        return pairs
+
+    @staticmethod
+    def login(url, options):
+        """Получает JWT через /users/login/ сервера первой цели."""
+
+        if not options["email"]:
+            return None
+        request = Request(
+            urljoin(url, "/users/login/"),
+            data=json.dumps(
+                {"email": options["email"], "password": options["password"]}
+            ).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urlopen(request) as response:
+            return json.load(response)["access"]
@@ -0,0 +1,213 @@
+import os
+import threading
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASES = ("db", "serialize", "render")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsRegistry:
+    """
+    Хранилище метрик запросов в памяти процесса.
+
+    Метрики накапливаются по меткам view, action, method и status и отдаются
+    в текстовом формате Prometheus. Каждый процесс сервера хранит свои значения,
+    поэтому все метрики получают метку pid: иначе значения разных воркеров
+    gunicorn выглядели бы для Prometheus как сбросы одного счетчика.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+        self._connections_opened = {}
+
+    def observe_connection(self, alias):
+        with self._lock:
+            self._connections_opened[alias] = self._connections_opened.get(alias, 0) + 1
+
+    def observe(self, labels, duration, phases, queries):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = {
+                    "count": 0,
+                    "duration": 0.0,
+                    "buckets": [0] * len(DURATION_BUCKETS),
+                    "queries": 0,
+                    "phases": dict.fromkeys(PHASES, 0.0),
+                }
+            series["count"] += 1
+            series["duration"] += duration
+            index = bisect_left(DURATION_BUCKETS, duration)
+            if index < len(DURATION_BUCKETS):
+                series["buckets"][index] += 1
+            series["queries"] += queries
+            for phase in PHASES:
+                series["phases"][phase] += phases[phase]
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+            self._connections_opened.clear()
+
+    def render(self):
+        """Возвращает метрики в текстовом формате Prometheus."""
+
+        with self._lock:
+            series = {
+                labels: {**values, "buckets": list(values["buckets"])}
+                for labels, values in self._series.items()
+            }
+
+        lines = [
+            "# HELP http_requests_total Число обработанных запросов.",
+            "# TYPE http_requests_total counter",
+        ]
+        lines += [
+            f"http_requests_total{{{format_labels(labels)}}} {values['count']}"
+            for labels, values in series.items()
+        ]
+
+        lines += [
+            "# HELP http_request_duration_seconds Время обработки запроса.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for labels, values in series.items():
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS, values["buckets"]):
+                cumulative += count
+                lines.append(
+                    "http_request_duration_seconds_bucket"
+                    f"{{{format_labels(labels, le=bound)}}} {cumulative}"
+                )
+            lines += [
+                "http_request_duration_seconds_bucket"
+                f"{{{format_labels(labels, le='+Inf')}}} {values['count']}",
+                "http_request_duration_seconds_sum"
+                f"{{{format_labels(labels)}}} {values['duration']:.6f}",
+                "http_request_duration_seconds_count"
+                f"{{{format_labels(labels)}}} {values['count']}",
+            ]
+
+        lines += [
+            "# HELP http_request_phase_seconds_total Время по этапам запроса.",
+            "# TYPE http_request_phase_seconds_total counter",
+        ]
+        for labels, values in series.items():
+            lines += [
+                "http_request_phase_seconds_total"
+                f"{{{format_labels(labels, phase=phase)}}} {duration:.6f}"
+                for phase, duration in values["phases"].items()
+            ]
+
+        lines += [
+            "# HELP http_request_db_queries_total Число SQL-запросов.",
+            "# TYPE http_request_db_queries_total counter",
+        ]
+        lines += [
+            f"http_request_db_queries_total{{{format_labels(labels)}}} "
+            f"{values['queries']}"
+            for labels, values in series.items()
+        ]
+
+        with self._lock:
+            opened = dict(self._connections_opened)
+        lines += [
+            "# HELP db_connections_opened_total Число новых соединений с БД.",
+            "# TYPE db_connections_opened_total counter",
+        ]
+        lines += [
+            f"db_connections_opened_total{{{format_labels(alias=alias)}}} {count}"
+            for alias, count in opened.items()
+        ]
+        lines += render_pool_metrics()
+        return "\n".join(lines) + "\n"
+
+
+# Статистика пула psycopg: (ключ get_stats, метрика, тип, описание, множитель)
+POOL_METRICS = (
+    ("pool_size", "db_pool_connections", "gauge", "Соединений в пуле.", 1),
+    ("pool_available", "db_pool_available", "gauge", "Свободных соединений.", 1),
+    ("pool_max", "db_pool_max_size", "gauge", "Максимальный размер пула.", 1),
+    (
+        "requests_waiting",
+        "db_pool_requests_waiting",
+        "gauge",
+        "Запросов ждут соединение.",
+        1,
+    ),
+    ("requests_num", "db_pool_requests_total", "counter", "Запросов соединения.", 1),
+    (
+        "requests_queued",
+        "db_pool_requests_queued_total",
+        "counter",
+        "Запросов, которым пришлось ждать соединение.",
+        1,
+    ),
+    (
+        "requests_wait_ms",
+        "db_pool_requests_wait_seconds_total",
+        "counter",
+        "Суммарное время ожидания соединения.",
+        0.001,
+    ),
+    (
+        "requests_errors",
+        "db_pool_requests_errors_total",
+        "counter",
+        "Запросов, не дождавшихся соединения.",
+        1,
+    ),
+)
+
+
+def render_pool_metrics():
+    """Возвращает строки метрик пулов соединений psycopg, если пул включен."""
+
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            stats[alias] = pool.get_stats()
+    if not stats:
+        return []
+
+    lines = []
+    for key, name, metric_type, description, scale in POOL_METRICS:
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} {metric_type}"]
+        lines += [
+            f"{name}{{{format_labels(alias=alias)}}} {values.get(key, 0) * scale:g}"
+            for alias, values in stats.items()
+        ]
+    return lines
+
+
+def format_labels(labels=(), **extra):
+    pairs = list(zip(("view", "action", "method", "status"), labels))
+    pairs += extra.items()
+    pairs.append(("pid", os.getpid()))
+    return ",".join(f'{name}="{value}"' for name, value in pairs)
+
+
+registry = MetricsRegistry()
+
+
+def count_connection(sender, connection, **kwargs):
+    registry.observe_connection(connection.alias)
+
+
+connection_created.connect(count_connection, dispatch_uid="metrics_count_connection")
+
+
+def metrics_view(request):
+    """Отдает метрики запросов, доступно только с адресов из METRICS_ALLOWED_IPS."""
+
+    if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,170 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from config.db_routers import PIN_COOKIE, pin_key, reset_routing, wrote_to_primary
+from config.metrics import registry
+from config.nplusone import NPlusOneDetector
+
+
+class RequestTiming:
+    """Счетчики одного запроса: SQL-запросы и время этапов обработки."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.view_started = None
+        self.view = 0.0
+        self.render_started = None
+        self.render = 0.0
+        self.labels = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+    def finish_view(self):
+        if self.view_started is not None and not self.view:
+            self.view = time.perf_counter() - self.view_started
+
+    def finish_render(self, response):
+        if self.render_started is not None:
+            self.render = time.perf_counter() - self.render_started
+
+    @property
+    def serialize(self):
+        """Время работы представления без SQL: валидация и сериализация."""
+
+        return max(self.view - self.db, 0.0)
+
+
+class RequestTimingMiddleware:
+    """
+    Middleware для замера SQL-запросов и времени обработки каждого запроса.
+
+    Добавляет заголовок Server-Timing и накапливает метрики для /metrics.
+    Должен стоять последним в MIDDLEWARE, чтобы замерять только представление
+    и рендеринг ответа. Включается настройкой REQUEST_TIMING_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = request.timing = RequestTiming()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timing))
+            response = self.get_response(request)
+        timing.finish_view()
+        duration = time.perf_counter() - started
+
+        if timing.labels is None:
+            return response
+
+        response["Server-Timing"] = ", ".join(
+            (
+                f'db;dur={timing.db * 1000:.2f};desc="{timing.queries} queries"',
+                f"serialize;dur={timing.serialize * 1000:.2f}",
+                f"render;dur={timing.render * 1000:.2f}",
+                f"total;dur={duration * 1000:.2f}",
+            )
+        )
+        registry.observe(
+            (*timing.labels, request.method, response.status_code),
+            duration,
+            {"db": timing.db, "serialize": timing.serialize, "render": timing.render},
+            timing.queries,
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = request.timing
+        timing.labels = get_view_labels(request, view_func)
+        timing.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        timing = request.timing
+        timing.finish_view()
+        timing.render_started = time.perf_counter()
+        response.add_post_render_callback(timing.finish_render)
+        return response
+
+
+def get_view_labels(request, view_func):
+    """
+    Возвращает метки view и action для метрик.
+
+    Для вьюсетов DRF action берется из сопоставления HTTP-метода и действия
+    (list, retrieve, descendants...), для APIView — имя HTTP-метода.
+    """
+
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return request.resolver_match.view_name, request.method.lower()
+
+    method = request.method.lower()
+    actions = getattr(view_func, "actions", None) or {}
+    return view_class.__name__, actions.get(method, method)
+
+
+class NPlusOneMiddleware:
+    """
+    Middleware для поиска N+1 запросов в каждом запросе.
+
+    Режим задается настройкой NPLUSONE_MODE: log пишет предупреждение в лог
+    и подходит для продакшена, raise выбрасывает ошибку (для разработки).
+    """
+
+    def __init__(self, get_response):
+        if settings.NPLUSONE_MODE not in ("log", "raise"):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with NPlusOneDetector(
+            settings.NPLUSONE_MAX_REPEATS,
+            settings.NPLUSONE_MODE,
+            label=f"{request.method} {request.path}",
+        ):
+            return self.get_response(request)
+
+
+class ReplicaPinningMiddleware:
+    """
+    Middleware для чтения своих записей при работе с репликами.
+
+    В начале запроса сбрасывает маршрутизацию ReplicaRouter. Если запрос писал
+    в основную БД, клиент на DB_REPLICA_PIN_SECONDS секунд читает только с нее:
+    отметка ставится в cookie и, для авторизованного пользователя, в кэш, так как
+    клиенты API с JWT обычно не хранят cookie.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reset_routing()
+        response = self.get_response(request)
+        if wrote_to_primary():
+            seconds = settings.DB_REPLICA_PIN_SECONDS
+            response.set_cookie(
+                PIN_COOKIE, "1", max_age=seconds, httponly=True, samesite="Lax"
+            )
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                cache.set(pin_key(user.pk), True, seconds)
+        return response
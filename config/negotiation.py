@@ -0,0 +1,43 @@
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.utils.mediatypes import _MediaType, media_type_matches
+
+
+class ExplicitParamsContentNegotiation(DefaultContentNegotiation):
+    """
+    Выбор рендерера, при котором рендерер с параметрами в media_type только по явному запросу.
+
+    DRF сравнивает Accept с рендерерами по порядку, и рендерер application/json
+    без параметров подходит и под Accept: application/json; encoder=stdlib.
+    Поэтому рендереры, параметры которых перечислены в Accept, проверяются
+    первыми, а остальные — в порядке DEFAULT_RENDERER_CLASSES. ?format= такого
+    рендерера выбирает его при любом Accept: */* не совпадает с media_type
+    с параметрами.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        format = format_suffix or request.query_params.get(
+            self.settings.URL_FORMAT_OVERRIDE
+        )
+        if format:
+            renderers = self.filter_renderers(renderers, format)
+            if _MediaType(renderers[0].media_type).params:
+                return renderers[0], renderers[0].media_type
+
+        accepts = [
+            media_type
+            for media_type in self.get_accept_list(request)
+            if _MediaType(media_type).params.keys() - {"q"}
+        ]
+        explicit = [
+            renderer
+            for renderer in renderers
+            if _MediaType(renderer.media_type).params
+            and any(
+                media_type_matches(media_type, renderer.media_type)
+                for media_type in accepts
+            )
+        ]
+        renderers = explicit + [
+            renderer for renderer in renderers if renderer not in explicit
+        ]
+        return super().select_renderer(request, renderers)
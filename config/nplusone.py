@@ -0,0 +1,109 @@
+import logging
+import re
+from collections import Counter
+from contextlib import ContextDecorator, ExitStack
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+IN_LIST_RE = re.compile(r"\bIN \((?:%s, )*%s\)")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+class NPlusOneError(AssertionError):
+    """Ошибка: один и тот же SQL-запрос выполнен для каждой строки результата."""
+
+
+def normalize_sql(sql):
+    """Приводит запросы, различающиеся только параметрами, к одному виду."""
+
+    return IN_LIST_RE.sub("IN (...)", WHITESPACE_RE.sub(" ", sql.strip()))
+
+
+class NPlusOneDetector(ContextDecorator):
+    """
+    Детектор ленивой загрузки связей: повторов одного SELECT с разными параметрами.
+
+    Используется как контекстный менеджер или декоратор. Если один и тот же
+    запрос выполнен больше max_repeats раз, в режиме raise выбрасывается
+    NPlusOneError, в режиме log пишется предупреждение.
+    """
+
+    def __init__(self, max_repeats=2, mode="raise", label=None):
+        self.max_repeats = max_repeats
+        self.mode = mode
+        self.label = label
+        self.statements = Counter()
+        self._stack = None
+
+    def _record(self, execute, sql, params, many, context):
+        self.statements[normalize_sql(sql)] += 1
+        return execute(sql, params, many, context)
+
+    def _recreate_cm(self):
+        return type(self)(self.max_repeats, self.mode, self.label)
+
+    def __enter__(self):
+        self.statements.clear()
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self._record))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stack.close()
+        if exc_type is None:
+            self.report()
+        return False
+
+    @property
+    def repeated(self):
+        """SELECT-запросы, выполненные больше max_repeats раз, с числом повторов."""
+
+        return {
+            sql: count
+            for sql, count in self.statements.items()
+            if count > self.max_repeats and sql[:6].upper() == "SELECT"
+        }
+
+    def report(self):
+        repeated = self.repeated
+        if not repeated:
+            return
+        message = "\n".join(
+            f"{count} раз: {sql}"
+            for sql, count in sorted(repeated.items(), key=lambda item: -item[1])
+        )
+        if self.label:
+            message = f"{self.label}\n{message}"
+        if self.mode == "raise":
+            raise NPlusOneError(f"Обнаружены N+1 запросы: {message}")
+        logger.warning("Обнаружены N+1 запросы: %s", message)
+
+
+def count_queries(request, max_repeats=2):
+    """Выполняет запрос под детектором N+1 и возвращает число SQL-запросов."""
+
+    with NPlusOneDetector(max_repeats) as detector:
+        request()
+    return sum(detector.statements.values())
+
+
+def assert_queries_do_not_grow(request, add_rows, label=None, max_repeats=2):
+    """
+    Проверяет, что число запросов не зависит от размера результата.
+
+    Выполняет request, добавляет строки через add_rows и повторяет request:
+    если запросов стало больше или внутри запроса найден N+1, выбрасывается
+    NPlusOneError.
+    """
+
+    before = count_queries(request, max_repeats)
+    add_rows()
+    after = count_queries(request, max_repeats)
+    if after > before:
+        raise NPlusOneError(
+            f"{label or 'Запрос'}: число запросов выросло с {before} до {after} "
+            "при увеличении результата"
+        )
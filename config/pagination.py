@@ -0,0 +1,119 @@
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+def keyset_after(ordering, position):
+    """
+    Условие «строка после position» в порядке ordering.
+
+    Для ordering (a, -b, id) это (a > x) OR (a = x AND b < y)
+    OR (a = x AND b = y AND id > z).
+    """
+
+    condition = Q()
+    for index, name in enumerate(ordering):
+        equal = {
+            previous.lstrip("-"): value
+            for previous, value in zip(ordering[:index], position[:index])
+        }
+        lookup = "lt" if name.startswith("-") else "gt"
+        condition |= Q(**equal, **{f"{name.lstrip('-')}__{lookup}": position[index]})
+    return condition
+
+
+def reverse_ordering(ordering):
+    return tuple(name[1:] if name.startswith("-") else f"-{name}" for name in ordering)
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Постраничный вывод по курсору со значениями всех полей сортировки.
+
+    CursorPagination из DRF ищет позицию только по первому полю, а строки
+    с одинаковым значением пропускает смещением, которое ограничено
+    offset_cutoff: после 1000 одинаковых значений следующая страница повторяется.
+    Здесь к сортировке добавляется первичный ключ, курсор хранит значения всех
+    ее полей, и страница выбирается условием keyset_after без смещения.
+    Поля сортировки не должны допускать NULL.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        pk_name = queryset.model._meta.pk.attname
+        if not {pk_name, f"-{pk_name}"} & set(ordering):
+            descending = ordering[0].startswith("-")
+            ordering += (f"-{pk_name}" if descending else pk_name,)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        ordering = reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            position = self.parse_position(queryset.model, current_position)
+            queryset = queryset.filter(keyset_after(ordering, position))
+
+        # позиции уникальны, поэтому смещение остается нулевым
+        results = list(queryset[offset : offset + self.page_size + 1])
+        self.page = results[: self.page_size]
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            following_position = None
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = following_position is not None
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = current_position is not None or offset > 0
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def parse_position(self, model, position):
+        """Преобразует значения курсора к типам полей сортировки."""
+
+        try:
+            values = json.loads(position)
+            return [
+                model._meta.get_field(name.lstrip("-")).to_python(value)
+                for name, value in zip(self.ordering, values, strict=True)
+            ]
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for name in ordering:
+            name = name.lstrip("-")
+            if isinstance(instance, dict):
+                values.append(instance[name])
+            else:
+                values.append(getattr(instance, name))
+        return json.dumps([str(value) for value in values])
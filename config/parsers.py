@@ -0,0 +1,24 @@
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class OrjsonParser(JSONParser):
+    """
+    JSON-парсер на orjson.
+
+    orjson читает только UTF-8 и не принимает NaN и Infinity, поэтому тела
+    в других кодировках и режим STRICT_JSON=False разбирает стандартный парсер.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if not self.strict or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,55 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+    | orjson.OPT_NON_STR_KEYS
+)
+LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+class OrjsonRenderer(JSONRenderer):
+    """
+    JSON-рендерер на orjson с тем же результатом, что у JSONRenderer DRF.
+
+    Даты, Decimal, Country и другие типы, которые orjson не сериализует сам или
+    сериализует иначе, передаются в JSONEncoder DRF. Для ответов с отступами,
+    ensure_ascii или при ошибке orjson используется стандартный рендерер.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if (
+            self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default, option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+        return ret
+
+
+class StdlibJSONRenderer(JSONRenderer):
+    """
+    Стандартный JSONRenderer DRF, доступный по заголовку Accept.
+
+    Выбирается запросом с Accept: application/json; encoder=stdlib или ?format=stdjson.
+    Для выбора по Accept нужна ExplicitParamsContentNegotiation.
+    """
+
+    media_type = "application/json; encoder=stdlib"
+    format = "stdjson"
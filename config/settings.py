@@ -22,6 +22,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "rest_framework",
+    "config",
     "sellers",
     "users",
     "products",
@@ -33,6 +34,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -61,17 +63,69 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "config.wsgi.application"
 
+# Соединения с БД: DB_CONN_MAX_AGE секунд соединение переиспользуется между
+# запросами (0 — закрывается после каждого), перед переиспользованием проверяется.
+# DB_POOL=True включает пул psycopg 3 вместо постоянных соединений.
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", 60))
+DB_CONN_HEALTH_CHECKS = os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True"
+DB_POOL = os.getenv("DB_POOL", False) == "True"
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql_psycopg2",
+        "ENGINE": "django.db.backends.postgresql",
         "NAME": os.getenv("POSTGRES_DB"),
         "USER": os.getenv("POSTGRES_USER"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST"),
         "PORT": os.getenv("POSTGRES_PORT"),
+        "CONN_MAX_AGE": 0 if DB_POOL else DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
+        "OPTIONS": {},
     }
 }
 
+if DB_POOL:
+    # размер пула задается на процесс: max_size * число воркеров gunicorn
+    # не должно превышать max_connections PostgreSQL
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", 600)),
+        "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", 3600)),
+    }
+
+# Локальные замеры и тесты можно запускать без PostgreSQL: DATABASE_ENGINE=sqlite
+if os.getenv("DATABASE_ENGINE") == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+        }
+    }
+
+# Реплики для чтения: DATABASE_REPLICAS=host1:5432,host2 для PostgreSQL или пути
+# к файлам при DATABASE_ENGINE=sqlite. После записи клиент читает с основной БД
+# еще DB_REPLICA_PIN_SECONDS секунд, чтобы видеть свои изменения.
+DATABASE_REPLICAS = []
+for index, location in enumerate(
+    filter(None, os.getenv("DATABASE_REPLICAS", "").split(",")), start=1
+):
+    replica = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+    if replica["ENGINE"] == "django.db.backends.sqlite3":
+        replica["NAME"] = location
+    else:
+        host, _, port = location.partition(":")
+        replica.update(HOST=host, PORT=port or replica["PORT"])
+    DATABASES[f"replica_{index}"] = replica
+    DATABASE_REPLICAS.append(f"replica_{index}")
+
+DB_REPLICA_PIN_SECONDS = int(os.getenv("DB_REPLICA_PIN_SECONDS", 5))
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ["config.db_routers.ReplicaRouter"]
+    MIDDLEWARE.append("config.middleware.ReplicaPinningMiddleware")
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -87,16 +141,138 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Хеширование паролей: PASSWORD_HASHER=pbkdf2, argon2 (пакет argon2-cffi) или
+# bcrypt (пакет bcrypt) и его стоимость. Остальные алгоритмы остаются в списке,
+# чтобы проверять старые хеши; при входе они перехешируются выбранным.
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "pbkdf2")
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", 870000))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", 102400))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", 8))
+PASSWORD_BCRYPT_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", 12))
+# Число потоков процесса, одновременно хеширующих пароли при входе
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+
+_password_hashers = {
+    "pbkdf2": "users.hashers.TunedPBKDF2PasswordHasher",
+    "argon2": "users.hashers.TunedArgon2PasswordHasher",
+    "bcrypt": "users.hashers.TunedBCryptSHA256PasswordHasher",
+}
+PASSWORD_HASHERS = [
+    _password_hashers.pop(PASSWORD_HASHER),
+    *_password_hashers.values(),
+]
+
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
-    "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    ),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("users.authentication.CachedJWTAuthentication",),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # StdlibJSONRenderer выбирается только по Accept: application/json; encoder=stdlib
+    # или ?format=stdjson
+    "DEFAULT_RENDERER_CLASSES": [
+        "config.renderers.OrjsonRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+        "config.renderers.StdlibJSONRenderer",
+    ],
+    "DEFAULT_CONTENT_NEGOTIATION_CLASS": (
+        "config.negotiation.ExplicitParamsContentNegotiation"
+    ),
+    "DEFAULT_PARSER_CLASSES": [
+        "config.parsers.OrjsonParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_THROTTLE_CLASSES": [
+        "config.throttling.UserTokenBucketThrottle",
+        "config.throttling.IPTokenBucketThrottle",
+        "config.throttling.ScopedTokenBucketThrottle",
+    ],
+    # Лимиты token bucket «запросов/период»: user и ip — на все запросы клиента,
+    # list, export, detail и login — на группы эндпоинтов. Пустое значение
+    # отключает лимит
+    "DEFAULT_THROTTLE_RATES": {
+        "user": os.getenv("THROTTLE_USER_RATE", "2000/min") or None,
+        "ip": os.getenv("THROTTLE_IP_RATE", "3000/min") or None,
+        "list": os.getenv("THROTTLE_LIST_RATE", "120/min") or None,
+        "export": os.getenv("THROTTLE_EXPORT_RATE", "10/min") or None,
+        "detail": os.getenv("THROTTLE_DETAIL_RATE", "1200/min") or None,
+        "login": os.getenv("THROTTLE_LOGIN_RATE", "20/min") or None,
+    },
 }
 
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+
+# Кэш в памяти виден только своему процессу: версии ответов, сброшенные другим
+# процессом, в нем не меняются. Поэтому без REDIS_URL кэш ответов и 304 включаются
+# только при одном воркере gunicorn (GUNICORN_WORKERS=1, по умолчанию без Redis)
+# или явно через API_LOCAL_CACHE=True
+API_LOCAL_CACHE = (
+    os.getenv("API_LOCAL_CACHE", str(os.getenv("GUNICORN_WORKERS", "1") == "1"))
+    == "True"
+)
+
+# Время жизни закэшированных ответов API в секундах (0 отключает кэш) и ответы 304
+# по ETag. Версии ответов хранятся в кэше default
+if REDIS_URL or API_LOCAL_CACHE:
+    API_CACHE_TIMEOUT = int(os.getenv("API_CACHE_TIMEOUT", 300))
+    API_CONDITIONAL_GET = os.getenv("API_CONDITIONAL_GET", "True") == "True"
+else:
+    API_CACHE_TIMEOUT = 0
+    API_CONDITIONAL_GET = False
+
+# Быстрый путь списков через .values() вместо полей сериалайзера
+API_FAST_LIST = os.getenv("API_FAST_LIST", "True") == "True"
+
+SELLERS_BULK_BATCH_SIZE = int(os.getenv("SELLERS_BULK_BATCH_SIZE", 500))
+
+# Админка: число строк, начиная с которого на PostgreSQL показывается оценка вместо
+# COUNT(*), и время кэширования значений фильтров в секундах
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(
+    os.getenv("ADMIN_ESTIMATED_COUNT_THRESHOLD", 100000)
+)
+ADMIN_FILTER_CACHE_TIMEOUT = int(os.getenv("ADMIN_FILTER_CACHE_TIMEOUT", 600))
+
+# Фоновые задания админки: размер части, способ запуска (db — очередь в БД для
+# команды run_seller_jobs, thread — пул потоков веб-процесса, который gunicorn
+# останавливает при перезапуске воркера), число потоков
+SELLERS_JOB_CHUNK_SIZE = int(os.getenv("SELLERS_JOB_CHUNK_SIZE", 1000))
+SELLERS_JOB_RUNNER = os.getenv("SELLERS_JOB_RUNNER", "db")
+SELLERS_JOB_WORKERS = int(os.getenv("SELLERS_JOB_WORKERS", 2))
+
+# Сводка задолженности /sellers/rollup/ из таблицы, которую пересчитывают сигналы
+SELLERS_DEBT_ROLLUP_TABLE = os.getenv("SELLERS_DEBT_ROLLUP_TABLE", False) == "True"
+
+# Замер SQL-запросов и времени ответа: заголовок Server-Timing и метрики /metrics
+REQUEST_TIMING_ENABLED = os.getenv("REQUEST_TIMING_ENABLED", False) == "True"
+METRICS_ALLOWED_IPS = os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",")
+
+# Поиск N+1 запросов: off, log (пишет в лог) или raise (для разработки)
+NPLUSONE_MODE = os.getenv("NPLUSONE_MODE", "off")
+NPLUSONE_MAX_REPEATS = int(os.getenv("NPLUSONE_MAX_REPEATS", 2))
+
+if NPLUSONE_MODE != "off":
+    MIDDLEWARE.insert(0, "config.middleware.NPlusOneMiddleware")
+
+if REQUEST_TIMING_ENABLED:
+    MIDDLEWARE.append("config.middleware.RequestTimingMiddleware")
+
 LANGUAGE_CODE = "ru-ru"
 
 TIME_ZONE = "UTC"
@@ -106,6 +282,13 @@ USE_I18N = True
 USE_TZ = True
 
 STATIC_URL = "static/"
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# статика раздается WhiteNoise из STATIC_ROOT в сжатом виде, без отдельного сервера
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "whitenoise.storage.CompressedStaticFilesStorage"},
+}
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -117,4 +300,11 @@ AUTH_USER_MODEL = "users.User"
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.UserTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.UserTokenRefreshSerializer",
 }
+
+# Кэш пользователей JWT-аутентификации в памяти процесса: размер и время жизни
+# записи в секундах (0 — не кэшировать)
+JWT_USER_CACHE_SIZE = int(os.getenv("JWT_USER_CACHE_SIZE", 1024))
+JWT_USER_CACHE_TIMEOUT = int(os.getenv("JWT_USER_CACHE_TIMEOUT", 30))
@@ -0,0 +1,53 @@
+FIELDS_QUERY_PARAM = "fields"
+
+
+def get_requested_fields(request):
+    """Возвращает множество полей из параметра ?fields= или None, если он не передан."""
+
+    if request is None or request.method != "GET":
+        return None
+    requested = request.query_params.get(FIELDS_QUERY_PARAM)
+    if not requested:
+        return None
+    return {name.strip() for name in requested.split(",") if name.strip()}
+
+
+class SparseFieldsetSerializerMixin:
+    """Оставляет в ответе сериалайзера только поля, перечисленные в ?fields=."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = get_requested_fields(self.context.get("request"))
+        if requested is not None:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+
+class SparseFieldsetViewMixin:
+    """
+    Загружает из БД только запрошенные в ?fields= колонки.
+
+    Связи из prefetch_fields подгружаются, только если они запрошены, а поля из
+    always_loaded_fields нужны пагинации и читаются всегда.
+    """
+
+    prefetch_fields = ()
+    always_loaded_fields = ("id",)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        requested = get_requested_fields(self.request)
+        if requested is None:
+            return queryset.prefetch_related(*self.prefetch_fields)
+
+        concrete_fields = {field.name for field in queryset.model._meta.concrete_fields}
+        queryset = queryset.only(
+            *(requested & concrete_fields), *self.always_loaded_fields
+        )
+        return queryset.prefetch_related(
+            *(
+                lookup
+                for lookup in self.prefetch_fields
+                if getattr(lookup, "prefetch_to", lookup) in requested
+            )
+        )
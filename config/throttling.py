@@ -0,0 +1,168 @@
+import threading
+
+from asgiref.sync import sync_to_async
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+# Атомарное списание токена в Redis: состояние корзины — число токенов и время
+# последнего пополнения; числа возвращаются строками, так как Lua округляет их
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * refill)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated", tostring(now))
+redis.call("EXPIRE", KEYS[1], ARGV[4])
+return {allowed, tostring(tokens)}
+"""
+
+_local_lock = threading.Lock()
+_script = None
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Ограничение частоты запросов по алгоритму token bucket.
+
+    Скорость scope из DEFAULT_THROTTLE_RATES («120/min») задает емкость корзины
+    и скорость ее пополнения: клиент может сразу выполнить до 120 запросов, затем
+    по одному каждые 0,5 секунды. Скорость None отключает ограничение.
+    Корзины хранятся в кэше default: в Redis токен списывается атомарно
+    Lua-скриптом и общим для всех процессов лимитом, с другими бэкендами —
+    под блокировкой процесса (locmem — лимит на процесс).
+    """
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        refill = self.num_requests / self.duration
+        allowed, tokens = self.take_token(refill)
+        self.wait_seconds = None if allowed else round((1 - tokens) / refill, 3)
+        return allowed
+
+    def take_token(self, refill):
+        """Списывает токен из корзины self.key; возвращает успех и остаток токенов."""
+
+        global _script
+        backend = caches[DEFAULT_CACHE_ALIAS]
+        if isinstance(backend, RedisCache):
+            key = backend.make_and_validate_key(self.key)
+            # клиент redis-py из закрытого API RedisCache: публичный API кэша
+            # не умеет атомарно читать и изменять значение
+            client = backend._cache.get_client(key, write=True)
+            if _script is None:
+                _script = client.register_script(TOKEN_BUCKET_SCRIPT)
+            allowed, tokens = _script(
+                keys=[key],
+                args=[self.num_requests, refill, self.now, self.duration],
+                client=client,
+            )
+            return bool(allowed), float(tokens)
+
+        with _local_lock:
+            tokens, updated = backend.get(self.key, (self.num_requests, self.now))
+            tokens = min(
+                self.num_requests, tokens + max(0, self.now - updated) * refill
+            )
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            backend.set(self.key, (tokens, self.now), self.duration)
+        return allowed, tokens
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Общий лимит авторизованного пользователя на все эндпоинты."""
+
+    scope = "user"
+
+    def get_cache_key(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": request.user.pk}
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Общий лимит адреса клиента, в том числе для неавторизованных запросов."""
+
+    scope = "ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class ScopedTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Лимит клиента на группу эндпоинтов.
+
+    Группа действия берется из словаря throttle_scopes вьюсета (по умолчанию
+    list — «list»), остальные действия относятся к группе «detail». У каждой
+    группы своя скорость в DEFAULT_THROTTLE_RATES, поэтому тяжелые списки
+    и выгрузки не расходуют лимит дешевых запросов объектов.
+    """
+
+    default_scope = "detail"
+    default_scopes = {"list": "list"}
+
+    def __init__(self):
+        # скорость зависит от вьюсета и определяется в allow_request
+        self.rate = None
+
+    def allow_request(self, request, view):
+        scopes = getattr(view, "throttle_scopes", self.default_scopes)
+        self.scope = scopes.get(getattr(view, "action", None), self.default_scope)
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+async def acheck_throttles(request, view):
+    """
+    Проверяет DEFAULT_THROTTLE_CLASSES для асинхронных представлений вне DRF.
+
+    Обращения к кэшу выполняются в потоке, чтобы не блокировать цикл событий.
+    Выбрасывает Throttled с наибольшим временем ожидания.
+    """
+
+    waits = []
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not await sync_to_async(throttle.allow_request, thread_sensitive=False)(
+            request, view
+        ):
+            waits.append(throttle.wait())
+    if waits:
+        raise exceptions.Throttled(max(wait or 0 for wait in waits))
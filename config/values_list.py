@@ -0,0 +1,157 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
+from django.db.models import OuterRef
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+from rest_framework.response import Response
+
+# Поля, у которых to_representation возвращает значение из БД без изменений
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.BooleanField,
+    serializers.ReadOnlyField,
+    PrimaryKeyRelatedField,
+)
+
+
+def get_converter(field):
+    """Возвращает функцию преобразования значения из .values() для поля сериалайзера."""
+
+    if isinstance(field, PASSTHROUGH_FIELDS) and not getattr(field, "pk_field", None):
+        return None
+    if isinstance(field, serializers.IntegerField) and not getattr(
+        field, "coerce_to_string", False
+    ):
+        return None
+    return field.to_representation
+
+
+class ValuesListMixin:
+    """
+    Быстрый путь действия list: строки читаются через .values() без создания моделей.
+
+    Набор и порядок полей берутся из сериалайзера вьюсета, поэтому ответ совпадает
+    с обычным. Значения, которые сериалайзер не меняет (строки, числа, id связей),
+    переносятся как есть, остальные проходят через to_representation полей.
+    Id связей многие-ко-многим на PostgreSQL собираются подзапросом array_agg,
+    на других БД — одним запросом к промежуточной таблице для всей страницы.
+    Если в сериалайзере есть вычисляемые поля, используется обычный путь.
+    Включается настройкой API_FAST_LIST.
+    """
+
+    def list(self, request, *args, **kwargs):
+        fields = self.get_serializer().fields
+        if not settings.API_FAST_LIST or not self.supports_values_list(fields):
+            return super().list(request, *args, **kwargs)
+
+        many_to_many = [
+            name
+            for name, field in fields.items()
+            if isinstance(field, ManyRelatedField)
+        ]
+        queryset = self.filter_queryset(self.get_values_queryset(fields, many_to_many))
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset if page is None else page)
+        if many_to_many and connection.vendor != "postgresql":
+            self.attach_many_to_many(rows, many_to_many)
+
+        data = self.represent_rows(rows, fields)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+    def supports_values_list(self, fields):
+        model = self.queryset.model
+        for field in fields.values():
+            if field.write_only:
+                continue
+            source = field.source
+            if source == "*" or "." in source:
+                return False
+            try:
+                model._meta.get_field(source)
+            except FieldDoesNotExist:
+                return False
+        return True
+
+    def get_values_queryset(self, fields, many_to_many):
+        model = self.queryset.model
+        columns = {
+            field.source
+            for name, field in fields.items()
+            if name not in many_to_many and not field.write_only
+        }
+        columns.update(getattr(self, "always_loaded_fields", (model._meta.pk.attname,)))
+        # курсор пагинатора читает значения полей сортировки из строк страницы
+        if self.paginator is not None and hasattr(self.paginator, "get_ordering"):
+            ordering = self.paginator.get_ordering(self.request, self.queryset, self)
+            columns.update(name.lstrip("-") for name in ordering)
+        # prefetch_related вьюсета не применим к строкам .values()
+        queryset = self.get_queryset().prefetch_related(None).values(*columns)
+
+        if many_to_many and connection.vendor == "postgresql":
+            from django.contrib.postgres.expressions import ArraySubquery
+
+            for name in many_to_many:
+                source_field, target_field = self.get_through_fields(model, name)
+                related = self.get_through_queryset(model, name).filter(
+                    **{source_field: OuterRef("pk")}
+                )
+                queryset = queryset.annotate(
+                    **{f"{name}_ids": ArraySubquery(related.values(target_field))}
+                )
+        return queryset
+
+    @staticmethod
+    def get_through_fields(model, name):
+        field = model._meta.get_field(name)
+        return f"{field.m2m_field_name()}_id", f"{field.m2m_reverse_field_name()}_id"
+
+    def get_through_queryset(self, model, name):
+        source_field, target_field = self.get_through_fields(model, name)
+        through = model._meta.get_field(name).remote_field.through
+        return through.objects.order_by(source_field, target_field)
+
+    def attach_many_to_many(self, rows, many_to_many):
+        """Собирает id связей для всей страницы одним запросом на каждое поле."""
+
+        model = self.queryset.model
+        pk_name = model._meta.pk.attname
+        pks = [row[pk_name] for row in rows]
+        for name in many_to_many:
+            source_field, target_field = self.get_through_fields(model, name)
+            related = defaultdict(list)
+            for pk, related_pk in (
+                self.get_through_queryset(model, name)
+                .filter(**{f"{source_field}__in": pks})
+                .values_list(source_field, target_field)
+            ):
+                related[pk].append(related_pk)
+            for row in rows:
+                row[f"{name}_ids"] = related[row[pk_name]]
+
+    @staticmethod
+    def represent_rows(rows, fields):
+        columns = []
+        for name, field in fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, ManyRelatedField):
+                columns.append((name, f"{name}_ids", list))
+            else:
+                columns.append((name, field.source, get_converter(field)))
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, key, convert in columns:
+                value = row[key]
+                item[name] = (
+                    value if value is None or convert is None else convert(value)
+                )
+            data.append(item)
+        return data
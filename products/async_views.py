@@ -0,0 +1,12 @@
+from config.async_views import AsyncReadOnlyView
+from products.models import Product
+from products.serializers import ProductSerializer
+
+
+class ProductAsyncView(AsyncReadOnlyView):
+    """Асинхронные список и детальный просмотр продуктов для ASGI."""
+
+    model = Product
+    serializer_class = ProductSerializer
+    ordering = ("released_at", "id")
+    cache_namespace = "products"
@@ -0,0 +1,32 @@
+from django.urls import reverse
+
+from products.models import Product
+
+
+def build_scenarios(client):
+    """Возвращает сценарии list/retrieve/create/update продуктов."""
+
+    product = Product.objects.order_by("pk").first()
+    counter = iter(range(1, 10**9))
+
+    def new_product():
+        number = next(counter)
+        return {"name": f"benchmark product {number}", "model": "benchmark"}
+
+    product_list = reverse("products:product-list")
+    product_detail = reverse("products:product-detail", args=[product.pk])
+
+    return {
+        "products.list": (lambda: client.get(product_list), 200),
+        "products.retrieve": (lambda: client.get(product_detail), 200),
+        "products.create": (
+            lambda: client.post(product_list, new_product(), format="json"),
+            201,
+        ),
+        "products.update": (
+            lambda: client.patch(
+                product_detail, {"model": f"model {next(counter)}"}, format="json"
+            ),
+            200,
+        ),
+    }
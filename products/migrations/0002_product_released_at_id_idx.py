@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["released_at", "id"], name="product_released_at_id_idx"
+            ),
+        ),
+    ]
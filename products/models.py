@@ -13,6 +13,12 @@ class Product(models.Model):
         verbose_name="Дата выхода продукта на рынок",
         help_text="Укажите дату выхода продукта на рынок",
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name="Дата изменения",
+        help_text="Заполняется автоматически при изменении",
+    )
 
     def __str__(self):
         return f"{self.name} {self.model}"
@@ -20,3 +26,8 @@ class Product(models.Model):
     class Meta:
         verbose_name = "Продукт"
         verbose_name_plural = "Продукты"
+        indexes = [
+            models.Index(
+                fields=["released_at", "id"], name="product_released_at_id_idx"
+            ),
+        ]
@@ -0,0 +1,10 @@
+from config.pagination import KeysetCursorPagination
+
+
+class ProductCursorPagination(KeysetCursorPagination):
+    """Постраничный вывод продуктов по курсору (released_at, id)."""
+
+    ordering = ("released_at", "id")
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
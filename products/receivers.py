@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.cache import bump_versions
+from products.models import Product
+
+CACHE_NAMESPACE = "products"
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product(sender, instance, **kwargs):
+    """Сбрасывает кэш списка продуктов и измененного продукта."""
+
+    bump_versions(CACHE_NAMESPACE, [instance.pk])
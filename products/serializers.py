@@ -1,10 +1,11 @@
 from rest_framework import serializers
 
+from config.sparse_fields import SparseFieldsetSerializerMixin
 from products.models import Product
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Product
-        fields = "__all__"
+        exclude = ("updated_at",)
@@ -1,7 +1,11 @@
+from asgiref.sync import sync_to_async
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 
+from config.nplusone import assert_queries_do_not_grow
 from products.models import Product
 from users.models import User
 
@@ -92,7 +96,36 @@ class ProductTestCase(APITestCase):
         ]
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(data, result)
+        self.assertEqual(data["results"], result)
+
+    def test_product_list_sparse_fields(self):
+        """Тестирует ограничение набора полей параметром ?fields=."""
+
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("products:product-list")
+        response = self.client.get(url, {"fields": "id,model"})
+        data = response.json()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            data["results"], [{"id": self.product.pk, "model": self.product.model}]
+        )
+
+    @override_settings(API_CONDITIONAL_GET=True)
+    def test_product_conditional_get(self):
+        """Тестирует ответ 304 и сброс ETag после изменения продукта."""
+
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("products:product-detail", args=(self.product.pk,))
+        etag = self.client.get(url)["ETag"]
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.product.model = "2"
+        self.product.save()
+        modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
 
     # Тесты для обычного пользователя
     def test_product_retrieve_regular_user(self):
@@ -162,7 +195,7 @@ class ProductTestCase(APITestCase):
         ]
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(data, result)
+        self.assertEqual(data["results"], result)
 
     # Тесты для анонимного пользователя
     def test_product_retrieve_anonymous_user_access(self):
@@ -217,3 +250,73 @@ class ProductTestCase(APITestCase):
 #         data = {'field1': 'value1', 'field2': 'value2'}
 #         serializer = ProductSerializer(data=data)
 #         self.assertTrue(serializer.is_valid())
+
+
+class ProductNPlusOneTestCase(APITestCase):
+    """Класс для проверки отсутствия N+1 запросов у продуктов."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        self.admin_user = User.objects.create(
+            email="admin@email.com", is_staff=True, is_superuser=True
+        )
+        Product.objects.create(name="test1", model="1")
+
+    def add_products(self):
+        Product.objects.bulk_create(
+            Product(name=f"test{number}", model=str(number)) for number in range(2, 10)
+        )
+
+    def test_product_list_queries_do_not_grow(self):
+        """Тестирует, что число запросов списка продуктов не зависит от размера."""
+
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("products:product-list")
+
+        assert_queries_do_not_grow(
+            lambda: self.client.get(url), self.add_products, "ProductViewSet.list"
+        )
+
+    def test_product_admin_changelist_queries_do_not_grow(self):
+        """Тестирует, что число запросов списка в админке не зависит от размера."""
+
+        self.client.force_login(self.admin_user)
+        url = reverse("admin:products_product_changelist")
+
+        assert_queries_do_not_grow(lambda: self.client.get(url), self.add_products)
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class ProductAsyncViewTestCase(APITestCase):
+    """Класс для тестирования асинхронных представлений продуктов."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        self.user = User.objects.create(email="user@email.com")
+        self.product = Product.objects.create(name="test1", model="1")
+        Product.objects.create(name="test2", model="2")
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+        self.client.force_authenticate(user=self.user)
+
+    async def test_product_async_list_and_retrieve(self):
+        """Тестирует совпадение ответов с синхронным вьюсетом."""
+
+        response = await self.async_client.get(
+            reverse("products:product-async-list"), headers=self.headers
+        )
+        expected = await sync_to_async(self.client.get)(
+            reverse("products:product-list")
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"], expected.json()["results"])
+
+        response = await self.async_client.get(
+            reverse("products:product-async-detail", args=[self.product.pk]),
+            headers=self.headers,
+        )
+        expected = await sync_to_async(self.client.get)(
+            reverse("products:product-detail", args=[self.product.pk])
+        )
+        self.assertEqual(response.json(), expected.json())
@@ -1,6 +1,8 @@
+from django.urls import path
 from rest_framework.routers import SimpleRouter
 
 from products.apps import ProductsConfig
+from products.async_views import ProductAsyncView
 from products.views import ProductViewSet
 
 app_name = ProductsConfig.name
@@ -8,5 +10,9 @@ app_name = ProductsConfig.name
 router = SimpleRouter()
 router.register("", ProductViewSet)
 
-urlpatterns = []
+# асинхронные list и retrieve для ASGI стоят перед маршрутами вьюсета
+urlpatterns = [
+    path("async/", ProductAsyncView.as_view(), name="product-async-list"),
+    path("async/<int:pk>/", ProductAsyncView.as_view(), name="product-async-detail"),
+]
 urlpatterns += router.urls
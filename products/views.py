@@ -1,11 +1,24 @@
 from rest_framework.viewsets import ModelViewSet
 
+from config.cache import CachedResponseMixin, ConditionalGetMixin
+from config.db_routers import ReplicaReadMixin
+from config.sparse_fields import SparseFieldsetViewMixin
 from products.models import Product
+from products.paginators import ProductCursorPagination
 from products.serializers import ProductSerializer
 
 
-class ProductViewSet(ModelViewSet):
+class ProductViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    SparseFieldsetViewMixin,
+    ModelViewSet,
+):
     """Вьюсет для модели продукта."""
 
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    pagination_class = ProductCursorPagination
+    always_loaded_fields = ("id", "released_at")
+    cache_namespace = "products"
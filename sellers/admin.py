@@ -1,8 +1,21 @@
+from django.conf import settings
 from django.contrib import admin, messages
+from django.contrib.admin import helpers
 from django.urls import reverse
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 
-from sellers.models import Seller
+from config.admin_tools import CachedChoicesListFilter, EstimatedCountPaginator
+from sellers.debts import clear_debts
+from sellers.jobs import cancel_jobs, resume_jobs, start_job
+from sellers.models import Seller, SellerBulkJob
+from sellers.receivers import CITY_CACHE_NAMESPACE
+
+
+class CityListFilter(CachedChoicesListFilter):
+    title = "Город"
+    field_name = "city"
+    cache_namespace = CITY_CACHE_NAMESPACE
 
 
 @admin.register(Seller)
@@ -13,22 +26,33 @@ class SellerAdmin(admin.ModelAdmin):
         "seller_type",
         "city",
         "link_to_supplier",
+        "trade_network_level",
         "debt",
     )
-    list_filter = ("city", "seller_type")
+    list_filter = (CityListFilter, "seller_type")
     search_fields = ("name", "email")
     list_display_links = ("name",)
     list_select_related = ("supplier",)
+    autocomplete_fields = ("supplier", "products")
+    ordering = ("-id",)
+    paginator = EstimatedCountPaginator
+    # без второго COUNT(*) по всей таблице при включенных фильтрах
+    show_full_result_count = False
     actions = ("clear_debt",)
 
+    @cached_property
+    def supplier_url_template(self):
+        """Шаблон ссылки на продавца, чтобы не разрешать URL для каждой строки."""
+
+        return reverse("admin:sellers_seller_change", args=[0]).replace("/0/", "/{}/")
+
     def link_to_supplier(self, obj):
         """Возвращает ссылку на поставщика."""
 
         if obj.supplier is not None:
-            link = reverse("admin:sellers_seller_change", args=[obj.supplier.id])
             return format_html(
                 '<a href="{}">{}</a>',
-                link,
+                self.supplier_url_template.format(obj.supplier_id),
                 obj.supplier,
             )
 
@@ -36,7 +60,91 @@ class SellerAdmin(admin.ModelAdmin):
 
     @admin.action(description="Обнулить задолженность")
     def clear_debt(self, request, queryset):
-        """Очищает задолженность перед поставщиком."""
+        """
+        Очищает задолженность перед поставщиком.
+
+        Выборка больше SELLERS_JOB_CHUNK_SIZE обрабатывается фоновым заданием
+        по частям, чтобы не блокировать таблицу и не держать запрос админки.
+        """
+
+        pks = list(
+            queryset.order_by("pk").values_list("pk", flat=True)[
+                : settings.SELLERS_JOB_CHUNK_SIZE + 1
+            ]
+        )
+        if len(pks) <= settings.SELLERS_JOB_CHUNK_SIZE:
+            clear_debts(pks, user=request.user, reason="Обнуление в админке")
+            messages.success(request, "Задолженность успешно обнулена!")
+            return
+
+        # задание хранит параметры списка, а не запрос: фильтры и поиск,
+        # а если не выбраны все продавцы списка — еще и отмеченные id
+        params = dict(request.GET.lists())
+        if request.POST.get("select_across") != "1":
+            selected = request.POST.getlist(helpers.ACTION_CHECKBOX_NAME)
+            params["id__in"] = [",".join(selected)]
+        job = start_job("clear_debt", params, user=request.user)
+        link = reverse("admin:sellers_sellerbulkjob_change", args=[job.pk])
+        messages.success(
+            request,
+            format_html(
+                'Обнуление запущено в фоне: <a href="{}">задание #{}</a>.',
+                link,
+                job.pk,
+            ),
+        )
+
+
+@admin.register(SellerBulkJob)
+class SellerBulkJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "action",
+        "status",
+        "progress",
+        "created_by",
+        "created_at",
+        "updated_at",
+    )
+    list_filter = ("status", "action")
+    list_select_related = ("created_by",)
+    readonly_fields = (
+        "action",
+        "params",
+        "status",
+        "progress",
+        "last_pk",
+        "total",
+        "processed",
+        "error",
+        "created_by",
+        "created_at",
+        "updated_at",
+        "finished_at",
+    )
+    actions = ("resume", "cancel")
+
+    def has_add_permission(self, request):
+        return False
+
+    def progress(self, obj):
+        """Возвращает число обработанных продавцов и процент выполнения."""
+
+        percent = obj.processed * 100 // obj.total if obj.total else 100
+        return f"{obj.processed} из {obj.total} ({percent}%)"
+
+    progress.short_description = "Прогресс"
+
+    @admin.action(description="Продолжить задания")
+    def resume(self, request, queryset):
+        """Продолжает прерванные, отмененные и упавшие задания с места остановки."""
+
+        count = resume_jobs(queryset)
+        messages.success(request, f"Продолжено заданий: {count}")
+
+    @admin.action(description="Отменить задания")
+    def cancel(self, request, queryset):
+        """Отменяет задания в очереди и останавливает выполняемые."""
 
-        queryset.update(debt=0)
-        messages.success(request, "Задолженность успешно обнулена!")
+        count = cancel_jobs(queryset)
+        messages.success(request, f"Отменено заданий: {count}")
@@ -5,3 +5,6 @@ class SellersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "sellers"
     verbose_name = "Продавцы"
+
+    def ready(self):
+        import sellers.receivers  # noqa: F401
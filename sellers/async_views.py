@@ -0,0 +1,13 @@
+from config.async_views import AsyncReadOnlyView
+from sellers.models import Seller
+from sellers.serializers import SellerSerializer
+
+
+class SellerAsyncView(AsyncReadOnlyView):
+    """Асинхронные список и детальный просмотр продавцов для ASGI."""
+
+    model = Seller
+    serializer_class = SellerSerializer
+    ordering = ("created_at", "id")
+    filter_fields = ("country", "trade_network_level")
+    cache_namespace = "sellers"
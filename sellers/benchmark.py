@@ -0,0 +1,324 @@
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Sum
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from config.benchmark import BENCHMARK_EMAIL, BENCHMARK_PASSWORD, measure
+from products.benchmark import build_scenarios as build_product_scenarios
+from products.models import Product
+from sellers.debts import (
+    adjust_debt,
+    apply_pending_adjustments,
+    enqueue_debt_adjustments,
+)
+from sellers.models import DebtAdjustment, Seller
+from users.benchmark import build_scenarios as build_user_scenarios
+from users.models import User
+
+SELLER_TYPES = [choice for choice, _ in Seller.SELLER_TYPE_CHOICES]
+COUNTRIES = ["RU", "CN", "KZ", "BY", "DE", "US", "FR", "IT", "TR", "IN"]
+
+
+def seed_network(
+    sellers_count,
+    depth=3,
+    products_count=100,
+    products_per_seller=3,
+    batch_size=5000,
+    seed=0,
+):
+    """
+    Заполняет пустую БД торговой сетью заданного размера.
+
+    Продавцы равномерно распределяются по уровням, поставщик каждого выбирается
+    на предыдущем уровне. Позиция в сети рассчитывается сразу, поэтому сигналы
+    и пересчет поддеревьев не выполняются.
+    """
+
+    rng = random.Random(seed)
+    Product.objects.bulk_create(
+        (
+            Product(pk=pk, name=f"product {pk}", model=f"model {pk % 50}")
+            for pk in range(1, products_count + 1)
+        ),
+        batch_size=batch_size,
+    )
+
+    depth = max(1, min(depth, sellers_count))
+    level_size = math.ceil(sellers_count / depth)
+    products_per_seller = min(products_per_seller, products_count)
+    through_model = Seller.products.through
+    previous_level, current_level = {}, {}
+    sellers, links = [], []
+    for index in range(sellers_count):
+        pk = index + 1
+        level, position = divmod(index, level_size)
+        if position == 0:
+            previous_level, current_level = current_level, {}
+
+        if level == 0:
+            supplier_id, root_id, path = None, pk, f"{pk}/"
+        else:
+            supplier_id = (level - 1) * level_size + 1 + position % len(previous_level)
+            root_id, supplier_path = previous_level[supplier_id]
+            path = f"{supplier_path}{pk}/"
+        current_level[pk] = (root_id, path)
+
+        sellers.append(
+            Seller(
+                pk=pk,
+                name=f"seller {pk}",
+                email=f"seller{pk}@email.com",
+                country=COUNTRIES[pk % len(COUNTRIES)],
+                city=f"city {pk % 500}",
+                street=f"street {pk % 1000}",
+                house_number=str(pk % 100),
+                seller_type=SELLER_TYPES[min(level, len(SELLER_TYPES) - 1)],
+                supplier_id=supplier_id,
+                trade_network_level=level,
+                network_root_id=root_id,
+                network_path=path,
+            )
+        )
+        links.extend(
+            through_model(seller_id=pk, product_id=product_id)
+            for product_id in rng.sample(
+                range(1, products_count + 1), products_per_seller
+            )
+        )
+        if len(sellers) >= batch_size:
+            _write_sellers(sellers, links, batch_size)
+            sellers, links = [], []
+    if sellers:
+        _write_sellers(sellers, links, batch_size)
+
+    statements = connection.ops.sequence_reset_sql(no_style(), [Product, Seller])
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+    user = User.objects.create(email=BENCHMARK_EMAIL, is_staff=True, is_active=True)
+    user.set_password(BENCHMARK_PASSWORD)
+    user.save(update_fields=["password"])
+    return user
+
+
+def _write_sellers(sellers, links, batch_size):
+    Seller.objects.bulk_create(sellers, batch_size=batch_size)
+    Seller.products.through.objects.bulk_create(links, batch_size=batch_size)
+
+
+def build_scenarios(client, user):
+    """
+    Возвращает сценарии list/retrieve/create/update продавцов и списка продавцов
+    в админке.
+
+    Для админки пользователю выдается право просмотра продавцов. Кэш значений
+    фильтров на время замера отключен, поэтому замеряется список с запросом
+    значений фильтра по городу.
+    """
+
+    seller = Seller.objects.order_by("-trade_network_level", "pk").first()
+    product_id = Product.objects.order_by("pk").values_list("pk", flat=True).first()
+    counter = iter(range(1, 10**9))
+
+    def new_seller():
+        number = next(counter)
+        return {
+            "name": f"benchmark seller {number}",
+            "email": f"benchmark{number}@email.com",
+            "country": "RU",
+            "city": "Москва",
+            "seller_type": "retail network",
+            "supplier": seller.supplier_id,
+            "products": [product_id],
+        }
+
+    seller_list = reverse("sellers:seller-list")
+    seller_detail = reverse("sellers:seller-detail", args=[seller.pk])
+
+    user.user_permissions.add(Permission.objects.get(codename="view_seller"))
+    admin_client = Client()
+    admin_client.force_login(user)
+    seller_changelist = reverse("admin:sellers_seller_changelist")
+
+    return {
+        "sellers.list": (lambda: client.get(seller_list), 200),
+        "sellers.list_country": (
+            lambda: client.get(seller_list, {"country": "RU"}),
+            200,
+        ),
+        "sellers.retrieve": (lambda: client.get(seller_detail), 200),
+        "sellers.create": (
+            lambda: client.post(seller_list, new_seller(), format="json"),
+            201,
+        ),
+        "sellers.update": (
+            lambda: client.patch(
+                seller_detail, {"city": f"city {next(counter)}"}, format="json"
+            ),
+            200,
+        ),
+        "admin.sellers_changelist": (
+            lambda: admin_client.get(seller_changelist),
+            200,
+        ),
+        "admin.sellers_changelist_city": (
+            lambda: admin_client.get(seller_changelist, {"city": seller.city}),
+            200,
+        ),
+    }
+
+
+def run_benchmarks(user, iterations=50, warmup=5, only=None):
+    """
+    Выполняет сценарии продавцов, продуктов и входа от имени пользователя с JWT.
+
+    На время замера отключены кэш ответов и значений фильтров админки, чтобы
+    каждый запрос работал с БД, и лимиты запросов, чтобы сценарии не получали 429.
+    """
+
+    rates = settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]
+    with override_settings(
+        API_CACHE_TIMEOUT=0,
+        ADMIN_FILTER_CACHE_TIMEOUT=0,
+        REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": dict.fromkeys(rates),
+        },
+    ):
+        client = APIClient()
+        response = client.post(
+            reverse("users:login"),
+            {"email": user.email, "password": BENCHMARK_PASSWORD},
+            format="json",
+        )
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['access']}")
+
+        results = {}
+        scenarios = {
+            **build_scenarios(client, user),
+            **build_product_scenarios(client),
+            **build_user_scenarios(user),
+        }
+        for name, (request, expected_status) in scenarios.items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            results[name] = measure(request, iterations, warmup, expected_status)
+    return results
+
+
+def build_seller_payload(rows):
+    """Возвращает данные, похожие на ответ GET /sellers/ из rows продавцов."""
+
+    return {
+        "next": "http://testserver/sellers/?cursor=cD0yMDI0",
+        "previous": None,
+        "results": [
+            {
+                "id": pk,
+                "name": f"Продавец {pk}",
+                "email": f"seller{pk}@email.com",
+                "country": COUNTRIES[pk % len(COUNTRIES)],
+                "city": f"Город {pk % 500}",
+                "street": f"Улица {pk % 1000}",
+                "house_number": str(pk % 100),
+                "debt": f"{pk % 100000}.{pk % 100:02d}",
+                "created_at": f"2024-05-01T10:{pk % 60:02d}:15.123456Z",
+                "seller_type": SELLER_TYPES[pk % len(SELLER_TYPES)],
+                "trade_network_level": pk % 3,
+                "supplier": pk - 1 or None,
+                "products": [pk % 100, pk % 100 + 1, pk % 100 + 2],
+            }
+            for pk in range(1, rows + 1)
+        ],
+    }
+
+
+def run_concurrent_adjustments(seller_ids, writers=8, adjustments=100, mode="sync"):
+    """
+    Изменяет задолженность продавцов seller_ids из writers потоков одновременно.
+
+    В режиме sync каждый поток применяет adjustments изменений через adjust_debt,
+    в режиме queue потоки ставят их в очередь, а затем столько же воркеров
+    разбирают очередь. Возвращает время, пропускную способность и число
+    продавцов, у которых задолженность не сошлась с журналом (потерянные
+    обновления). У каждого потока свое соединение, поэтому замер имеет смысл
+    на PostgreSQL.
+    """
+
+    initial = dict(Seller.objects.filter(pk__in=seller_ids).values_list("pk", "debt"))
+
+    def write(writer):
+        rng = random.Random(writer)
+        try:
+            items = [
+                {
+                    "seller_id": rng.choice(seller_ids),
+                    "amount": Decimal(rng.randint(-500, 1000)),
+                    "external_id": f"benchmark-{writer}-{number}",
+                }
+                for number in range(adjustments)
+            ]
+            if mode == "queue":
+                enqueue_debt_adjustments(items)
+                return
+            for item in items:
+                try:
+                    adjust_debt(**item)
+                except ValidationError:
+                    pass
+        finally:
+            connection.close()
+
+    def work(_):
+        try:
+            while any(apply_pending_adjustments(batch_size=100)):
+                pass
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as executor:
+        list(executor.map(write, range(writers)))
+        if mode == "queue":
+            list(executor.map(work, range(writers)))
+    elapsed = time.perf_counter() - started
+
+    applied = dict(
+        DebtAdjustment.objects.filter(
+            seller_id__in=seller_ids, status=DebtAdjustment.APPLIED
+        )
+        .values("seller_id")
+        .annotate(total=Sum("amount"))
+        .values_list("seller_id", "total")
+    )
+    lost_updates = sum(
+        debt != initial[pk] + applied.get(pk, 0)
+        for pk, debt in Seller.objects.filter(pk__in=seller_ids).values_list(
+            "pk", "debt"
+        )
+    )
+    total = writers * adjustments
+    return {
+        "adjustments": total,
+        "seconds": round(elapsed, 3),
+        "per_second": round(total / max(elapsed, 1e-6), 1),
+        "applied": DebtAdjustment.objects.filter(status=DebtAdjustment.APPLIED).count(),
+        "rejected": DebtAdjustment.objects.filter(
+            status=DebtAdjustment.REJECTED
+        ).count(),
+        "lost_updates": lost_updates,
+    }
@@ -0,0 +1,198 @@
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import DataError, IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from sellers.models import DebtAdjustment, Seller
+from sellers.signals import sellers_updated
+
+NEGATIVE_DEBT_MESSAGE = "Задолженность не может стать отрицательной."
+DEBT_OVERFLOW_MESSAGE = "Задолженность превысит допустимое значение."
+EXTERNAL_ID_CONFLICT_MESSAGE = (
+    "Изменение с таким external_id уже создано для другого продавца или суммы."
+)
+
+
+def find_external_id_conflicts(items):
+    """
+    Возвращает external_id из items, уже занятые изменениями с другим продавцом или суммой.
+
+    Повтор того же изменения не считается конфликтом. items — словари с ключами
+    seller_id, amount и external_id; одинаковые external_id внутри items тоже
+    должны совпадать.
+    """
+
+    expected = {}
+    conflicts = set()
+    for item in items:
+        external_id = item.get("external_id")
+        if external_id is None:
+            continue
+        key = (item["seller_id"], item["amount"])
+        if expected.setdefault(external_id, key) != key:
+            conflicts.add(external_id)
+
+    if expected:
+        for external_id, seller_id, amount in DebtAdjustment.objects.filter(
+            external_id__in=expected
+        ).values_list("external_id", "seller_id", "amount"):
+            if expected[external_id] != (seller_id, amount):
+                conflicts.add(external_id)
+    return sorted(conflicts)
+
+
+def _update_debt(seller_id, amount):
+    """
+    Изменяет задолженность одним UPDATE с F() в отдельной точке сохранения.
+
+    Отрицательный результат отклоняет ограничение seller_debt_non_negative в БД,
+    переполнение — сама БД; в обоих случаях выбрасывается ValidationError
+    со своим сообщением.
+    """
+
+    try:
+        with transaction.atomic():
+            return Seller.objects.filter(pk=seller_id).update(
+                debt=F("debt") + amount, updated_at=Now()
+            )
+    except IntegrityError:
+        raise ValidationError({"amount": [NEGATIVE_DEBT_MESSAGE]})
+    except DataError:
+        raise ValidationError({"amount": [DEBT_OVERFLOW_MESSAGE]})
+
+
+def adjust_debt(seller_id, amount, reason="", external_id=None, user=None):
+    """
+    Сразу применяет изменение задолженности и записывает его в журнал.
+
+    Строка продавца блокируется только на время UPDATE, поэтому параллельные
+    изменения одного продавца не теряются. Повторный вызов с тем же external_id
+    не меняет задолженность и возвращает уже созданную запись.
+    """
+
+    try:
+        with transaction.atomic():
+            if not _update_debt(seller_id, amount):
+                raise Seller.DoesNotExist
+            adjustment = DebtAdjustment.objects.create(
+                seller_id=seller_id,
+                amount=amount,
+                reason=reason,
+                external_id=external_id,
+                created_by=user,
+                status=DebtAdjustment.APPLIED,
+                applied_at=timezone.now(),
+            )
+    except IntegrityError:
+        if external_id is None:
+            raise
+        adjustment = DebtAdjustment.objects.get(external_id=external_id)
+        if (adjustment.seller_id, adjustment.amount) != (seller_id, amount):
+            raise ValidationError({"external_id": [EXTERNAL_ID_CONFLICT_MESSAGE]})
+        return adjustment
+
+    sellers_updated.send(sender=Seller, pks=[seller_id], fields=["debt"])
+    return adjustment
+
+
+def enqueue_debt_adjustments(items, user=None):
+    """
+    Ставит изменения в очередь одним INSERT, повторы известных изменений пропускаются.
+
+    items — словари с ключами seller_id, amount, reason и external_id. Задолженность
+    не меняется, но журнал продавцов кэшируется по их версии, поэтому она сбрасывается.
+    """
+
+    items = list(items)
+    DebtAdjustment.objects.bulk_create(
+        (DebtAdjustment(created_by=user, **item) for item in items),
+        ignore_conflicts=True,
+    )
+    seller_ids = sorted({item["seller_id"] for item in items})
+    if seller_ids:
+        sellers_updated.send(sender=Seller, pks=seller_ids, fields=[])
+
+
+def apply_pending_adjustments(batch_size=1000):
+    """
+    Применяет пачку изменений из очереди и возвращает число примененных и отклоненных.
+
+    Записи очереди блокируются с skip_locked, поэтому несколько воркеров берут
+    разные пачки. Изменения одного продавца суммируются в один UPDATE, продавцы
+    обрабатываются по возрастанию id, чтобы воркеры не блокировали друг друга
+    по кругу. Если сумма уводит задолженность в минус, изменения продавца
+    применяются по одному и отклоняются только те, что не проходят ограничение.
+    """
+
+    with transaction.atomic():
+        batch = list(
+            DebtAdjustment.objects.select_for_update(skip_locked=True)
+            .filter(status=DebtAdjustment.PENDING)
+            .order_by("pk")
+            .values_list("pk", "seller_id", "amount")[:batch_size]
+        )
+        by_seller = defaultdict(list)
+        for pk, seller_id, amount in batch:
+            by_seller[seller_id].append((pk, amount))
+
+        applied, rejected = [], []
+        for seller_id in sorted(by_seller):
+            entries = by_seller[seller_id]
+            try:
+                _update_debt(seller_id, sum(amount for _, amount in entries))
+                applied.extend(pk for pk, _ in entries)
+                continue
+            except ValidationError:
+                pass
+            for pk, amount in entries:
+                try:
+                    _update_debt(seller_id, amount)
+                    applied.append(pk)
+                except ValidationError:
+                    rejected.append(pk)
+
+        now = timezone.now()
+        DebtAdjustment.objects.filter(pk__in=applied).update(
+            status=DebtAdjustment.APPLIED, applied_at=now
+        )
+        DebtAdjustment.objects.filter(pk__in=rejected).update(
+            status=DebtAdjustment.REJECTED, applied_at=now
+        )
+
+    if by_seller:
+        sellers_updated.send(sender=Seller, pks=list(by_seller), fields=["debt"])
+    return len(applied), len(rejected)
+
+
+def clear_debts(pks, user=None, reason="Обнуление задолженности"):
+    """Обнуляет задолженность продавцов и записывает списания в журнал."""
+
+    with transaction.atomic():
+        debts = list(
+            Seller.objects.select_for_update()
+            .filter(pk__in=pks)
+            .exclude(debt=0)
+            .order_by("pk")
+            .values_list("pk", "debt")
+        )
+        now = timezone.now()
+        DebtAdjustment.objects.bulk_create(
+            DebtAdjustment(
+                seller_id=pk,
+                amount=-debt,
+                reason=reason,
+                created_by=user,
+                status=DebtAdjustment.APPLIED,
+                applied_at=now,
+            )
+            for pk, debt in debts
+        )
+        cleared = [pk for pk, _ in debts]
+        Seller.objects.filter(pk__in=cleared).update(debt=0, updated_at=Now())
+
+    if cleared:
+        sellers_updated.send(sender=Seller, pks=cleared, fields=["debt"])
+    return cleared
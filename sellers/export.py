@@ -0,0 +1,64 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from products.models import Product
+from sellers.serializers import SellerSerializer
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def iter_seller_rows(queryset, chunk_size=2000):
+    """
+    Итерирует сериализованных продавцов порциями по chunk_size строк.
+
+    На PostgreSQL iterator() читает строки через серверный курсор, а продукты
+    подгружаются одним запросом на порцию, поэтому память не растет с числом строк.
+    """
+
+    serializer = SellerSerializer()
+    queryset = queryset.order_by("pk").prefetch_related(
+        Prefetch("products", queryset=Product.objects.only("id").order_by("pk"))
+    )
+    for seller in queryset.iterator(chunk_size=chunk_size):
+        yield serializer.to_representation(seller)
+
+
+def iter_ndjson(rows):
+    """Возвращает строки в формате NDJSON: один JSON-объект на строку."""
+
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+class _Echo:
+    """Псевдо-файл, который отдает записанную строку вместо буферизации."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    """Возвращает строки в формате CSV с заголовком, продукты перечисляются через пробел."""
+
+    fieldnames = list(SellerSerializer().fields)
+    writer = csv.DictWriter(_Echo(), fieldnames=fieldnames)
+    yield writer.writeheader()
+    for row in rows:
+        row["products"] = " ".join(str(pk) for pk in row["products"])
+        yield writer.writerow(row)
+
+
+def iter_export(queryset, export_format, chunk_size=2000):
+    """Возвращает потоковую выгрузку продавцов в выбранном формате."""
+
+    rows = iter_seller_rows(queryset, chunk_size=chunk_size)
+    if export_format == "csv":
+        return iter_csv(rows)
+    return iter_ndjson(rows)
@@ -0,0 +1,24 @@
+from django_filters import rest_framework as filters
+
+from sellers.models import ROLLUP_GROUPS, Seller, SellerDebtRollup
+
+
+class SellerRollupFilter(filters.FilterSet):
+    """Фильтр продавцов для сводки задолженности, рассчитываемой по продавцам."""
+
+    # фильтр по id без загрузки завода для проверки значения
+    network_root = filters.NumberFilter()
+
+    class Meta:
+        model = Seller
+        fields = ROLLUP_GROUPS
+
+
+class SellerDebtRollupFilter(filters.FilterSet):
+    """Фильтр таблицы сводки с теми же параметрами, что и SellerRollupFilter."""
+
+    network_root = filters.NumberFilter()
+
+    class Meta:
+        model = SellerDebtRollup
+        fields = ROLLUP_GROUPS
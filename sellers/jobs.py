@@ -0,0 +1,184 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import AnonymousUser
+from django.db import close_old_connections, connection, transaction
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+
+from sellers.debts import clear_debts
+from sellers.models import Seller, SellerBulkJob
+
+logger = logging.getLogger(__name__)
+
+# Действия заданий: функция получает id продавцов одной части и автора задания
+JOB_ACTIONS = {
+    "clear_debt": partial(clear_debts, reason="Обнуление в админке"),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Возвращает пул потоков веб-процесса, создавая его при первом задании."""
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.SELLERS_JOB_WORKERS,
+                thread_name_prefix="seller-jobs",
+            )
+        return _executor
+
+
+def start_job(action, params, user=None):
+    """
+    Создает задание для продавцов списка админки и запускает его после фиксации.
+
+    params — параметры фильтров и поиска списка (request.GET) в виде словаря
+    списков значений. Сохраняются они, а не список id или запрос, поэтому выбор
+    всех продавцов с фильтрами не требует загружать их в память, а выборка
+    собирается заново тем же списком админки при каждой части.
+    """
+
+    if action not in JOB_ACTIONS:
+        raise ValueError(f"Неизвестное действие задания: {action}")
+    job = SellerBulkJob(action=action, params=params, created_by=user)
+    job.total = get_job_queryset(job).count()
+    job.save()
+    schedule_job(job.pk)
+    return job
+
+
+def get_job_queryset(job):
+    """Собирает выборку задания списком продавцов админки по сохраненным параметрам."""
+
+    request = HttpRequest()
+    request.method = "GET"
+    request.GET = QueryDict(urlencode(job.params, doseq=True))
+    request.user = job.created_by or AnonymousUser()
+    model_admin = admin.site.get_model_admin(Seller)
+    changelist = model_admin.get_changelist_instance(request)
+    return changelist.get_queryset(request).order_by()
+
+
+def schedule_job(job_id):
+    """Передает задание пулу потоков, если задания не оставлены команде run_seller_jobs."""
+
+    if settings.SELLERS_JOB_RUNNER == "thread":
+        transaction.on_commit(lambda: get_executor().submit(_run_in_thread, job_id))
+
+
+def resume_jobs(queryset):
+    """Возвращает в очередь прерванные, отмененные и упавшие задания."""
+
+    job_ids = list(
+        queryset.filter(
+            status__in=(
+                SellerBulkJob.RUNNING,
+                SellerBulkJob.CANCELLED,
+                SellerBulkJob.FAILED,
+            )
+        ).values_list("pk", flat=True)
+    )
+    SellerBulkJob.objects.filter(pk__in=job_ids).update(
+        status=SellerBulkJob.PENDING, error="", updated_at=timezone.now()
+    )
+    for job_id in job_ids:
+        schedule_job(job_id)
+    return len(job_ids)
+
+
+def cancel_jobs(queryset):
+    """Отменяет задания: выполняемое остановится перед следующей частью."""
+
+    return queryset.filter(
+        status__in=(SellerBulkJob.PENDING, SellerBulkJob.RUNNING)
+    ).update(status=SellerBulkJob.CANCELLED, updated_at=timezone.now())
+
+
+def claim_next_job():
+    """Забирает из очереди одно задание; параллельные воркеры получают разные."""
+
+    with transaction.atomic():
+        job = (
+            SellerBulkJob.objects.select_for_update(skip_locked=True)
+            .filter(status=SellerBulkJob.PENDING)
+            .order_by("pk")
+            .only("pk")
+            .first()
+        )
+        if job is None:
+            return None
+        SellerBulkJob.objects.filter(pk=job.pk).update(
+            status=SellerBulkJob.RUNNING, updated_at=timezone.now()
+        )
+        return job.pk
+
+
+def run_job(job_id, claimed=False):
+    """
+    Выполняет задание частями по SELLERS_JOB_CHUNK_SIZE продавцов в порядке id.
+
+    Каждая часть и отметка о прогрессе фиксируются одной транзакцией, поэтому
+    после сбоя или отмены задание продолжается с первого необработанного id.
+    Перед каждой частью строка задания блокируется и проверяется ее статус.
+    """
+
+    if not claimed:
+        started = SellerBulkJob.objects.filter(
+            pk=job_id, status=SellerBulkJob.PENDING
+        ).update(status=SellerBulkJob.RUNNING, updated_at=timezone.now())
+        if not started:
+            return
+
+    try:
+        while _run_chunk(job_id):
+            pass
+    except Exception as error:
+        logger.exception("Фоновое задание %s завершилось ошибкой", job_id)
+        SellerBulkJob.objects.filter(pk=job_id, status=SellerBulkJob.RUNNING).update(
+            status=SellerBulkJob.FAILED,
+            error=repr(error),
+            updated_at=timezone.now(),
+        )
+
+
+def _run_chunk(job_id):
+    with transaction.atomic():
+        job = SellerBulkJob.objects.select_for_update().get(pk=job_id)
+        if job.status != SellerBulkJob.RUNNING:
+            return False
+
+        pks = list(
+            get_job_queryset(job)
+            .filter(pk__gt=job.last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[: settings.SELLERS_JOB_CHUNK_SIZE]
+        )
+        if not pks:
+            job.status = SellerBulkJob.DONE
+            job.finished_at = timezone.now()
+            job.save(update_fields=["status", "finished_at", "updated_at"])
+            return False
+
+        JOB_ACTIONS[job.action](pks, user=job.created_by)
+        job.last_pk = pks[-1]
+        job.processed += len(pks)
+        job.save(update_fields=["last_pk", "processed", "updated_at"])
+        return True
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run_job(job_id)
+    finally:
+        connection.close()
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management import BaseCommand
+
+from sellers.debts import apply_pending_adjustments
+
+
+class Command(BaseCommand):
+    """
+    Команда для применения изменений задолженности из очереди.
+
+    Можно запускать несколько экземпляров одновременно: каждый берет свою пачку
+    записей. С --loop команда работает постоянно и ждет новые записи.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Не завершаться, а проверять очередь каждые --interval секунд",
+        )
+        parser.add_argument("--interval", type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        total_applied = total_rejected = 0
+        while True:
+            applied, rejected = apply_pending_adjustments(options["batch_size"])
+            total_applied += applied
+            total_rejected += rejected
+            if applied or rejected:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Применено изменений: {total_applied}, отклонено: {total_rejected}"
+            )
+        )
@@ -0,0 +1,105 @@
+import json
+
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from config.benchmark import (
+    BENCHMARK_EMAIL,
+    compare_with_baseline,
+    get_baseline_path,
+    load_baseline,
+    save_baseline,
+)
+from sellers.benchmark import run_benchmarks, seed_network
+from sellers.models import Seller
+from users.models import User
+
+
+class Command(BaseCommand):
+    """
+    Команда для замера задержки, числа SQL-запросов и памяти REST-эндпоинтов.
+
+    Замеры выполняются в отдельной тестовой БД, заполненной торговой сетью
+    заданного размера. Результаты сравниваются с базовыми из файла --baseline,
+    при регрессии команда завершается с ошибкой.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sellers", type=int, default=1000)
+        parser.add_argument("--depth", type=int, default=3)
+        parser.add_argument("--products", type=int, default=100)
+        parser.add_argument("--products-per-seller", type=int, default=3)
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument(
+            "--only",
+            nargs="*",
+            help="Префиксы сценариев, например sellers.list users.login",
+        )
+        parser.add_argument("--baseline", default="benchmarks/baseline.json")
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Сохранить результаты как новые базовые",
+        )
+        parser.add_argument("--tolerance", type=float, default=0.25)
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Не удалять тестовую БД, чтобы не заполнять ее повторно",
+        )
+
+    def handle(self, *args, **options):
+        label = f"{connection.vendor}-{options['sellers']}"
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, keepdb=options["keepdb"])
+        try:
+            user = self.prepare_data(options)
+            results = run_benchmarks(
+                user, options["iterations"], options["warmup"], options["only"]
+            )
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+
+        self.stdout.write(json.dumps({label: results}, indent=2, sort_keys=True))
+
+        if options["save_baseline"]:
+            save_baseline(options["baseline"], label, results)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Базовые значения сохранены в {options['baseline']}"
+                )
+            )
+            return
+
+        baseline = load_baseline(options["baseline"], label)
+        if baseline is None:
+            raise CommandError(
+                f"Нет базовых значений {label} в {get_baseline_path(options['baseline'])}: "
+                "сохраните их флагом --save-baseline"
+            )
+        regressions = compare_with_baseline(results, baseline, options["tolerance"])
+        if regressions:
+            raise CommandError("Регрессии:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("Регрессий нет"))
+
+    def prepare_data(self, options):
+        """Заполняет тестовую БД или переиспользует уже заполненную."""
+
+        seeded = Seller.objects.filter(name__startswith="seller ")
+        if options["keepdb"] and seeded.count() == options["sellers"]:
+            return User.objects.get(email=BENCHMARK_EMAIL)
+
+        call_command("flush", interactive=False, verbosity=0)
+        self.stdout.write(f"Заполнение сети из {options['sellers']} продавцов...")
+        return seed_network(
+            options["sellers"],
+            depth=options["depth"],
+            products_count=options["products"],
+            products_per_seller=options["products_per_seller"],
+        )
@@ -0,0 +1,45 @@
+import json
+
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from sellers.benchmark import run_concurrent_adjustments, seed_network
+
+
+class Command(BaseCommand):
+    """
+    Команда для замера параллельных изменений задолженности.
+
+    Несколько потоков одновременно меняют задолженность небольшого числа
+    продавцов в отдельной тестовой БД. Если хоть одно обновление потеряно,
+    команда завершается с ошибкой. Результат имеет смысл на PostgreSQL.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sellers", type=int, default=10)
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--adjustments", type=int, default=200)
+        parser.add_argument("--mode", choices=("sync", "queue"), default="sync")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0)
+        try:
+            call_command("flush", interactive=False, verbosity=0)
+            seed_network(options["sellers"], depth=1, products_count=1)
+            results = run_concurrent_adjustments(
+                list(range(1, options["sellers"] + 1)),
+                writers=options["writers"],
+                adjustments=options["adjustments"],
+                mode=options["mode"],
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+        if results["lost_updates"]:
+            raise CommandError(f"Потеряны обновления: {results['lost_updates']}")
+        self.stdout.write(self.style.SUCCESS("Потерянных обновлений нет"))
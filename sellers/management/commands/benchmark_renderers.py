@@ -0,0 +1,26 @@
+from django.core.management import BaseCommand
+
+from config.benchmark import compare_renderers
+from sellers.benchmark import build_seller_payload
+
+
+class Command(BaseCommand):
+    """Команда для сравнения стандартного JSON-рендерера и парсера с orjson."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--iterations", type=int, default=20)
+
+    def handle(self, *args, **options):
+        results = compare_renderers(
+            build_seller_payload(options["rows"]), options["iterations"]
+        )
+        for name, metrics in results.items():
+            self.stdout.write(
+                f"{name}: рендеринг {metrics['render_ms']} мс, "
+                f"разбор {metrics['parse_ms']} мс, {metrics['bytes']} байт"
+            )
+        speedup = results["stdlib"]["render_ms"] / max(
+            results["orjson"]["render_ms"], 1e-6
+        )
+        self.stdout.write(self.style.SUCCESS(f"Ускорение рендеринга: {speedup:.1f}x"))
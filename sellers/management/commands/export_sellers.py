@@ -0,0 +1,28 @@
+from django.core.management import BaseCommand
+
+from sellers.export import EXPORT_FORMATS, iter_export
+from sellers.models import Seller
+
+
+class Command(BaseCommand):
+    """Команда для потоковой выгрузки всей торговой сети в NDJSON или CSV."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+        parser.add_argument("--output", help="Путь к файлу, по умолчанию stdout")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        chunks = iter_export(
+            Seller.objects.all(), options["format"], options["chunk_size"]
+        )
+        if options["output"] is None:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", encoding="utf-8", newline="") as file:
+            file.writelines(chunks)
+        self.stderr.write(
+            self.style.SUCCESS(f"Выгрузка сохранена в {options['output']}")
+        )
@@ -0,0 +1,229 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from config.cache import bump_versions
+from products.models import Product
+from products.receivers import CACHE_NAMESPACE as PRODUCTS_CACHE_NAMESPACE
+from sellers.models import Seller
+from sellers.network_import import Checkpoint, iter_json_records, normalize_record
+from sellers.rollups import deferred_rollup_refresh
+from sellers.services import build_network_positions
+from sellers.signals import sellers_updated
+
+
+class Command(BaseCommand):
+    """
+    Команда для пакетной загрузки продуктов и продавцов из больших JSON/NDJSON-файлов.
+
+    Продавцы записываются по уровням сети, чтобы поставщик всегда попадал в БД раньше
+    покупателя: файл продавцов читается один раз для построения дерева и еще по
+    разу на каждый уровень. После каждой порции сохраняется контрольная точка.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", help="Файл с продуктами")
+        parser.add_argument("--sellers", help="Файл с продавцами")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--checkpoint",
+            help="Файл контрольной точки, по умолчанию рядом с загружаемым файлом",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Продолжить загрузку с сохраненной контрольной точки",
+        )
+
+    def handle(self, *args, **options):
+        if not options["products"] and not options["sellers"]:
+            raise CommandError("Укажите --products и/или --sellers.")
+
+        checkpoint_path = options["checkpoint"] or (
+            f"{options['sellers'] or options['products']}.checkpoint"
+        )
+        checkpoint = Checkpoint(checkpoint_path, resume=options["resume"])
+        self.batch_size = options["batch_size"]
+
+        if options["products"]:
+            self.import_products(options["products"], checkpoint)
+        if options["sellers"]:
+            with deferred_rollup_refresh():
+                self.import_sellers(options["sellers"], checkpoint)
+
+        self.reset_sequences()
+        checkpoint.remove()
+        self.stdout.write(self.style.SUCCESS("Загрузка завершена"))
+
+    def import_products(self, path, checkpoint):
+        """Загружает продукты порциями через bulk_create."""
+
+        done = processed = checkpoint.state["products"]
+        batch = []
+        started = time.monotonic()
+        for index, record in enumerate(iter_json_records(path)):
+            if index < done:
+                continue
+            pk, fields = normalize_record(record)
+            batch.append(Product(pk=pk, **fields))
+            processed = index + 1
+            if len(batch) >= self.batch_size:
+                self.write_products(batch)
+                checkpoint.save(products=processed)
+                self.report("Продукты", processed - done, started)
+                batch = []
+        if batch:
+            self.write_products(batch)
+            checkpoint.save(products=processed)
+        self.report("Продукты", processed - done, started)
+
+    def import_sellers(self, path, checkpoint):
+        """Загружает продавцов уровень за уровнем вместе со связями с продуктами."""
+
+        positions = self.build_positions(path)
+        if not positions:
+            return
+        max_level = max(level for level, _, _ in positions.values())
+
+        through_model = Seller.products.through
+        started = time.monotonic()
+        imported = 0
+        for level in range(checkpoint.state["sellers_level"], max_level + 1):
+            done = (
+                checkpoint.state["sellers"]
+                if level == checkpoint.state["sellers_level"]
+                else 0
+            )
+            index = 0
+            sellers, links = [], []
+            for record in iter_json_records(path):
+                pk, fields = normalize_record(record, ("trade_network_level",))
+                if pk not in positions or positions[pk][0] != level:
+                    continue
+                index += 1
+                if index <= done:
+                    continue
+
+                _, root_id, network_path = positions[pk]
+                product_ids = fields.pop("products", [])
+                sellers.append(
+                    Seller(
+                        pk=pk,
+                        supplier_id=fields.pop("supplier", None),
+                        trade_network_level=level,
+                        network_root_id=root_id,
+                        network_path=network_path,
+                        **fields,
+                    )
+                )
+                links.extend(
+                    through_model(seller_id=pk, product_id=product_id)
+                    for product_id in product_ids
+                )
+                if len(sellers) >= self.batch_size:
+                    self.write_sellers(sellers, links)
+                    checkpoint.save(sellers_level=level, sellers=index)
+                    imported += len(sellers)
+                    self.report(f"Продавцы, уровень {level}", imported, started)
+                    sellers, links = [], []
+
+            if sellers:
+                self.write_sellers(sellers, links)
+                imported += len(sellers)
+            checkpoint.save(sellers_level=level + 1, sellers=0)
+            self.report(f"Продавцы, уровень {level}", imported, started)
+
+    def build_positions(self, path):
+        """Первый проход по файлу: строит дерево поставщиков и рассчитывает уровни."""
+
+        links = []
+        for record in iter_json_records(path):
+            pk, fields = normalize_record(record)
+            links.append((pk, fields.get("supplier")))
+
+        in_file = {pk for pk, _ in links}
+        missing_suppliers = {
+            supplier_id
+            for _, supplier_id in links
+            if supplier_id is not None and supplier_id not in in_file
+        }
+        known_positions = {
+            pk: (level, root_id, network_path)
+            for pk, level, root_id, network_path in Seller.objects.filter(
+                pk__in=missing_suppliers
+            ).values_list(
+                "pk", "trade_network_level", "network_root_id", "network_path"
+            )
+        }
+
+        positions = build_network_positions(links, known_positions)
+        skipped = len(in_file) - len(positions)
+        if skipped:
+            self.stderr.write(
+                self.style.WARNING(
+                    f"Пропущено продавцов с циклом или неизвестным поставщиком: {skipped}"
+                )
+            )
+        return positions
+
+    def write_products(self, products):
+        with transaction.atomic():
+            inserted = self.bulk_insert(Product, products, "released_at")
+            if inserted:
+                bump_versions(PRODUCTS_CACHE_NAMESPACE, inserted)
+
+    def write_sellers(self, sellers, links):
+        """Записывает продавцов и связи с продуктами только для вставленных строк."""
+
+        with transaction.atomic():
+            inserted = self.bulk_insert(Seller, sellers, "created_at")
+            Seller.products.through.objects.bulk_create(
+                (link for link in links if link.seller_id in inserted),
+                batch_size=self.batch_size,
+                ignore_conflicts=True,
+            )
+            if inserted:
+                sellers_updated.send(sender=Seller, pks=sorted(inserted))
+
+    def bulk_insert(self, model, objects, timestamp_field):
+        """
+        Записывает объекты через bulk_create, восстанавливает исходные даты и
+        возвращает множество первичных ключей вставленных строк.
+
+        auto_now_add перезаписывает дату при вставке, поэтому даты из файла
+        возвращаются отдельным bulk_update только вставленным строкам. Уже
+        существующие строки не изменяются.
+        """
+
+        timestamps = {obj.pk: getattr(obj, timestamp_field) for obj in objects}
+        existing = set(
+            model.objects.filter(pk__in=timestamps).values_list("pk", flat=True)
+        )
+        model.objects.bulk_create(
+            objects, batch_size=self.batch_size, ignore_conflicts=True
+        )
+        inserted = set(timestamps) - existing
+        restored = []
+        for obj in objects:
+            if obj.pk in inserted and timestamps[obj.pk] is not None:
+                setattr(obj, timestamp_field, timestamps[obj.pk])
+                restored.append(obj)
+        if restored:
+            model.objects.bulk_update(
+                restored, [timestamp_field], batch_size=self.batch_size
+            )
+        return inserted
+
+    def reset_sequences(self):
+        """Сдвигает последовательности первичных ключей после вставки с явными id."""
+
+        statements = connection.ops.sequence_reset_sql(no_style(), [Product, Seller])
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    def report(self, label, count, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(f"{label}: {count} строк, {count / elapsed:.0f} строк/с")
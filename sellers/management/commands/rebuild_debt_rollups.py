@@ -0,0 +1,11 @@
+from django.core.management import BaseCommand
+
+from sellers.rollups import rebuild_debt_rollups
+
+
+class Command(BaseCommand):
+    """Команда для полного пересчета таблицы сводки задолженности."""
+
+    def handle(self, *args, **options):
+        rebuild_debt_rollups()
+        self.stdout.write(self.style.SUCCESS("Сводка задолженности пересчитана"))
@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from sellers.models import Seller
+from sellers.services import rebuild_network
+
+
+class Command(BaseCommand):
+    """Команда для пересчета уровней и путей в торговой сети, например после loaddata."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        updated = rebuild_network(Seller, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Обновлено продавцов: {updated}"))
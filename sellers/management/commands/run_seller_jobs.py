@@ -0,0 +1,49 @@
+import time
+from datetime import timedelta
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from sellers.jobs import claim_next_job, run_job
+from sellers.models import SellerBulkJob
+
+
+class Command(BaseCommand):
+    """
+    Команда для выполнения фоновых заданий админки из очереди в БД.
+
+    Нужна при SELLERS_JOB_RUNNER=db, а также для продолжения заданий, прерванных
+    перезапуском веб-процесса: задания в статусе «выполняется», которые не
+    обновлялись дольше --stale секунд, возвращаются в очередь.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Не завершаться, а проверять очередь каждые --interval секунд",
+        )
+        parser.add_argument("--interval", type=float, default=5.0)
+        parser.add_argument("--stale", type=int, default=600)
+
+    def handle(self, *args, **options):
+        finished = 0
+        while True:
+            self.requeue_stale(options["stale"])
+            job_id = claim_next_job()
+            if job_id is not None:
+                run_job(job_id, claimed=True)
+                finished += 1
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Выполнено заданий: {finished}"))
+
+    @staticmethod
+    def requeue_stale(seconds):
+        SellerBulkJob.objects.filter(
+            status=SellerBulkJob.RUNNING,
+            updated_at__lt=timezone.now() - timedelta(seconds=seconds),
+        ).update(status=SellerBulkJob.PENDING, updated_at=timezone.now())
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from sellers.services import rebuild_network
+
+
+def fill_network_position(apps, schema_editor):
+    Seller = apps.get_model("sellers", "Seller")
+    rebuild_network(Seller)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sellers", "0008_remove_seller_trade_network_level"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="seller",
+            name="trade_network_level",
+            field=models.PositiveIntegerField(
+                db_index=True,
+                default=0,
+                editable=False,
+                help_text="Рассчитывается автоматически по цепочке поставщиков",
+                verbose_name="Уровень в торговой сети",
+            ),
+        ),
+        migrations.AddField(
+            model_name="seller",
+            name="network_root",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text="Корневое звено цепочки поставок",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="network_members",
+                to="sellers.seller",
+                verbose_name="Завод",
+            ),
+        ),
+        migrations.AddField(
+            model_name="seller",
+            name="network_path",
+            field=models.CharField(
+                db_index=True,
+                default="",
+                editable=False,
+                help_text="Идентификаторы звеньев от завода до текущего, например «4/5/7/»",
+                max_length=255,
+                verbose_name="Путь в торговой сети",
+            ),
+        ),
+        migrations.RunPython(fill_network_position, migrations.RunPython.noop),
+    ]
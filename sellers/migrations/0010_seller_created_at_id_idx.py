@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sellers", "0009_seller_network_position"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="seller",
+            index=models.Index(
+                fields=["created_at", "id"], name="seller_created_at_id_idx"
+            ),
+        ),
+    ]
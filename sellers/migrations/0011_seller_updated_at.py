@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sellers", "0010_seller_created_at_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="seller",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                db_index=True,
+                help_text="Заполняется автоматически при изменении",
+                verbose_name="Дата изменения",
+            ),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+TRIGRAM_INDEXES = {
+    "seller_name_trgm_idx": "name",
+    "seller_email_trgm_idx": "email",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    Создает GIN-индексы pg_trgm для поиска icontains, который Django строит как
+    UPPER(поле) LIKE UPPER('%...%'). На других СУБД миграция ничего не делает.
+    """
+
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON sellers_seller "
+            f"USING gin (UPPER({column}::text) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sellers", "0011_seller_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="seller",
+            index=models.Index(
+                fields=["country", "created_at", "id"],
+                name="seller_country_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seller",
+            index=models.Index(fields=["city"], name="seller_city_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="seller",
+            index=models.Index(
+                fields=["seller_type", "city"], name="seller_type_city_idx"
+            ),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
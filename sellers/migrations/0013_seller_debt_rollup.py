@@ -0,0 +1,78 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:43
+
+import django.db.models.deletion
+import django_countries.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sellers", "0012_seller_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SellerDebtRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "trade_network_level",
+                    models.PositiveIntegerField(verbose_name="Уровень в торговой сети"),
+                ),
+                (
+                    "country",
+                    django_countries.fields.CountryField(
+                        blank=True, max_length=2, null=True, verbose_name="Страна"
+                    ),
+                ),
+                (
+                    "total_debt",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=18,
+                        verbose_name="Сумма задолженности",
+                    ),
+                ),
+                (
+                    "sellers_count",
+                    models.PositiveIntegerField(verbose_name="Число продавцов"),
+                ),
+                (
+                    "products_count",
+                    models.PositiveIntegerField(verbose_name="Число продуктов"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Дата пересчета"),
+                ),
+                (
+                    "network_root",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="debt_rollups",
+                        to="sellers.seller",
+                        verbose_name="Завод",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Сводка задолженности",
+                "verbose_name_plural": "Сводки задолженности",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("network_root", "trade_network_level", "country"),
+                        name="seller_debt_rollup_unique",
+                    )
+                ],
+            },
+        ),
+    ]
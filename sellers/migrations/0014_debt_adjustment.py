@@ -0,0 +1,127 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sellers", "0013_seller_debt_rollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DebtAdjustment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Положительная сумма увеличивает задолженность, отрицательная уменьшает",
+                        max_digits=12,
+                        verbose_name="Сумма изменения",
+                    ),
+                ),
+                (
+                    "reason",
+                    models.CharField(
+                        blank=True, default="", max_length=255, verbose_name="Основание"
+                    ),
+                ),
+                (
+                    "external_id",
+                    models.CharField(
+                        blank=True,
+                        help_text="Ключ идемпотентности: повторная запись с тем же id не применяется",
+                        max_length=100,
+                        null=True,
+                        unique=True,
+                        verbose_name="Внешний id",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "в очереди"),
+                            ("applied", "применено"),
+                            ("rejected", "отклонено"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "applied_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Дата применения"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Изменение задолженности",
+                "verbose_name_plural": "Изменения задолженности",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="seller",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("debt__gte", 0)), name="seller_debt_non_negative"
+            ),
+        ),
+        migrations.AddField(
+            model_name="debtadjustment",
+            name="created_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Автор",
+            ),
+        ),
+        migrations.AddField(
+            model_name="debtadjustment",
+            name="seller",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="debt_adjustments",
+                to="sellers.seller",
+                verbose_name="Продавец",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="debtadjustment",
+            index=models.Index(
+                fields=["seller", "created_at", "id"], name="debt_seller_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="debtadjustment",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["id"],
+                name="debt_adjustment_pending_idx",
+            ),
+        ),
+    ]
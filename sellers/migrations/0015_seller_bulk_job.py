@@ -0,0 +1,106 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sellers", "0014_debt_adjustment"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SellerBulkJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("action", models.CharField(max_length=50, verbose_name="Действие")),
+                (
+                    "query",
+                    models.BinaryField(
+                        help_text="Сериализованный pickle запрос продавцов, выбранных в админке",
+                        verbose_name="Запрос выборки",
+                    ),
+                ),
+                (
+                    "last_pk",
+                    models.BigIntegerField(
+                        default=0,
+                        help_text="Продолжение задания начинается со следующего id",
+                        verbose_name="Последний обработанный id",
+                    ),
+                ),
+                (
+                    "total",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Всего продавцов"
+                    ),
+                ),
+                (
+                    "processed",
+                    models.PositiveIntegerField(default=0, verbose_name="Обработано"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "в очереди"),
+                            ("running", "выполняется"),
+                            ("done", "завершено"),
+                            ("cancelled", "отменено"),
+                            ("failed", "ошибка"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "error",
+                    models.TextField(blank=True, default="", verbose_name="Ошибка"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Дата изменения"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Дата завершения"
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Автор",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Фоновое задание",
+                "verbose_name_plural": "Фоновые задания",
+            },
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.1.15 on 2026-10-18 11:31
+
+import django.db.models.deletion
+import django_countries.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0003_product_updated_at"),
+        ("sellers", "0015_seller_bulk_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SellerRollupState",
+            fields=[
+                (
+                    "seller_id",
+                    models.BigIntegerField(
+                        primary_key=True, serialize=False, verbose_name="Продавец"
+                    ),
+                ),
+                ("network_root_id", models.BigIntegerField(verbose_name="Завод")),
+                (
+                    "trade_network_level",
+                    models.PositiveIntegerField(verbose_name="Уровень в торговой сети"),
+                ),
+                (
+                    "country",
+                    django_countries.fields.CountryField(
+                        blank=True, max_length=2, null=True, verbose_name="Страна"
+                    ),
+                ),
+                (
+                    "debt",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=10, verbose_name="Задолженность"
+                    ),
+                ),
+                ("products", models.JSONField(default=list, verbose_name="Продукты")),
+            ],
+            options={
+                "verbose_name": "Учтенное состояние продавца",
+                "verbose_name_plural": "Учтенные состояния продавцов",
+            },
+        ),
+        migrations.RemoveField(
+            model_name="sellerdebtrollup",
+            name="products_count",
+        ),
+        migrations.CreateModel(
+            name="SellerRollupProduct",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sellers_count",
+                    models.PositiveIntegerField(verbose_name="Число продавцов"),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="products.product",
+                        verbose_name="Продукт",
+                    ),
+                ),
+                (
+                    "rollup",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="products",
+                        to="sellers.sellerdebtrollup",
+                        verbose_name="Строка сводки",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Продукт сводки задолженности",
+                "verbose_name_plural": "Продукты сводки задолженности",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("rollup", "product"),
+                        name="seller_rollup_product_unique",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sellers", "0016_seller_rollup_deltas"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="sellerbulkjob",
+            name="query",
+        ),
+        migrations.AddField(
+            model_name="sellerbulkjob",
+            name="params",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Фильтры и поиск списка продавцов в админке, выборка собирается по ним",
+                verbose_name="Параметры выборки",
+            ),
+        ),
+    ]
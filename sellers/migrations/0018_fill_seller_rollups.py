@@ -0,0 +1,18 @@
+from django.db import migrations
+
+from sellers.rollups import rebuild_debt_rollups
+
+
+def fill_rollups(apps, schema_editor):
+    rebuild_debt_rollups(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sellers", "0017_seller_bulk_job_params"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,165 @@
 from decimal import Decimal
 
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Concat, Now, Substr
 from django_countries.fields import CountryField
 
 from products.models import Product
+from sellers.signals import sellers_updated, subtree_moved
 
 NULLABLE = {"blank": True, "null": True}
 
+# Разрезы сводки задолженности: завод (корень цепочки), уровень, страна
+ROLLUP_GROUPS = ("network_root", "trade_network_level", "country")
+
+SUPPLIER_CYCLE_MESSAGE = (
+    "Поставщик не может находиться ниже продавца в цепочке поставок."
+)
+
+
+class GroupSubquery(Subquery):
+    """
+    Подзапрос, который ссылается только на столбцы группировки внешнего запроса.
+
+    Django добавляет такой подзапрос в GROUP BY, и база вычисляла бы его для
+    каждой строки, а не для каждой группы.
+    """
+
+    def get_group_by_cols(self):
+        return []
+
+
+def count_group_products(links, prefix, group_by):
+    """
+    Возвращает подзапрос числа различных продуктов в группе внешнего запроса.
+
+    links - строки с полем product_id, prefix - путь от них к полям группы.
+    Пустая страна совпадает с пустой, как в GROUP BY.
+    """
+
+    for name in group_by:
+        if name == "country":
+            links = links.alias(
+                group_country=Coalesce(f"{prefix}country", Value(""))
+            ).filter(group_country=Coalesce(OuterRef("country"), Value("")))
+        else:
+            links = links.filter(**{f"{prefix}{name}": OuterRef(name)})
+    products = (
+        links.order_by()
+        .annotate(group=Value(1))
+        .values("group")
+        .annotate(count=Count("product_id", distinct=True))
+        .values("count")
+    )
+    return GroupSubquery(products, output_field=IntegerField())
+
+
+class SellerQuerySet(models.QuerySet):
+    def descendants(self, seller, max_depth=None):
+        """Возвращает всех покупателей ниже продавца по цепочке поставок одним запросом."""
+
+        # пустой путь совпал бы с началом пути любого продавца
+        if not seller.network_path:
+            return self.none()
+        queryset = self.filter(network_path__startswith=seller.network_path).exclude(
+            pk=seller.pk
+        )
+        if max_depth is not None:
+            queryset = queryset.filter(
+                trade_network_level__lte=seller.trade_network_level + max_depth
+            )
+        return queryset.order_by("trade_network_level", "pk")
+
+    def ancestors(self, seller, max_depth=None):
+        """Возвращает поставщиков продавца от ближайшего до завода одним запросом."""
+
+        ancestor_ids = [int(pk) for pk in seller.network_path.split("/")[:-2]]
+        if max_depth is not None:
+            ancestor_ids = ancestor_ids[len(ancestor_ids) - max_depth :]
+        return self.filter(pk__in=ancestor_ids).order_by("-trade_network_level")
+
+    def bulk_create_in_network(self, sellers, batch_size=None):
+        """Создает продавцов через bulk_create и рассчитывает их положение в сети."""
+
+        supplier_ids = {seller.supplier_id for seller in sellers if seller.supplier_id}
+        suppliers = {
+            pk: (level, root_id, path)
+            for pk, level, root_id, path in self.filter(
+                pk__in=supplier_ids
+            ).values_list(
+                "pk", "trade_network_level", "network_root_id", "network_path"
+            )
+        }
+        for seller in sellers:
+            if seller.supplier_id is not None:
+                seller.trade_network_level = suppliers[seller.supplier_id][0] + 1
+
+        self.bulk_create(sellers, batch_size=batch_size)
+
+        for seller in sellers:
+            if seller.supplier_id is not None:
+                _, root_id, prefix = suppliers[seller.supplier_id]
+            else:
+                root_id, prefix = seller.pk, ""
+            seller.network_root_id = root_id
+            seller.network_path = f"{prefix}{seller.pk}/"
+            seller._loaded_supplier_id = seller.supplier_id
+        self.bulk_update(
+            sellers, ["network_root", "network_path"], batch_size=batch_size
+        )
+        sellers_updated.send(sender=self.model, pks=[seller.pk for seller in sellers])
+        return sellers
+
+    def debt_rollup(self, group_by=ROLLUP_GROUPS):
+        """
+        Возвращает сводку одним запросом: задолженность, число продавцов и продуктов.
+
+        Число различных продуктов группы считается подзапросом по связям
+        продавец-продукт, чтобы соединение с продуктами не умножало сумму
+        задолженности. Продавцы без завода в сводку не входят, как и в таблицу
+        SellerDebtRollup.
+        """
+
+        sellers = self.filter(network_root__isnull=False)
+        links = self.model.products.through.objects.filter(
+            seller__in=sellers.values("pk")
+        )
+        return (
+            sellers.order_by()
+            .values(*group_by)
+            .annotate(
+                total_debt=Sum("debt"),
+                sellers_count=Count("pk"),
+                products_count=count_group_products(links, "seller__", group_by),
+            )
+            .order_by(*group_by)
+        )
+
+    def rebase_subtree(self, old_path, new_path, level_delta, root_id):
+        """Переносит всех потомков звена с путем old_path под путь new_path одним UPDATE."""
+
+        updated = (
+            self.filter(network_path__startswith=old_path)
+            .exclude(network_path=old_path)
+            .update(
+                network_path=Concat(
+                    Value(new_path),
+                    Substr("network_path", len(old_path) + 1),
+                    output_field=models.CharField(),
+                ),
+                trade_network_level=F("trade_network_level") + level_delta,
+                network_root_id=root_id,
+                updated_at=Now(),
+            )
+        )
+        if updated:
+            subtree_moved.send(sender=self.model, old_path=old_path, new_path=new_path)
+        return updated
+
 
 class Seller(models.Model):
     SELLER_TYPE_CHOICES = (
@@ -82,16 +234,393 @@ class Seller(models.Model):
         verbose_name="Дата создания",
         help_text="Укажите дату создания",
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name="Дата изменения",
+        help_text="Заполняется автоматически при изменении",
+    )
     seller_type = models.CharField(
         max_length=30,
         choices=SELLER_TYPE_CHOICES,
         verbose_name="Тип продавца",
         help_text="Укажите тип продавца",
     )
+    trade_network_level = models.PositiveIntegerField(
+        default=0,
+        db_index=True,
+        editable=False,
+        verbose_name="Уровень в торговой сети",
+        help_text="Рассчитывается автоматически по цепочке поставщиков",
+    )
+    network_root = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        related_name="network_members",
+        editable=False,
+        verbose_name="Завод",
+        help_text="Корневое звено цепочки поставок",
+        **NULLABLE,
+    )
+    network_path = models.CharField(
+        max_length=255,
+        default="",
+        db_index=True,
+        editable=False,
+        verbose_name="Путь в торговой сети",
+        help_text="Идентификаторы звеньев от завода до текущего, например «4/5/7/»",
+    )
+
+    objects = SellerQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_supplier_id = instance.__dict__.get("supplier_id")
+        instance._loaded_city = instance.__dict__.get("city")
+        return instance
+
+    def clean(self):
+        """Запрещает назначать поставщиком самого продавца или его покупателей."""
+
+        super().clean()
+        if self.pk is None or self.supplier_id is None:
+            return
+        supplier_path = (
+            Seller.objects.filter(pk=self.supplier_id)
+            .values_list("network_path", flat=True)
+            .first()
+        )
+        if self.supplier_id == self.pk or (
+            supplier_path is not None and f"/{self.pk}/" in f"/{supplier_path}"
+        ):
+            raise ValidationError({"supplier": SUPPLIER_CYCLE_MESSAGE})
+
+    def save(self, *args, **kwargs):
+        """Сохраняет продавца и пересчитывает положение в сети при смене поставщика."""
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not {"supplier", "supplier_id"} & set(
+            update_fields
+        ):
+            return super().save(*args, **kwargs)
+
+        supplier_changed = (
+            self._state.adding
+            or not self.network_path
+            or getattr(self, "_loaded_supplier_id", None) != self.supplier_id
+        )
+        if not supplier_changed:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic(using=kwargs.get("using")):
+            self._save_with_network_position(*args, **kwargs)
+
+    def _save_with_network_position(self, *args, **kwargs):
+        """Рассчитывает уровень, завод и путь от актуальных данных поставщика в БД."""
+
+        if self.supplier_id is not None:
+            supplier = (
+                Seller.objects.filter(pk=self.supplier_id)
+                .values("network_path", "network_root_id", "trade_network_level")
+                .get()
+            )
+            prefix = supplier["network_path"]
+            level = supplier["trade_network_level"] + 1
+            root_id = supplier["network_root_id"]
+        else:
+            prefix, level, root_id = "", 0, None
+
+        if self._state.adding:
+            self.trade_network_level = level
+            super().save(*args, **kwargs)
+            self.network_path = f"{prefix}{self.pk}/"
+            self.network_root_id = root_id or self.pk
+            Seller.objects.filter(pk=self.pk).update(
+                network_path=self.network_path, network_root_id=self.network_root_id
+            )
+        else:
+            old = (
+                Seller.objects.filter(pk=self.pk)
+                .values("network_path", "trade_network_level")
+                .get()
+            )
+            self.trade_network_level = level
+            self.network_path = f"{prefix}{self.pk}/"
+            self.network_root_id = root_id or self.pk
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = set(kwargs["update_fields"]) | {
+                    "trade_network_level",
+                    "network_path",
+                    "network_root",
+                }
+            super().save(*args, **kwargs)
+            if old["network_path"]:
+                Seller.objects.rebase_subtree(
+                    old["network_path"],
+                    self.network_path,
+                    level - old["trade_network_level"],
+                    self.network_root_id,
+                )
+
+        self._loaded_supplier_id = self.supplier_id
+
     class Meta:
         verbose_name = "Продавец"
         verbose_name_plural = "Продавцы"
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="seller_created_at_id_idx"),
+            # фильтр API по стране с сортировкой пагинации
+            models.Index(
+                fields=["country", "created_at", "id"],
+                name="seller_country_created_idx",
+            ),
+            # фильтры админки по городу и типу продавца
+            models.Index(fields=["city"], name="seller_city_idx"),
+            models.Index(fields=["seller_type", "city"], name="seller_type_city_idx"),
+            # триграммные GIN-индексы для поиска админки по name и email создаются
+            # миграцией 0012 только на PostgreSQL
+        ]
+        constraints = [
+            # проверяется в БД, поэтому конкурентные списания через F() не уводят
+            # задолженность в минус
+            models.CheckConstraint(
+                condition=Q(debt__gte=0), name="seller_debt_non_negative"
+            ),
+        ]
+
+
+class SellerDebtRollupQuerySet(models.QuerySet):
+    def regroup(self, group_by=ROLLUP_GROUPS):
+        """
+        Суммирует строки сводки по более крупным разрезам, как debt_rollup().
+
+        Различные продукты нельзя сложить по строкам, поэтому они считаются
+        по счетчикам SellerRollupProduct выбранных строк.
+        """
+
+        products = SellerRollupProduct.objects.filter(rollup__in=self.values("pk"))
+        rows = (
+            self.order_by()
+            .values(*group_by)
+            .annotate(
+                debt_sum=Sum("total_debt"),
+                sellers_sum=Sum("sellers_count"),
+                products_count=count_group_products(products, "rollup__", group_by),
+            )
+            .order_by(*group_by)
+        )
+        for row in rows:
+            row["total_debt"] = row.pop("debt_sum")
+            row["sellers_count"] = row.pop("sellers_sum")
+            yield row
+
+
+class SellerDebtRollup(models.Model):
+    """
+    Сводка задолженности по заводу, уровню и стране.
+
+    Обновляется сигналами: из строк вычитается учтенное состояние продавца
+    (SellerRollupState) и прибавляется текущее.
+    """
+
+    network_root = models.ForeignKey(
+        Seller,
+        on_delete=models.CASCADE,
+        related_name="debt_rollups",
+        verbose_name="Завод",
+    )
+    trade_network_level = models.PositiveIntegerField(
+        verbose_name="Уровень в торговой сети"
+    )
+    country = CountryField(verbose_name="Страна", **NULLABLE)
+    total_debt = models.DecimalField(
+        max_digits=18, decimal_places=2, verbose_name="Сумма задолженности"
+    )
+    sellers_count = models.PositiveIntegerField(verbose_name="Число продавцов")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата пересчета")
+
+    objects = SellerDebtRollupQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Сводка задолженности"
+        verbose_name_plural = "Сводки задолженности"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["network_root", "trade_network_level", "country"],
+                name="seller_debt_rollup_unique",
+            ),
+        ]
+
+
+class SellerRollupProduct(models.Model):
+    """Число продавцов строки сводки, у которых есть продукт."""
+
+    rollup = models.ForeignKey(
+        SellerDebtRollup,
+        on_delete=models.CASCADE,
+        related_name="products",
+        verbose_name="Строка сводки",
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Продукт",
+    )
+    sellers_count = models.PositiveIntegerField(verbose_name="Число продавцов")
+
+    class Meta:
+        verbose_name = "Продукт сводки задолженности"
+        verbose_name_plural = "Продукты сводки задолженности"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["rollup", "product"], name="seller_rollup_product_unique"
+            ),
+        ]
+
+
+class SellerRollupState(models.Model):
+    """
+    Состояние продавца, учтенное в сводке задолженности.
+
+    Хранится без внешнего ключа: после удаления продавца строка нужна, чтобы
+    вычесть его из сводки.
+    """
+
+    seller_id = models.BigIntegerField(primary_key=True, verbose_name="Продавец")
+    network_root_id = models.BigIntegerField(verbose_name="Завод")
+    trade_network_level = models.PositiveIntegerField(
+        verbose_name="Уровень в торговой сети"
+    )
+    country = CountryField(verbose_name="Страна", **NULLABLE)
+    debt = models.DecimalField(
+        max_digits=10, decimal_places=2, verbose_name="Задолженность"
+    )
+    products = models.JSONField(default=list, verbose_name="Продукты")
+
+    class Meta:
+        verbose_name = "Учтенное состояние продавца"
+        verbose_name_plural = "Учтенные состояния продавцов"
+
+
+class DebtAdjustment(models.Model):
+    """Запись журнала изменений задолженности продавца."""
+
+    PENDING = "pending"
+    APPLIED = "applied"
+    REJECTED = "rejected"
+    STATUS_CHOICES = (
+        (PENDING, "в очереди"),
+        (APPLIED, "применено"),
+        (REJECTED, "отклонено"),
+    )
+
+    seller = models.ForeignKey(
+        Seller,
+        on_delete=models.CASCADE,
+        related_name="debt_adjustments",
+        verbose_name="Продавец",
+    )
+    amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name="Сумма изменения",
+        help_text="Положительная сумма увеличивает задолженность, отрицательная уменьшает",
+    )
+    reason = models.CharField(
+        max_length=255, blank=True, default="", verbose_name="Основание"
+    )
+    external_id = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="Внешний id",
+        help_text="Ключ идемпотентности: повторная запись с тем же id не применяется",
+        **NULLABLE,
+    )
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING, verbose_name="Статус"
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        verbose_name="Автор",
+        **NULLABLE,
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    applied_at = models.DateTimeField(verbose_name="Дата применения", **NULLABLE)
+
+    def __str__(self):
+        return f"{self.seller_id}: {self.amount}"
+
+    class Meta:
+        verbose_name = "Изменение задолженности"
+        verbose_name_plural = "Изменения задолженности"
+        indexes = [
+            models.Index(
+                fields=["seller", "created_at", "id"], name="debt_seller_created_idx"
+            ),
+            # очередь воркеров: только записи в статусе pending
+            models.Index(
+                fields=["id"],
+                condition=Q(status="pending"),
+                name="debt_adjustment_pending_idx",
+            ),
+        ]
+
+
+class SellerBulkJob(models.Model):
+    """Фоновое задание админки, которое обрабатывает выбранных продавцов по частям."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (PENDING, "в очереди"),
+        (RUNNING, "выполняется"),
+        (DONE, "завершено"),
+        (CANCELLED, "отменено"),
+        (FAILED, "ошибка"),
+    )
+
+    action = models.CharField(max_length=50, verbose_name="Действие")
+    params = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Параметры выборки",
+        help_text="Фильтры и поиск списка продавцов в админке, выборка собирается по ним",
+    )
+    last_pk = models.BigIntegerField(
+        default=0,
+        verbose_name="Последний обработанный id",
+        help_text="Продолжение задания начинается со следующего id",
+    )
+    total = models.PositiveIntegerField(default=0, verbose_name="Всего продавцов")
+    processed = models.PositiveIntegerField(default=0, verbose_name="Обработано")
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING, verbose_name="Статус"
+    )
+    error = models.TextField(blank=True, default="", verbose_name="Ошибка")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        verbose_name="Автор",
+        **NULLABLE,
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата изменения")
+    finished_at = models.DateTimeField(verbose_name="Дата завершения", **NULLABLE)
+
+    def __str__(self):
+        return f"{self.action} #{self.pk}"
+
+    class Meta:
+        verbose_name = "Фоновое задание"
+        verbose_name_plural = "Фоновые задания"
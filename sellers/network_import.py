@@ -0,0 +1,84 @@
+import json
+import os
+
+JSON_READ_SIZE = 1 << 16
+
+
+def iter_json_records(path):
+    """
+    Потоково читает записи из JSON-массива (формат фикстур) или NDJSON-файла.
+
+    Файл не загружается в память целиком: массив разбирается по одному объекту.
+    """
+
+    with open(path, encoding="utf-8") as file:
+        head = file.read(JSON_READ_SIZE)
+        if head.lstrip().startswith("["):
+            yield from _iter_json_array(file, head.lstrip()[1:])
+            return
+
+        lines = (head + file.readline()).splitlines()
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _iter_json_array(file, buffer):
+    decoder = json.JSONDecoder()
+    while True:
+        buffer = buffer.lstrip().removeprefix(",").lstrip()
+        if buffer.startswith("]"):
+            return
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            chunk = file.read(JSON_READ_SIZE)
+            if not chunk:
+                raise
+            buffer += chunk
+            continue
+        yield record
+        buffer = buffer[end:]
+
+
+def normalize_record(record, read_only_fields=()):
+    """
+    Приводит запись к паре (pk, поля).
+
+    Поддерживаются записи фикстур {"model", "pk", "fields"} и плоские строки
+    выгрузки export_sellers, из которых отбрасываются поля только для чтения.
+    """
+
+    if "fields" in record:
+        return record["pk"], dict(record["fields"])
+    fields = {
+        name: value
+        for name, value in record.items()
+        if name != "id" and name not in read_only_fields
+    }
+    return record["id"], fields
+
+
+class Checkpoint:
+    """Состояние импорта, сохраняемое после каждой записанной порции."""
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.state = {"products": 0, "sellers_level": 0, "sellers": 0}
+        if resume and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.state.update(json.load(file))
+
+    def save(self, **changes):
+        self.state.update(changes)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.state, file)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
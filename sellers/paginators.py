@@ -0,0 +1,46 @@
+from config.pagination import KeysetCursorPagination
+
+
+class SellerCursorPagination(KeysetCursorPagination):
+    """
+    Постраничный вывод продавцов по курсору (created_at, id).
+
+    К сортировке из ?ordering= добавляется id, курсор хранит значения всех
+    полей сортировки, поэтому продавцы с одинаковым значением поля не
+    пропускаются и не повторяются.
+    """
+
+    ordering = ("created_at", "id")
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class SellerDescendantsCursorPagination(SellerCursorPagination):
+    """
+    Покупатели продавца по курсору (trade_network_level, id).
+
+    Покупатели выводятся уровень за уровнем, поэтому ?ordering= не применяется.
+    """
+
+    ordering = ("trade_network_level", "id")
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+
+class DebtAdjustmentCursorPagination(KeysetCursorPagination):
+    """
+    Журнал изменений задолженности по курсору (-created_at, -id).
+
+    Порядок не зависит от ?ordering= вьюсета продавцов: его поля относятся
+    к продавцу, а не к записи журнала.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
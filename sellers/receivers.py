@@ -0,0 +1,136 @@
+from django.db.models.functions import Now
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from config.cache import bump_versions
+from products.models import Product
+from sellers.models import Seller
+from sellers.rollups import schedule_rollup_refresh
+from sellers.signals import sellers_updated, subtree_moved
+
+CACHE_NAMESPACE = "sellers"
+# версия значений фильтра по городу в админке: меняется реже версии таблицы
+CITY_CACHE_NAMESPACE = "seller-cities"
+
+
+@receiver(post_delete, sender=Seller)
+def detach_subtree(sender, instance, **kwargs):
+    """После удаления звена его прямые покупатели становятся заводами своих цепочек."""
+
+    if not instance.network_path:
+        return
+
+    children = list(
+        Seller.objects.filter(
+            network_path__startswith=instance.network_path,
+            trade_network_level=instance.trade_network_level + 1,
+        ).values_list("pk", "network_path")
+    )
+    for pk, path in children:
+        Seller.objects.filter(pk=pk).update(
+            trade_network_level=0,
+            network_root_id=pk,
+            network_path=f"{pk}/",
+            updated_at=Now(),
+        )
+        Seller.objects.rebase_subtree(
+            path, f"{pk}/", -(instance.trade_network_level + 1), pk
+        )
+    if children:
+        sellers_updated.send(sender=Seller, pks=[pk for pk, _ in children])
+
+
+@receiver(post_save, sender=Seller)
+@receiver(post_delete, sender=Seller)
+def invalidate_seller(sender, instance, **kwargs):
+    """Сбрасывает кэш списка продавцов и измененного продавца."""
+
+    bump_versions(CACHE_NAMESPACE, [instance.pk])
+
+
+@receiver(sellers_updated, sender=Seller)
+def invalidate_sellers(sender, pks, **kwargs):
+    """Сбрасывает кэш после массовых изменений продавцов."""
+
+    bump_versions(CACHE_NAMESPACE, pks)
+
+
+@receiver(post_save, sender=Seller)
+def invalidate_saved_city(sender, instance, created, **kwargs):
+    """Сбрасывает значения фильтра по городу при новом продавце или смене города."""
+
+    if created or getattr(instance, "_loaded_city", None) != instance.city:
+        bump_versions(CITY_CACHE_NAMESPACE)
+    instance._loaded_city = instance.city
+
+
+@receiver(post_delete, sender=Seller)
+def invalidate_deleted_city(sender, instance, **kwargs):
+    """Сбрасывает значения фильтра по городу после удаления продавца."""
+
+    bump_versions(CITY_CACHE_NAMESPACE)
+
+
+@receiver(sellers_updated, sender=Seller)
+def invalidate_updated_cities(sender, pks, fields=None, **kwargs):
+    """Сбрасывает значения фильтра по городу, если массовое изменение могло их затронуть."""
+
+    if fields is None or "city" in fields:
+        bump_versions(CITY_CACHE_NAMESPACE)
+
+
+@receiver(post_save, sender=Seller)
+@receiver(post_delete, sender=Seller)
+def refresh_seller_rollup(sender, instance, **kwargs):
+    """Переносит в сводку задолженности изменение или удаление продавца."""
+
+    schedule_rollup_refresh([instance.pk])
+
+
+@receiver(sellers_updated, sender=Seller)
+def refresh_sellers_rollup(sender, pks, **kwargs):
+    """Переносит в сводку массовые изменения продавцов."""
+
+    schedule_rollup_refresh(pks)
+
+
+@receiver(subtree_moved, sender=Seller)
+def invalidate_moved_subtree(sender, new_path, **kwargs):
+    """Сбрасывает кэш и сводку потомков, у которых после переноса изменился уровень."""
+
+    pks = list(
+        Seller.objects.filter(network_path__startswith=new_path).values_list(
+            "pk", flat=True
+        )
+    )
+    bump_versions(CACHE_NAMESPACE, pks)
+    schedule_rollup_refresh(pks)
+
+
+def touch_sellers(pks):
+    """Обновляет дату изменения и сбрасывает кэш продавцов, измененных в обход save()."""
+
+    pks = list(pks)
+    Seller.objects.filter(pk__in=pks).update(updated_at=Now())
+    bump_versions(CACHE_NAMESPACE, pks)
+    schedule_rollup_refresh(pks)
+
+
+@receiver(m2m_changed, sender=Seller.products.through)
+def touch_seller_products(sender, instance, action, reverse, pk_set, **kwargs):
+    """Отмечает изменение продавцов, у которых изменился список продуктов."""
+
+    if not reverse:
+        if action.startswith("post_"):
+            touch_sellers([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        touch_sellers(pk_set)
+    elif action == "pre_clear":
+        touch_sellers(instance.products.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Product)
+def touch_product_sellers(sender, instance, **kwargs):
+    """Отмечает изменение продавцов, из которых каскадно удаляется продукт."""
+
+    touch_sellers(instance.products.values_list("pk", flat=True))
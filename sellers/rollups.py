@@ -0,0 +1,260 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import partial
+
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Now
+
+from sellers.models import (
+    ROLLUP_GROUPS,
+    Seller,
+    SellerDebtRollup,
+    SellerRollupProduct,
+    SellerRollupState,
+)
+
+_state = threading.local()
+
+# Поля строки сводки, по которым она находится для продавца
+GROUP_FIELDS = ("network_root_id", "trade_network_level", "country")
+
+
+def get_seller_states(queryset, state_model=SellerRollupState):
+    """Возвращает текущие состояния продавцов queryset, у которых есть завод."""
+
+    states = {
+        row["pk"]: state_model(
+            seller_id=row["pk"],
+            network_root_id=row["network_root_id"],
+            trade_network_level=row["trade_network_level"],
+            country=row["country"],
+            debt=row["debt"],
+            products=[],
+        )
+        for row in queryset.filter(network_root__isnull=False).values(
+            "pk", "network_root_id", *GROUP_FIELDS[1:], "debt"
+        )
+    }
+    links = (
+        queryset.model.products.through.objects.filter(seller_id__in=states)
+        .order_by("seller_id", "product_id")
+        .values_list("seller_id", "product_id")
+    )
+    for seller_id, product_id in links:
+        states[seller_id].products.append(product_id)
+    return states
+
+
+def group_sort_key(group):
+    root_id, level, country = group
+    return root_id, level, country or ""
+
+
+def apply_rollup_deltas(deltas, product_deltas):
+    """
+    Прибавляет к строкам сводки изменения задолженности, продавцов и продуктов.
+
+    Строки меняются UPDATE с F() в порядке групп, отсутствующие создаются
+    только для прибавления. Строки, в которых не осталось продавцов или
+    продавцов с продуктом, удаляются.
+    """
+
+    for group in sorted(deltas, key=group_sort_key):
+        debt, count = deltas[group]
+        lookup = dict(zip(GROUP_FIELDS, group))
+        if count > 0:
+            SellerDebtRollup.objects.get_or_create(
+                **lookup, defaults={"total_debt": 0, "sellers_count": 0}
+            )
+        if debt or count:
+            SellerDebtRollup.objects.filter(**lookup).update(
+                total_debt=F("total_debt") + debt,
+                sellers_count=F("sellers_count") + count,
+                updated_at=Now(),
+            )
+
+    rollup_ids = {}
+    for group in {group for group, _ in product_deltas}:
+        rollup_ids[group] = (
+            SellerDebtRollup.objects.filter(**dict(zip(GROUP_FIELDS, group)))
+            .values_list("pk", flat=True)
+            .first()
+        )
+    by_delta = defaultdict(list)
+    for (group, product_id), delta in product_deltas.items():
+        if delta and rollup_ids[group] is not None:
+            by_delta[rollup_ids[group], delta].append(product_id)
+    SellerRollupProduct.objects.bulk_create(
+        [
+            SellerRollupProduct(
+                rollup_id=rollup_id, product_id=product_id, sellers_count=0
+            )
+            for (rollup_id, delta), product_ids in by_delta.items()
+            if delta > 0
+            for product_id in product_ids
+        ],
+        ignore_conflicts=True,
+    )
+    for (rollup_id, delta), product_ids in sorted(by_delta.items()):
+        SellerRollupProduct.objects.filter(
+            rollup_id=rollup_id, product_id__in=sorted(product_ids)
+        ).update(sellers_count=F("sellers_count") + delta)
+
+    touched = {rollup_id for rollup_id, _ in by_delta}
+    SellerRollupProduct.objects.filter(rollup_id__in=touched, sellers_count=0).delete()
+    for group in sorted(deltas, key=group_sort_key):
+        SellerDebtRollup.objects.filter(
+            **dict(zip(GROUP_FIELDS, group)), sellers_count=0
+        ).delete()
+
+
+def refresh_for_sellers(pks):
+    """
+    Применяет к сводке изменения продавцов pks.
+
+    Из строк сводки вычитается учтенное состояние продавца и прибавляется
+    текущее, поэтому пересчет не зависит от размера цепочки. Продавцы
+    и их состояния блокируются, чтобы параллельный пересчет того же продавца
+    не учел изменение дважды; строки сводки блокируются только на время UPDATE.
+    """
+
+    pks = sorted(set(pks))
+    if not pks:
+        return
+    with transaction.atomic():
+        list(
+            Seller.objects.select_for_update()
+            .filter(pk__in=pks)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        old_states = {
+            state.pk: state
+            for state in SellerRollupState.objects.select_for_update()
+            .filter(pk__in=pks)
+            .order_by("pk")
+        }
+        new_states = get_seller_states(Seller.objects.filter(pk__in=pks))
+
+        deltas = defaultdict(lambda: [0, 0])
+        product_deltas = defaultdict(int)
+        for states, sign in ((old_states, -1), (new_states, 1)):
+            for state in states.values():
+                group = tuple(getattr(state, name) for name in GROUP_FIELDS)
+                deltas[group][0] += sign * state.debt
+                deltas[group][1] += sign
+                for product_id in state.products:
+                    product_deltas[group, product_id] += sign
+        apply_rollup_deltas(deltas, product_deltas)
+
+        SellerRollupState.objects.filter(
+            pk__in=set(old_states) - set(new_states)
+        ).delete()
+        SellerRollupState.objects.bulk_create(
+            new_states.values(),
+            update_conflicts=True,
+            unique_fields=["seller_id"],
+            update_fields=[*GROUP_FIELDS, "debt", "products"],
+        )
+
+
+def rebuild_debt_rollups(chunk_size=1000, apps=global_apps):
+    """
+    Полностью пересчитывает сводку задолженности и учтенные состояния продавцов.
+
+    Миграция передает в apps реестр исторических моделей.
+    """
+
+    seller_model = apps.get_model("sellers", "Seller")
+    rollup_model = apps.get_model("sellers", "SellerDebtRollup")
+    state_model = apps.get_model("sellers", "SellerRollupState")
+    product_model = apps.get_model("sellers", "SellerRollupProduct")
+    through_model = seller_model.products.through
+
+    with transaction.atomic():
+        state_model.objects.all().delete()
+        rollup_model.objects.all().delete()
+        rollups = rollup_model.objects.bulk_create(
+            (
+                rollup_model(network_root_id=row.pop("network_root"), **row)
+                for row in seller_model.objects.filter(network_root__isnull=False)
+                .order_by()
+                .values(*ROLLUP_GROUPS)
+                .annotate(total_debt=Sum("debt"), sellers_count=Count("pk"))
+            ),
+            batch_size=chunk_size,
+        )
+        rollup_ids = {
+            tuple(getattr(rollup, name) for name in GROUP_FIELDS): rollup.pk
+            for rollup in rollups
+        }
+        product_groups = [f"seller__{name}" for name in ROLLUP_GROUPS]
+        product_model.objects.bulk_create(
+            (
+                product_model(
+                    rollup_id=rollup_ids[tuple(row[name] for name in product_groups)],
+                    product_id=row["product_id"],
+                    sellers_count=row["sellers_count"],
+                )
+                for row in through_model.objects.filter(
+                    seller__network_root__isnull=False
+                )
+                .order_by()
+                .values(*product_groups, "product_id")
+                .annotate(sellers_count=Count("seller_id"))
+            ),
+            batch_size=chunk_size,
+        )
+
+        last_pk = 0
+        while True:
+            pks = list(
+                seller_model.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size]
+            )
+            if not pks:
+                break
+            states = get_seller_states(
+                seller_model.objects.filter(pk__in=pks), state_model
+            )
+            state_model.objects.bulk_create(states.values())
+            last_pk = pks[-1]
+
+
+def schedule_rollup_refresh(pks=()):
+    """
+    Планирует применение изменений продавцов к сводке после фиксации транзакции.
+
+    Внутри deferred_rollup_refresh пересчет откладывается до выхода из блока.
+    Без SELLERS_DEBT_ROLLUP_TABLE ничего не делает.
+    """
+
+    if not settings.SELLERS_DEBT_ROLLUP_TABLE:
+        return
+    deferred = getattr(_state, "deferred", None)
+    if deferred is not None:
+        deferred.update(pks)
+        return
+    transaction.on_commit(partial(refresh_for_sellers, list(pks)))
+
+
+@contextmanager
+def deferred_rollup_refresh():
+    """
+    Откладывает пересчет сводки до конца блока, например на время загрузки.
+
+    Если за блок изменились продавцы, сводка перестраивается один раз целиком.
+    """
+
+    _state.deferred = deferred = set()
+    try:
+        yield
+    finally:
+        _state.deferred = None
+    if deferred:
+        rebuild_debt_rollups()
@@ -0,0 +1,14 @@
+from rest_framework.routers import Route, SimpleRouter
+
+
+class BulkRouter(SimpleRouter):
+    """Роутер, который дополнительно направляет PATCH на список в bulk_partial_update."""
+
+    routes = [
+        (
+            route._replace(mapping={**route.mapping, "patch": "bulk_partial_update"})
+            if isinstance(route, Route) and route.name == "{basename}-list"
+            else route
+        )
+        for route in SimpleRouter.routes
+    ]
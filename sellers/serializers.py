@@ -1,29 +1,253 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
 from rest_framework import serializers
-from rest_framework.fields import SerializerMethodField
 
-from sellers.models import Seller
+from config.sparse_fields import SparseFieldsetSerializerMixin
+from sellers.debts import EXTERNAL_ID_CONFLICT_MESSAGE, find_external_id_conflicts
+from sellers.models import SUPPLIER_CYCLE_MESSAGE, DebtAdjustment, Seller
+from sellers.signals import sellers_updated
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Кэширует найденные объекты в контексте, чтобы пакет не запрашивал один id повторно."""
+
+    def to_internal_value(self, data):
+        cache = self.context.setdefault("related_objects", {})
+        key = (self.get_queryset().model, str(data))
+        if key not in cache:
+            cache[key] = super().to_internal_value(data)
+        return cache[key]
+
+
+class SupplierValidationMixin:
+    def validate_supplier(self, supplier):
+        """Запрещает назначать поставщиком самого продавца или его покупателей."""
+
+        if (
+            supplier is not None
+            and self.instance is not None
+            and f"/{self.instance.pk}/" in f"/{supplier.network_path}"
+        ):
+            raise serializers.ValidationError(SUPPLIER_CYCLE_MESSAGE)
+        return supplier
+
+
+class SellerBulkCreateListSerializer(serializers.ListSerializer):
+    """Создает пакет продавцов и их связи с продуктами в одной транзакции."""
+
+    def create(self, validated_data):
+        sellers, links = [], []
+        with transaction.atomic():
+            for item in validated_data:
+                products = item.pop("products", [])
+                sellers.append(Seller(**item))
+                links.append(products)
+            Seller.objects.bulk_create_in_network(sellers)
+            Seller.products.through.objects.bulk_create(
+                Seller.products.through(seller_id=seller.pk, product_id=product.pk)
+                for seller, products in zip(sellers, links)
+                for product in products
+            )
+        prefetch_related_objects(sellers, "products")
+        return sellers
+
+
+class SellerBulkUpdateListSerializer(serializers.ListSerializer):
+    """Частично обновляет пакет продавцов, найденных по id, в одной транзакции."""
+
+    def run_child_validation(self, data):
+        sellers = {seller.pk: seller for seller in self.instance}
+        try:
+            self.child.instance = sellers[int(data["id"])]
+        except (KeyError, TypeError, ValueError):
+            raise serializers.ValidationError({"id": ["Продавец не найден."]})
+        self.child.initial_data = data
+        validated = super().run_child_validation(data)
+        validated["id"] = self.child.instance.pk
+        return validated
+
+    def validate(self, attrs):
+        """
+        Запрещает циклы поставок, которые образует пакет целиком.
+
+        Каждый элемент проверяется по путям в БД, но пакет может поменять
+        поставщиков у нескольких продавцов сразу: A -> B и B -> A по отдельности
+        допустимы. Поэтому цепочка поставщиков проходится по путям из БД,
+        а у продавцов пакета — по их новым поставщикам.
+        """
+
+        suppliers = {
+            item["id"]: item["supplier"] for item in attrs if "supplier" in item
+        }
+        cycles = sorted(pk for pk in suppliers if self.reaches(pk, suppliers))
+        if cycles:
+            raise serializers.ValidationError(
+                {"supplier": [f"{SUPPLIER_CYCLE_MESSAGE} Продавцы: {cycles}."]}
+            )
+        return attrs
+
+    @staticmethod
+    def reaches(pk, suppliers):
+        """Проверяет, встречается ли продавец pk в новой цепочке своих поставщиков."""
+
+        supplier, visited = suppliers[pk], set()
+        while supplier is not None and supplier.pk not in visited:
+            visited.add(supplier.pk)
+            # сам поставщик и его предки вверх до завода; пути нет — только он
+            path = [int(part) for part in supplier.network_path.split("/")[:-1]]
+            ancestors = path[::-1] or [supplier.pk]
+            next_supplier = None
+            for ancestor in ancestors:
+                if ancestor == pk:
+                    return True
+                if ancestor in suppliers:
+                    next_supplier = suppliers[ancestor]
+                    break
+            supplier = next_supplier
+        return False
+
+    def update(self, instances, validated_data):
+        """
+        Записывает каждому продавцу только переданные для него поля.
+
+        Продавцы группируются по набору полей: один bulk_update на все поля пакета
+        перезаписал бы непереданные поля значениями, прочитанными до транзакции.
+        """
 
+        sellers = {seller.pk: seller for seller in instances}
+        updated, groups, product_sets = [], defaultdict(list), {}
+        now = timezone.now()
+        with transaction.atomic():
+            for item in validated_data:
+                seller = sellers[item.pop("id")]
+                products = item.pop("products", None)
+                if products is not None:
+                    product_sets[seller.pk] = products
+                for attr, value in item.items():
+                    setattr(seller, attr, value)
+                seller.updated_at = now
+                updated.append(seller)
 
-class SellerSerializer(serializers.ModelSerializer):
-    trade_network_level = SerializerMethodField(read_only=True)
+                fields = frozenset(item) | {"updated_at"}
+                if seller.supplier_id != seller._loaded_supplier_id:
+                    # смена поставщика пересчитывает положение всей ветки сети
+                    seller.save(update_fields=fields)
+                else:
+                    groups[fields].append(seller)
 
-    def get_trade_network_level(self, seller):
-        """Возвращает уровень в иерархии поставщиков, где 0 - это завод, 1 - следующее звено в цепочке поставок."""
+            for fields, group in groups.items():
+                Seller.objects.bulk_update(group, sorted(fields))
+            if product_sets:
+                through_model = Seller.products.through
+                through_model.objects.filter(seller_id__in=product_sets).delete()
+                through_model.objects.bulk_create(
+                    through_model(seller_id=pk, product_id=product.pk)
+                    for pk, products in product_sets.items()
+                    for product in products
+                )
+            sellers_updated.send(
+                sender=Seller,
+                pks=[seller.pk for seller in updated],
+                fields=sorted(set().union(*validated_data)),
+            )
+        prefetch_related_objects(updated, "products")
+        return updated
 
-        if seller.supplier:
-            if seller.supplier.supplier:
-                return 2
-            return 1
-        return 0
+
+class SellerSerializer(
+    SparseFieldsetSerializerMixin, SupplierValidationMixin, serializers.ModelSerializer
+):
+    """
+    Сериалайзер продавца.
+
+    Уровень в иерархии поставщиков (0 - завод, 1 - следующее звено в цепочке
+    поставок) хранится в модели и обновляется при смене поставщика.
+    Параметр ?fields= ограничивает набор полей в ответе.
+    """
+
+    serializer_related_field = CachedPrimaryKeyRelatedField
 
     class Meta:
         model = Seller
-        fields = "__all__"
+        exclude = ("network_root", "network_path", "updated_at")
+        list_serializer_class = SellerBulkCreateListSerializer
 
 
-class SellerUpdateSerializer(serializers.ModelSerializer):
+class SellerUpdateSerializer(SupplierValidationMixin, serializers.ModelSerializer):
     """Сериалайзер для обновлений. Запрещает обновление через API поля «Задолженность перед поставщиком»."""
 
+    serializer_related_field = CachedPrimaryKeyRelatedField
+
     class Meta:
         model = Seller
-        exclude = ("debt",)
+        exclude = ("debt", "network_root", "network_path", "updated_at")
+        list_serializer_class = SellerBulkUpdateListSerializer
+
+
+class SellerDebtRollupSerializer(serializers.Serializer):
+    """Сериалайзер строки сводки задолженности. Поля вне группировки не выводятся."""
+
+    network_root = serializers.IntegerField(required=False)
+    trade_network_level = serializers.IntegerField(required=False)
+    country = serializers.CharField(required=False, allow_null=True)
+    total_debt = serializers.DecimalField(max_digits=18, decimal_places=2)
+    sellers_count = serializers.IntegerField()
+    products_count = serializers.IntegerField()
+
+
+class DebtAdjustmentSerializer(serializers.ModelSerializer):
+    """Сериалайзер записи журнала изменений задолженности."""
+
+    class Meta:
+        model = DebtAdjustment
+        fields = (
+            "id",
+            "seller",
+            "amount",
+            "reason",
+            "external_id",
+            "status",
+            "created_at",
+            "applied_at",
+        )
+        read_only_fields = ("seller", "status", "created_at", "applied_at")
+        # повтор с известным external_id возвращает уже созданную запись
+        extra_kwargs = {"external_id": {"validators": []}}
+
+    def validate_amount(self, amount):
+        if not amount:
+            raise serializers.ValidationError("Сумма изменения не может быть нулевой.")
+        return amount
+
+
+class DebtAdjustmentQueueListSerializer(serializers.ListSerializer):
+    """Проверяет существование всех продавцов пакета одним запросом."""
+
+    def validate(self, attrs):
+        seller_ids = {item["seller_id"] for item in attrs}
+        missing = seller_ids - set(
+            Seller.objects.filter(pk__in=seller_ids).values_list("pk", flat=True)
+        )
+        if missing:
+            raise serializers.ValidationError(
+                {"seller": [f"Продавцы не найдены: {sorted(missing)}."]}
+            )
+        conflicts = find_external_id_conflicts(attrs)
+        if conflicts:
+            raise serializers.ValidationError(
+                {"external_id": [f"{EXTERNAL_ID_CONFLICT_MESSAGE} {conflicts}"]}
+            )
+        return attrs
+
+
+class DebtAdjustmentQueueSerializer(DebtAdjustmentSerializer):
+    """Сериалайзер изменения задолженности, которое ставится в очередь."""
+
+    seller = serializers.IntegerField(source="seller_id", min_value=1)
+
+    class Meta(DebtAdjustmentSerializer.Meta):
+        read_only_fields = ("status", "created_at", "applied_at")
+        list_serializer_class = DebtAdjustmentQueueListSerializer
@@ -0,0 +1,63 @@
+from collections import defaultdict
+
+
+def build_network_positions(links, known_positions=None):
+    """
+    Рассчитывает положение звеньев в сети по парам (id, id поставщика).
+
+    Возвращает словарь {id: (уровень, id завода, путь)}. В known_positions можно
+    передать уже известные положения поставщиков, которых нет среди links. Звенья,
+    входящие в цикл или ссылающиеся на неизвестного поставщика, в результат не попадают.
+    """
+
+    children = defaultdict(list)
+    roots = []
+    for pk, supplier_id in links:
+        if supplier_id is None:
+            roots.append(pk)
+        else:
+            children[supplier_id].append(pk)
+
+    positions = {}
+    stack = [(pk, 0, pk, "") for pk in roots]
+    for pk, (level, root_id, path) in (known_positions or {}).items():
+        stack.extend((child, level + 1, root_id, path) for child in children[pk])
+    while stack:
+        pk, level, root_id, prefix = stack.pop()
+        path = f"{prefix}{pk}/"
+        positions[pk] = (level, root_id, path)
+        stack.extend((child, level + 1, root_id, path) for child in children[pk])
+    return positions
+
+
+def rebuild_network(seller_model, batch_size=1000):
+    """Пересчитывает уровень, завод и путь для всех продавцов. Возвращает число обновленных строк."""
+
+    links = seller_model.objects.values_list("pk", "supplier_id").iterator(
+        chunk_size=batch_size
+    )
+    positions = build_network_positions(links)
+
+    updated = 0
+    batch = []
+    for pk, (level, root_id, path) in positions.items():
+        batch.append(
+            seller_model(
+                pk=pk,
+                trade_network_level=level,
+                network_root_id=root_id,
+                network_path=path,
+            )
+        )
+        if len(batch) >= batch_size:
+            updated += _update_positions(seller_model, batch)
+            batch = []
+    if batch:
+        updated += _update_positions(seller_model, batch)
+    return updated
+
+
+def _update_positions(seller_model, batch):
+    return seller_model.objects.bulk_update(
+        batch, ["trade_network_level", "network_root", "network_path"]
+    )
@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# Отправляется после переноса ветки сети одним UPDATE: аргументы old_path и new_path.
+subtree_moved = Signal()
+
+# Отправляется после массовых изменений в обход Seller.save(): аргумент pks
+# и необязательный fields — измененные поля, если они известны. Пустой fields
+# означает, что поля продавцов не менялись, а изменились связанные записи.
+sellers_updated = Signal()
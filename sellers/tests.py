@@ -1,9 +1,81 @@
+import asyncio
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+from unittest import skipUnless
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import DataError, IntegrityError, connection, connections
+from django.db.backends.signals import connection_created
+from django.db.migrations.loader import MigrationLoader
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from django_countries.fields import Country
 from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.request import Request
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 
+from config.admin_tools import EstimatedCountPaginator
+from config.benchmark import (
+    compare_renderers,
+    compare_with_baseline,
+    load_baseline,
+    run_load,
+    save_baseline,
+)
+from config.db_routers import PIN_COOKIE, ReplicaRouter, pin_key
+from config.metrics import metrics_view, registry
+from config.nplusone import (
+    NPlusOneDetector,
+    NPlusOneError,
+    assert_queries_do_not_grow,
+)
+from config.parsers import OrjsonParser
+from config.renderers import OrjsonRenderer, StdlibJSONRenderer
+from config.throttling import TokenBucketThrottle
 from products.models import Product
-from sellers.models import Seller
+from sellers.benchmark import (
+    build_seller_payload,
+    run_benchmarks,
+    run_concurrent_adjustments,
+    seed_network,
+)
+from sellers.debts import (
+    DEBT_OVERFLOW_MESSAGE,
+    adjust_debt,
+    apply_pending_adjustments,
+    clear_debts,
+)
+from sellers.jobs import JOB_ACTIONS, resume_jobs, run_job, start_job
+from sellers.models import (
+    DebtAdjustment,
+    Seller,
+    SellerBulkJob,
+    SellerDebtRollup,
+    SellerRollupState,
+)
+from sellers.paginators import SellerCursorPagination
+from sellers.rollups import rebuild_debt_rollups, refresh_for_sellers
+from sellers.serializers import SellerUpdateSerializer
+from sellers.views import SellerViewSet
 from users.models import User
 
 
@@ -113,7 +185,7 @@ class SellerTestCase(APITestCase):
         ]
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(data, result)
+        self.assertEqual(data["results"], result)
 
     # # Тесты для обычного пользователя
     def test_seller_retrieve_regular_user(self):
@@ -194,7 +266,7 @@ class SellerTestCase(APITestCase):
         ]
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(data, result)
+        self.assertEqual(data["results"], result)
 
     # Тесты для анонимного пользователя
     def test_seller_retrieve_anonymous_user_access(self):
@@ -244,3 +316,2210 @@ class SellerTestCase(APITestCase):
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SellerNetworkTestCase(APITestCase):
+    """Класс для тестирования положения продавцов в торговой сети."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        self.user = User.objects.create(email="user@email.com")
+        self.factory = Seller.objects.create(name="factory", seller_type="factory")
+        self.retail = Seller.objects.create(
+            name="retail", seller_type="retail network", supplier=self.factory
+        )
+        self.entrepreneur = Seller.objects.create(
+            name="entrepreneur",
+            seller_type="individual entrepreneur",
+            supplier=self.retail,
+        )
+
+    def test_network_position_on_create(self):
+        """Тестирует расчет уровня, завода и пути при создании."""
+
+        self.entrepreneur.refresh_from_db()
+
+        self.assertEqual(self.entrepreneur.trade_network_level, 2)
+        self.assertEqual(self.entrepreneur.network_root_id, self.factory.pk)
+        self.assertEqual(
+            self.entrepreneur.network_path,
+            f"{self.factory.pk}/{self.retail.pk}/{self.entrepreneur.pk}/",
+        )
+
+    def test_supplier_change_cascades_to_descendants(self):
+        """Тестирует пересчет потомков при смене поставщика."""
+
+        self.retail.supplier = None
+        self.retail.save()
+        self.entrepreneur.refresh_from_db()
+
+        self.assertEqual(self.entrepreneur.trade_network_level, 1)
+        self.assertEqual(self.entrepreneur.network_root_id, self.retail.pk)
+        self.assertEqual(
+            self.entrepreneur.network_path, f"{self.retail.pk}/{self.entrepreneur.pk}/"
+        )
+
+    def test_supplier_delete_detaches_descendants(self):
+        """Тестирует пересчет потомков при удалении поставщика."""
+
+        self.factory.delete()
+        self.entrepreneur.refresh_from_db()
+
+        self.assertEqual(self.entrepreneur.trade_network_level, 1)
+        self.assertEqual(self.entrepreneur.network_root_id, self.retail.pk)
+
+    def test_supplier_cycle_forbidden(self):
+        """Тестирует запрет назначения покупателя поставщиком."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-detail", args=(self.factory.pk,))
+        response = self.client.patch(url, {"supplier": self.entrepreneur.pk})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_supplier_cycle_in_batch_forbidden(self):
+        """Тестирует запрет цикла, который образуют несколько элементов пакета."""
+
+        self.client.force_authenticate(user=self.user)
+        other = Seller.objects.create(name="other", seller_type="factory")
+        data = [
+            {"id": self.factory.pk, "supplier": other.pk},
+            {"id": other.pk, "supplier": self.entrepreneur.pk},
+        ]
+        response = self.client.patch(
+            reverse("sellers:seller-list"), data, format="json"
+        )
+        self.factory.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(str([self.factory.pk, other.pk]), str(response.json()))
+        self.assertIsNone(self.factory.supplier_id)
+
+    def test_supplier_cycle_clean(self):
+        """Тестирует проверку цикла поставок в Seller.clean() для форм админки."""
+
+        self.factory.supplier = self.entrepreneur
+
+        with self.assertRaises(ValidationError) as context:
+            self.factory.clean()
+
+        self.assertIn("supplier", context.exception.message_dict)
+
+    def test_seller_list_query_count(self):
+        """Тестирует, что число запросов списка не зависит от числа продавцов."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-list")
+
+        # продавцы и их продукты
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {"trade_network_level": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [seller["id"] for seller in response.json()["results"]],
+            [self.entrepreneur.pk],
+        )
+
+    def test_seller_descendants(self):
+        """Тестирует получение покупателей продавца."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-descendants", args=(self.factory.pk,))
+        response = self.client.get(url)
+        limited_response = self.client.get(url, {"depth": 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [seller["id"] for seller in response.json()["results"]],
+            [self.retail.pk, self.entrepreneur.pk],
+        )
+        self.assertEqual(
+            [seller["id"] for seller in limited_response.json()["results"]],
+            [self.retail.pk],
+        )
+
+    def test_seller_descendants_ordered_by_level(self):
+        """Тестирует вывод покупателей по уровням на всех страницах курсора."""
+
+        other_retail = Seller.objects.create(
+            name="other retail", seller_type="retail network", supplier=self.factory
+        )
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-descendants", args=(self.factory.pk,))
+
+        first_page = self.client.get(
+            url, {"page_size": 2, "ordering": "-trade_network_level"}
+        ).json()
+        second_page = self.client.get(first_page["next"]).json()
+
+        self.assertEqual(
+            [seller["id"] for seller in first_page["results"] + second_page["results"]],
+            [self.retail.pk, other_retail.pk, self.entrepreneur.pk],
+        )
+        self.assertIsNone(second_page["next"])
+
+    def test_seller_descendants_empty_path(self):
+        """Тестирует, что продавец без пути в сети не получает чужих покупателей."""
+
+        Seller.objects.filter(pk=self.retail.pk).update(network_path="")
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-descendants", args=(self.retail.pk,))
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"], [])
+
+    def test_seller_ancestors(self):
+        """Тестирует получение поставщиков продавца."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-ancestors", args=(self.entrepreneur.pk,))
+        response = self.client.get(url)
+        limited_response = self.client.get(url, {"depth": 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [seller["id"] for seller in response.json()],
+            [self.retail.pk, self.factory.pk],
+        )
+        self.assertEqual(
+            [seller["id"] for seller in limited_response.json()], [self.retail.pk]
+        )
+
+    def test_seller_descendants_invalid_depth(self):
+        """Тестирует проверку параметра глубины."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-descendants", args=(self.factory.pk,))
+        response = self.client.get(url, {"depth": "0"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_seller_list_cursor_pagination(self):
+        """Тестирует постраничный вывод продавцов по курсору."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-list")
+        first_page = self.client.get(url, {"page_size": 2}).json()
+        second_page = self.client.get(first_page["next"]).json()
+
+        self.assertEqual(
+            [seller["id"] for seller in first_page["results"]],
+            [self.factory.pk, self.retail.pk],
+        )
+        self.assertEqual(
+            [seller["id"] for seller in second_page["results"]],
+            [self.entrepreneur.pk],
+        )
+        self.assertIsNone(second_page["next"])
+
+    def test_seller_list_cursor_ordering_tiebreaker(self):
+        """Тестирует обход страниц при сортировке по полю с одинаковыми значениями."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-list")
+        sellers = [
+            Seller.objects.create(name=f"factory{number}", seller_type="factory")
+            for number in range(4)
+        ]
+        response = self.client.get(
+            url, {"ordering": "-trade_network_level", "page_size": 2}
+        )
+        seen = []
+        while True:
+            page = response.json()
+            seen += [seller["id"] for seller in page["results"]]
+            if page["next"] is None:
+                break
+            response = self.client.get(page["next"])
+
+        request = Request(
+            RequestFactory().get(url, {"ordering": "trade_network_level"})
+        )
+        ordering = SellerCursorPagination().get_ordering(
+            request, Seller.objects.all(), SellerViewSet()
+        )
+
+        factories = sorted([self.factory.pk] + [seller.pk for seller in sellers])
+        self.assertEqual(
+            seen,
+            [self.entrepreneur.pk, self.retail.pk] + factories[::-1],
+        )
+        self.assertEqual(ordering, ("trade_network_level", "id"))
+
+    def test_seller_list_cursor_many_ties(self):
+        """Тестирует обход больше offset_cutoff продавцов с одинаковым значением поля."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-list")
+        count = SellerCursorPagination.offset_cutoff + 300
+        Seller.objects.bulk_create(
+            Seller(name=f"retail{number}", seller_type="retail network")
+            for number in range(count)
+        )
+        response = self.client.get(
+            url, {"ordering": "trade_network_level", "page_size": 100}
+        )
+        seen, pages = [], []
+        # с позицией только по первому полю курсор зациклился бы
+        for _ in range(count // 100 + 2):
+            page = response.json()
+            pages.append(page)
+            seen += [seller["id"] for seller in page["results"]]
+            if page["next"] is None:
+                break
+            response = self.client.get(page["next"])
+
+        previous = self.client.get(pages[-1]["previous"]).json()
+
+        self.assertEqual(len(seen), count + 3)
+        self.assertEqual(len(set(seen)), count + 3)
+        self.assertEqual(previous["results"], pages[-2]["results"])
+
+    def test_seller_list_sparse_fields(self):
+        """Тестирует ограничение набора полей параметром ?fields=."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-list")
+
+        # продукты не запрошены: загружаются только продавцы
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"fields": "id,name"})
+
+        self.assertEqual(
+            response.json()["results"][0],
+            {"id": self.factory.pk, "name": self.factory.name},
+        )
+
+    def test_seller_export_ndjson(self):
+        """Тестирует потоковую выгрузку продавцов в NDJSON."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-export")
+        response = self.client.get(url)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            [json.loads(line)["trade_network_level"] for line in lines], [0, 1, 2]
+        )
+
+    def test_seller_export_csv(self):
+        """Тестирует потоковую выгрузку продавцов в CSV."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-export")
+        response = self.client.get(url, {"export_format": "csv", "country": "RU"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(lines[0].split(",")[0], "id")
+        self.assertEqual(len(lines), 1)
+
+    def test_seller_bulk_create(self):
+        """Тестирует создание пакета продавцов одним запросом."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-list")
+        product = Product.objects.create(name="test1", model="1")
+        data = [
+            {"name": "bulk1", "seller_type": "factory", "products": [product.pk]},
+            {
+                "name": "bulk2",
+                "seller_type": "retail network",
+                "supplier": self.retail.pk,
+                "products": [product.pk],
+            },
+        ]
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [seller["trade_network_level"] for seller in response.json()], [0, 2]
+        )
+        self.assertEqual(
+            Seller.objects.get(name="bulk2").network_path,
+            f"{self.factory.pk}/{self.retail.pk}/{response.json()[1]['id']}/",
+        )
+        self.assertEqual(response.json()[1]["products"], [product.pk])
+
+    def test_seller_bulk_create_reports_item_errors(self):
+        """Тестирует вывод ошибок по каждому элементу пакета."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-list")
+        product = Product.objects.create(name="test1", model="1")
+        data = [
+            {"name": "bulk1", "seller_type": "factory", "products": [product.pk]},
+            {"name": "bulk2", "seller_type": "unknown", "products": [product.pk]},
+        ]
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()[0], {})
+        self.assertIn("seller_type", response.json()[1])
+        self.assertFalse(Seller.objects.filter(name="bulk1").exists())
+
+    def test_seller_bulk_partial_update(self):
+        """Тестирует частичное обновление пакета продавцов без изменения задолженности."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-list")
+        product = Product.objects.create(name="test1", model="1")
+        data = [
+            {"id": self.retail.pk, "city": "Москва", "debt": "100.00"},
+            {
+                "id": self.entrepreneur.pk,
+                "supplier": self.factory.pk,
+                "products": [product.pk],
+            },
+        ]
+        response = self.client.patch(url, data, format="json")
+        self.retail.refresh_from_db()
+        self.entrepreneur.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.retail.city, "Москва")
+        self.assertEqual(self.retail.debt, 0)
+        self.assertEqual(self.entrepreneur.trade_network_level, 1)
+        self.assertEqual(response.json()[1]["products"], [product.pk])
+
+    def test_seller_bulk_partial_update_writes_only_sent_fields(self):
+        """Тестирует, что пакет не перезаписывает непереданные поля продавца."""
+
+        sellers = list(Seller.objects.filter(pk__in=[self.factory.pk, self.retail.pk]))
+        # параллельное изменение после чтения продавцов пакета
+        Seller.objects.filter(pk=self.retail.pk).update(name="renamed")
+        serializer = SellerUpdateSerializer(
+            sellers,
+            data=[
+                {"id": self.factory.pk, "name": "factory2"},
+                {"id": self.retail.pk, "city": "Тверь"},
+            ],
+            many=True,
+            partial=True,
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.retail.refresh_from_db()
+
+        self.assertEqual(self.retail.name, "renamed")
+        self.assertEqual(self.retail.city, "Тверь")
+
+    def test_seller_bulk_partial_update_unknown_id(self):
+        """Тестирует ошибку для отсутствующего продавца в пакете."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-list")
+        data = [{"id": self.retail.pk, "city": "Москва"}, {"id": 0, "city": "Тверь"}]
+        response = self.client.patch(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()[1], {"id": ["Продавец не найден."]})
+
+    @override_settings(API_CACHE_TIMEOUT=300)
+    def test_seller_list_cache(self):
+        """Тестирует кэширование списка продавцов и его сброс при изменении."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-list")
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(url)
+        Seller.objects.create(name="new", seller_type="factory")
+        response = self.client.get(url)
+
+        self.assertEqual(len(cached_response.json()["results"]), 3)
+        self.assertEqual(len(response.json()["results"]), 4)
+
+    @override_settings(API_CACHE_TIMEOUT=300)
+    def test_seller_detail_cache_invalidated_for_moved_descendants(self):
+        """Тестирует сброс кэша потомков, у которых изменился уровень."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-detail", args=(self.entrepreneur.pk,))
+        self.client.get(url)
+
+        self.retail.supplier = None
+        self.retail.save()
+        response = self.client.get(url)
+
+        self.assertEqual(response.json()["trade_network_level"], 1)
+
+    @override_settings(API_CONDITIONAL_GET=True)
+    def test_seller_conditional_get(self):
+        """Тестирует ответ 304 на запрос с актуальным ETag."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-detail", args=(self.retail.pk,))
+        response = self.client.get(url)
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.retail.products.add(Product.objects.create(name="test1", model="1"))
+        modified = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertIn("Last-Modified", response)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+
+    @override_settings(API_CONDITIONAL_GET=True)
+    def test_seller_list_conditional_get_after_delete(self):
+        """Тестирует, что список без Last-Modified меняет ETag после удаления продавца."""
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("sellers:seller-list")
+        response = self.client.get(url)
+        self.retail.delete()
+        modified = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+
+
+class ImportNetworkTestCase(APITestCase):
+    """Класс для тестирования пакетной загрузки торговой сети."""
+
+    def write_ndjson(self, records):
+        """Записывает записи во временный NDJSON-файл и возвращает путь к нему."""
+
+        file = tempfile.NamedTemporaryFile(
+            "w", suffix=".ndjson", delete=False, encoding="utf-8"
+        )
+        with file:
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+        self.addCleanup(os.remove, file.name)
+        return file.name
+
+    def test_import_network(self):
+        """Тестирует загрузку продавцов в порядке цепочки поставок."""
+
+        Product.objects.create(pk=1, name="test1", model="1")
+        sellers = self.write_ndjson(
+            [
+                {
+                    "model": "sellers.seller",
+                    "pk": 3,
+                    "fields": {
+                        "name": "entrepreneur",
+                        "seller_type": "individual entrepreneur",
+                        "supplier": 2,
+                        "created_at": "2024-11-28T11:45:10.549Z",
+                        "products": [1],
+                    },
+                },
+                {
+                    "id": 2,
+                    "name": "retail",
+                    "seller_type": "retail network",
+                    "supplier": 1,
+                    "trade_network_level": 5,
+                    "products": [],
+                },
+                {
+                    "id": 1,
+                    "name": "factory",
+                    "seller_type": "factory",
+                    "supplier": None,
+                },
+            ]
+        )
+
+        call_command("import_network", sellers=sellers, batch_size=1, stdout=StringIO())
+        entrepreneur = Seller.objects.get(pk=3)
+
+        self.assertEqual(entrepreneur.trade_network_level, 2)
+        self.assertEqual(entrepreneur.network_path, "1/2/3/")
+        self.assertEqual(entrepreneur.created_at.year, 2024)
+        self.assertEqual(list(entrepreneur.products.values_list("pk", flat=True)), [1])
+        self.assertFalse(os.path.exists(f"{sellers}.checkpoint"))
+
+    def test_import_network_keeps_existing_sellers(self):
+        """Тестирует, что загрузка не меняет дату создания существующих продавцов."""
+
+        factory = Seller.objects.create(name="factory", seller_type="factory")
+        created_at = factory.created_at
+        sellers = self.write_ndjson(
+            [
+                {
+                    "id": factory.pk,
+                    "name": "renamed",
+                    "seller_type": "factory",
+                    "created_at": "2024-11-28T11:45:10.549Z",
+                },
+                {
+                    "id": factory.pk + 1,
+                    "name": "retail",
+                    "seller_type": "retail network",
+                    "supplier": factory.pk,
+                    "created_at": "2024-11-28T11:45:10.549Z",
+                },
+            ]
+        )
+
+        call_command("import_network", sellers=sellers, stdout=StringIO())
+        factory.refresh_from_db()
+
+        self.assertEqual(factory.name, "factory")
+        self.assertEqual(factory.created_at, created_at)
+        self.assertEqual(Seller.objects.get(pk=factory.pk + 1).created_at.year, 2024)
+
+    def test_import_network_links_only_inserted_sellers(self):
+        """Тестирует, что связи с продуктами не добавляются существующим продавцам."""
+
+        Product.objects.create(pk=1, name="test1", model="1")
+        factory = Seller.objects.create(name="factory", seller_type="factory")
+        sellers = self.write_ndjson(
+            [
+                {
+                    "id": factory.pk,
+                    "name": "factory",
+                    "seller_type": "factory",
+                    "products": [1],
+                },
+                {
+                    "id": factory.pk + 1,
+                    "name": "retail",
+                    "seller_type": "retail network",
+                    "supplier": factory.pk,
+                    "products": [1],
+                },
+            ]
+        )
+
+        call_command("import_network", sellers=sellers, stdout=StringIO())
+
+        self.assertFalse(factory.products.exists())
+        self.assertEqual(
+            list(
+                Seller.objects.get(pk=factory.pk + 1).products.values_list(
+                    "pk", flat=True
+                )
+            ),
+            [1],
+        )
+
+    @override_settings(API_CACHE_TIMEOUT=300)
+    def test_import_products_resets_cache(self):
+        """Тестирует, что загрузка продуктов сбрасывает кэш списка продуктов."""
+
+        cache.clear()
+        self.client.force_authenticate(
+            user=User.objects.create(email="admin@email.com", is_staff=True)
+        )
+        url = reverse("products:product-list")
+        self.assertEqual(self.client.get(url).json()["results"], [])
+        products = self.write_ndjson([{"id": 1, "name": "test1", "model": "1"}])
+
+        call_command("import_network", products=products, stdout=StringIO())
+
+        self.assertEqual(
+            [item["id"] for item in self.client.get(url).json()["results"]], [1]
+        )
+
+
+@skipUnless(
+    connection.vendor == "postgresql", "Планы запросов проверяются на PostgreSQL"
+)
+class SellerIndexUsageTestCase(TestCase):
+    """Класс для проверки использования индексов фильтрами API и админки."""
+
+    SELLERS_COUNT = 20000
+
+    @classmethod
+    def setUpTestData(cls):
+        """Метод для заполнения большой торговой сети."""
+
+        cls.admin_user = User.objects.create(
+            email="admin@email.com", is_staff=True, is_superuser=True
+        )
+        seller_types = [choice for choice, _ in Seller.SELLER_TYPE_CHOICES]
+        countries = ["RU", "CN", "KZ", "BY", "DE", "US", "FR", "IT", "TR", "IN"]
+        Seller.objects.bulk_create(
+            Seller(
+                name=f"seller {i}",
+                email=f"seller{i}@email.com",
+                country=countries[i % len(countries)] if i % 50 else "AM",
+                city=f"city {i % 500}",
+                seller_type=seller_types[i % len(seller_types)],
+                network_path=f"{i}/",
+            )
+            for i in range(cls.SELLERS_COUNT)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE sellers_seller")
+
+    def get_seller_plans(self, url, params, headers=None, match=" WHERE "):
+        """
+        Выполняет запрос и возвращает планы фильтрующих запросов к таблице продавцов.
+
+        match — подстрока SQL, по которой отбираются запросы.
+        """
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params, headers=headers)
+        self.assertEqual(response.status_code, 200)
+
+        plans = []
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                sql = query["sql"]
+                if 'FROM "sellers_seller"' in sql and match in sql:
+                    cursor.execute(f"EXPLAIN {sql}")
+                    plans.append("\n".join(row[0] for row in cursor.fetchall()))
+        self.assertTrue(plans)
+        return plans
+
+    def assertIndexScan(self, plans, index_name=None):
+        for plan in plans:
+            self.assertNotIn("Seq Scan on sellers_seller", plan)
+            if index_name is not None:
+                self.assertIn(index_name, plan)
+
+    @override_settings(API_CACHE_TIMEOUT=0)
+    def test_api_country_filter_uses_index(self):
+        """Тестирует фильтр API по стране с сортировкой пагинации."""
+
+        # API принимает только JWT, сессия админки не подходит
+        token = AccessToken.for_user(self.admin_user)
+        plans = self.get_seller_plans(
+            reverse("sellers:seller-list"),
+            {"country": "AM", "fields": "id"},
+            headers={"Authorization": f"Bearer {token}"},
+            match=' ORDER BY "sellers_seller"."created_at" ASC',
+        )
+
+        self.assertEqual(len(plans), 1)
+
+        self.assertIndexScan(plans, "seller_country_created_idx")
+
+    def test_admin_city_filter_uses_index(self):
+        """Тестирует фильтр админки по городу."""
+
+        self.client.force_login(self.admin_user)
+        plans = self.get_seller_plans(
+            reverse("admin:sellers_seller_changelist"), {"city": "city 7"}
+        )
+
+        self.assertIndexScan(plans)
+
+    def test_admin_seller_type_filter_uses_index(self):
+        """Тестирует совместный фильтр админки по типу продавца и городу."""
+
+        self.client.force_login(self.admin_user)
+        plans = self.get_seller_plans(
+            reverse("admin:sellers_seller_changelist"),
+            {"seller_type__exact": "factory", "city": "city 3"},
+        )
+
+        self.assertIndexScan(plans)
+
+    def test_admin_search_uses_trigram_index(self):
+        """Тестирует поиск админки по названию и почте."""
+
+        self.client.force_login(self.admin_user)
+        plans = self.get_seller_plans(
+            reverse("admin:sellers_seller_changelist"), {"q": "seller12345"}
+        )
+
+        self.assertIndexScan(plans, "trgm_idx")
+
+
+class BenchmarkTestCase(TestCase):
+    """Класс для проверки набора замеров эндпоинтов."""
+
+    def test_seed_network(self):
+        """Тестирует заполнение сети заданной глубины."""
+
+        seed_network(30, depth=3, products_count=10, products_per_seller=2)
+
+        self.assertEqual(Seller.objects.count(), 30)
+        self.assertEqual(Seller.products.through.objects.count(), 60)
+        seller = Seller.objects.get(pk=25)
+        self.assertEqual(seller.trade_network_level, 2)
+        root_id = seller.supplier.supplier_id
+        self.assertEqual(seller.network_root_id, root_id)
+        self.assertEqual(seller.network_path, f"{root_id}/{seller.supplier_id}/25/")
+
+    def test_run_benchmarks(self):
+        """Тестирует замеры всех сценариев и сравнение с базовыми значениями."""
+
+        user = seed_network(30, depth=3, products_count=10, products_per_seller=2)
+        cache.set("other-process", "value")
+
+        # лимит ниже числа запросов: без отключения лимитов сценарии получили бы 429
+        with override_settings(
+            REST_FRAMEWORK={
+                **settings.REST_FRAMEWORK,
+                "DEFAULT_THROTTLE_RATES": dict.fromkeys(
+                    settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"], "1/min"
+                ),
+            }
+        ):
+            results = run_benchmarks(user, iterations=2, warmup=0)
+
+        self.assertEqual(cache.get("other-process"), "value")
+        self.assertIn("sellers.list", results)
+        self.assertIn("users.login", results)
+        self.assertIn("admin.sellers_changelist", results)
+        self.assertEqual(compare_with_baseline(results, results), [])
+        baseline = dict(
+            results,
+            **{
+                "sellers.list": dict(
+                    results["sellers.list"],
+                    queries=results["sellers.list"]["queries"] - 1,
+                )
+            },
+        )
+        self.assertEqual(len(compare_with_baseline(results, baseline)), 1)
+        del baseline["users.login"]
+        self.assertIn(
+            "users.login: нет базового значения",
+            compare_with_baseline(results, baseline),
+        )
+
+    def test_save_and_load_baseline(self):
+        """Тестирует сохранение базовых значений в новый каталог."""
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "benchmarks", "baseline.json")
+
+            self.assertIsNone(load_baseline(path, "sqlite-30"))
+
+            save_baseline(path, "sqlite-30", {"sellers.list": {"queries": 2}})
+
+            self.assertEqual(
+                load_baseline(path, "sqlite-30"), {"sellers.list": {"queries": 2}}
+            )
+            self.assertIsNone(load_baseline(path, "postgresql-30"))
+
+    def test_run_load(self):
+        """Тестирует нагрузочный клиент на соединениях keep-alive."""
+
+        async def handle(reader, writer):
+            try:
+                while await reader.readuntil(b"\r\n\r\n"):
+                    writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}")
+                    await writer.drain()
+            except asyncio.IncompleteReadError:
+                writer.close()
+
+        async def load():
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                return await run_load(
+                    f"http://127.0.0.1:{port}/sellers/", concurrency=5, requests=50
+                )
+
+        results = asyncio.run(load())
+
+        self.assertEqual(results["errors"], 0)
+        self.assertGreater(results["requests_per_second"], 0)
+
+
+@override_settings(
+    REQUEST_TIMING_ENABLED=True,
+    MIDDLEWARE=[*settings.MIDDLEWARE, "config.middleware.RequestTimingMiddleware"],
+)
+class RequestTimingTestCase(APITestCase):
+    """Класс для тестирования замера времени запросов."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        registry.clear()
+        self.admin_user = User.objects.create(email="admin@email.com", is_staff=True)
+        self.product = Product.objects.create(name="test1", model="1")
+        self.seller = Seller.objects.create(
+            name="factory", seller_type="factory", country="RU"
+        )
+        self.seller.products.add(self.product)
+
+    def test_server_timing_header(self):
+        """Тестирует заголовок Server-Timing с SQL-запросами и этапами."""
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(reverse("sellers:seller-list"))
+
+        header = response["Server-Timing"]
+        self.assertRegex(header, r'db;dur=[\d.]+;desc="\d+ queries"')
+        for phase in ("serialize", "render", "total"):
+            self.assertIn(f"{phase};dur=", header)
+
+    def test_metrics_labels(self):
+        """Тестирует метки view и action в метриках Prometheus."""
+
+        self.client.force_authenticate(user=self.admin_user)
+        self.client.get(reverse("sellers:seller-list"))
+        self.client.get(reverse("sellers:seller-detail", args=(self.seller.pk,)))
+        self.client.get(reverse("products:product-list"))
+        self.client.force_authenticate(user=None)
+        self.client.post(
+            reverse("users:register"),
+            {"email": "new@email.com", "password": "password"},
+        )
+
+        metrics = registry.render()
+
+        self.assertIn(
+            'http_requests_total{view="SellerViewSet",action="list",'
+            f'method="GET",status="200",pid="{os.getpid()}"}} 1',
+            metrics,
+        )
+        self.assertIn('view="SellerViewSet",action="retrieve"', metrics)
+        self.assertIn('view="ProductViewSet",action="list"', metrics)
+        self.assertIn(
+            'view="UserCreateAPIView",action="post",method="POST",status="201"',
+            metrics,
+        )
+        self.assertIn('phase="serialize"', metrics)
+
+    def test_metrics_view_allowed_ips(self):
+        """Тестирует доступ к метрикам только с разрешенных адресов."""
+
+        factory = RequestFactory()
+
+        local = metrics_view(factory.get("/metrics", REMOTE_ADDR="127.0.0.1"))
+        remote = metrics_view(factory.get("/metrics", REMOTE_ADDR="10.0.0.5"))
+
+        self.assertEqual(local.status_code, status.HTTP_200_OK)
+        self.assertIn("# TYPE http_requests_total counter", local.content.decode())
+        self.assertEqual(remote.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_connection_metrics(self):
+        """Тестирует счетчик новых соединений и метрики пула psycopg."""
+
+        registry.clear()
+        database = connections["default"]
+        connection_created.send(sender=type(database), connection=database)
+        stats = {
+            "pool_max": 10,
+            "pool_size": 4,
+            "pool_available": 1,
+            "requests_waiting": 2,
+            "requests_num": 50,
+            "requests_wait_ms": 1500,
+        }
+        pool = SimpleNamespace(get_stats=lambda: stats)
+
+        with patch.object(type(database), "pool", pool, create=True):
+            metrics = registry.render()
+        pid = os.getpid()
+
+        self.assertIn(
+            f'db_connections_opened_total{{alias="default",pid="{pid}"}} 1', metrics
+        )
+        self.assertIn(
+            f'db_pool_requests_waiting{{alias="default",pid="{pid}"}} 2', metrics
+        )
+        self.assertIn(
+            f'db_pool_requests_wait_seconds_total{{alias="default",pid="{pid}"}} 1.5',
+            metrics,
+        )
+        self.assertIn(
+            f'db_pool_requests_errors_total{{alias="default",pid="{pid}"}} 0', metrics
+        )
+
+
+class NPlusOneTestCase(APITestCase):
+    """Класс для проверки отсутствия N+1 запросов у продавцов."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        self.admin_user = User.objects.create(
+            email="admin@email.com", is_staff=True, is_superuser=True
+        )
+        self.product = Product.objects.create(name="test1", model="1")
+        self.factory = self.create_seller(None)
+
+    def create_seller(self, supplier, number=0):
+        seller = Seller.objects.create(
+            name=f"seller {number}",
+            seller_type="retail network",
+            country="RU",
+            supplier=supplier,
+        )
+        seller.products.add(self.product, Product.objects.create(name="p", model="2"))
+        return seller
+
+    def add_sellers(self):
+        supplier = self.factory
+        for number in range(1, 6):
+            supplier = self.create_seller(supplier, number)
+
+    def test_detector_raises_on_lazy_relations(self):
+        """Тестирует обнаружение ленивой загрузки связей в цикле."""
+
+        self.add_sellers()
+
+        with self.assertRaises(NPlusOneError):
+            with NPlusOneDetector():
+                for seller in Seller.objects.all():
+                    list(seller.products.all())
+
+        with NPlusOneDetector():
+            for seller in Seller.objects.prefetch_related("products"):
+                list(seller.products.all())
+
+    def test_detector_decorator_log_mode(self):
+        """Тестирует режим записи в лог при использовании как декоратора."""
+
+        self.add_sellers()
+
+        @NPlusOneDetector(mode="log")
+        def walk_suppliers():
+            return [seller.supplier for seller in Seller.objects.all()]
+
+        with self.assertLogs("config.nplusone", level="WARNING"):
+            walk_suppliers()
+
+    def test_seller_list_queries_do_not_grow(self):
+        """Тестирует, что число запросов списка продавцов не зависит от размера."""
+
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("sellers:seller-list")
+
+        assert_queries_do_not_grow(
+            lambda: self.client.get(url), self.add_sellers, "SellerViewSet.list"
+        )
+
+    def test_seller_descendants_queries_do_not_grow(self):
+        """Тестирует, что число запросов поддерева не зависит от размера."""
+
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("sellers:seller-descendants", args=(self.factory.pk,))
+        self.create_seller(self.factory)
+
+        assert_queries_do_not_grow(lambda: self.client.get(url), self.add_sellers)
+
+    def test_seller_admin_changelist_queries_do_not_grow(self):
+        """Тестирует, что число запросов списка в админке не зависит от размера."""
+
+        self.client.force_login(self.admin_user)
+        url = reverse("admin:sellers_seller_changelist")
+
+        assert_queries_do_not_grow(
+            lambda: self.client.get(url), self.add_sellers, "SellerAdmin"
+        )
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class SellerFastListTestCase(APITestCase):
+    """Класс для проверки быстрого пути списка продавцов."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        self.admin_user = User.objects.create(email="admin@email.com", is_staff=True)
+        products = [
+            Product.objects.create(name=f"test{number}", model=str(number))
+            for number in range(3)
+        ]
+        factory = Seller.objects.create(
+            name="factory", seller_type="factory", country="RU", debt="12.5"
+        )
+        factory.products.add(products[2], products[0])
+        retail = Seller.objects.create(
+            name="retail",
+            email="retail@email.com",
+            seller_type="retail network",
+            country="KZ",
+            city="Алматы",
+            supplier=factory,
+            debt="0.01",
+        )
+        retail.products.add(products[1])
+        Seller.objects.create(name="ip", seller_type="individual entrepreneur")
+
+    def get_both(self, params=None):
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("sellers:seller-list")
+        with override_settings(API_FAST_LIST=False):
+            expected = self.client.get(url, params)
+        with override_settings(API_FAST_LIST=True):
+            actual = self.client.get(url, params)
+        return expected, actual
+
+    def test_fast_list_matches_serializer(self):
+        """Тестирует побайтовое совпадение ответа с SellerSerializer."""
+
+        for params in (
+            None,
+            {"country": "KZ"},
+            {"fields": "id,name,debt,products"},
+            {"ordering": "-trade_network_level"},
+            {"page_size": 1},
+        ):
+            with self.subTest(params=params):
+                expected, actual = self.get_both(params)
+
+                self.assertEqual(actual.status_code, status.HTTP_200_OK)
+                self.assertEqual(actual.content, expected.content)
+
+    def test_fast_list_fields_with_ordering(self):
+        """Тестирует ?fields= без поля, по которому сортирует курсор."""
+
+        params = {"fields": "id", "ordering": "trade_network_level", "page_size": 2}
+        expected, actual = self.get_both(params)
+
+        self.assertEqual(actual.status_code, status.HTTP_200_OK)
+        self.assertEqual(actual.content, expected.content)
+
+        with override_settings(API_FAST_LIST=True):
+            next_page = self.client.get(actual.json()["next"])
+
+        self.assertEqual(next_page.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(next_page.json()["results"][0]), ["id"])
+
+    def test_fast_list_next_page(self):
+        """Тестирует совпадение следующей страницы курсорной пагинации."""
+
+        expected, actual = self.get_both({"page_size": 1})
+        next_url = actual.json()["next"]
+        self.assertEqual(next_url, expected.json()["next"])
+
+        with override_settings(API_FAST_LIST=True):
+            fast_page = self.client.get(next_url)
+        with override_settings(API_FAST_LIST=False):
+            full_page = self.client.get(next_url)
+
+        self.assertEqual(fast_page.content, full_page.content)
+
+    def test_fast_list_query_count(self):
+        """Тестирует число запросов быстрого пути."""
+
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("sellers:seller-list")
+
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+
+class OrjsonRendererTestCase(APITestCase):
+    """Класс для проверки рендерера и парсера на orjson."""
+
+    def test_render_matches_json_renderer(self):
+        """Тестирует совпадение вывода со стандартным JSONRenderer."""
+
+        data = [
+            {
+                "debt": Decimal("12.50"),
+                "created_at": datetime(2024, 5, 1, 10, 30, 15, 123456, timezone.utc),
+                "released_at": datetime(
+                    2024, 5, 1, 13, 30, tzinfo=timezone(timedelta(hours=3))
+                ),
+                "date": datetime(2024, 5, 1).date(),
+                "label": gettext_lazy("Продавец"),
+                "text": "строка\u2028с разделителем",
+                "nested": {1: [None, True, 1.5]},
+            }
+        ]
+
+        self.assertEqual(
+            OrjsonRenderer().render(data), StdlibJSONRenderer().render(data)
+        )
+        for renderer in (OrjsonRenderer(), StdlibJSONRenderer()):
+            with self.assertRaises(TypeError):
+                renderer.render({"country": Country("RU")})
+
+    def test_compare_renderers(self):
+        """Тестирует сравнение рендереров на одинаковом результате."""
+
+        results = compare_renderers(build_seller_payload(10), iterations=1)
+
+        self.assertEqual(results["orjson"]["bytes"], results["stdlib"]["bytes"])
+
+    def test_render_with_indent_falls_back(self):
+        """Тестирует ответы с отступами через стандартный рендерер."""
+
+        data = {"debt": Decimal("1.00")}
+
+        self.assertEqual(
+            OrjsonRenderer().render(data, "application/json; indent=4"),
+            StdlibJSONRenderer().render(data, "application/json; indent=4"),
+        )
+
+    def test_parse(self):
+        """Тестирует разбор тела запроса и ошибку при некорректном JSON."""
+
+        parser = OrjsonParser()
+
+        self.assertEqual(
+            parser.parse(BytesIO('{"name": "тест"}'.encode())), {"name": "тест"}
+        )
+        with self.assertRaises(ParseError):
+            parser.parse(BytesIO(b'{"debt": NaN}'))
+
+    def test_accept_negotiation(self):
+        """Тестирует выбор стандартного рендерера по заголовку Accept."""
+
+        admin_user = User.objects.create(email="admin@email.com", is_staff=True)
+        product = Product.objects.create(name="test1", model="1")
+        seller = Seller.objects.create(name="завод", seller_type="factory", debt="1.5")
+        seller.products.add(product)
+        self.client.force_authenticate(user=admin_user)
+        url = reverse("sellers:seller-detail", args=(seller.pk,))
+
+        fast = self.client.get(url)
+        stdlib = self.client.get(url, HTTP_ACCEPT="application/json; encoder=stdlib")
+
+        self.assertEqual(fast["Content-Type"], "application/json")
+        self.assertEqual(stdlib["Content-Type"], "application/json; encoder=stdlib")
+        self.assertEqual(fast.content, stdlib.content)
+
+        for accept in ("*/*", "application/json", "application/*"):
+            response = self.client.get(url, HTTP_ACCEPT=accept)
+            self.assertEqual(response["Content-Type"], "application/json")
+
+        response = self.client.get(url, {"format": "stdjson"})
+        self.assertEqual(response["Content-Type"], "application/json; encoder=stdlib")
+        response = self.client.get(url, {"format": "json"})
+        self.assertEqual(response["Content-Type"], "application/json")
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class SellerDebtRollupTestCase(APITestCase):
+    """Класс для тестирования сводки задолженности по цепочкам поставок."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        self.admin_user = User.objects.create(email="admin@email.com", is_staff=True)
+        self.products = [
+            Product.objects.create(name=f"test{number}", model=str(number))
+            for number in range(3)
+        ]
+        self.factory = Seller.objects.create(
+            name="factory", seller_type="factory", country="RU", debt="100.00"
+        )
+        self.factory.products.add(*self.products)
+        self.retail = Seller.objects.create(
+            name="retail",
+            seller_type="retail network",
+            country="RU",
+            supplier=self.factory,
+            debt="50.25",
+        )
+        self.retail.products.add(self.products[0])
+        self.ip = Seller.objects.create(
+            name="ip",
+            seller_type="individual entrepreneur",
+            country="KZ",
+            supplier=self.retail,
+            debt="10.50",
+        )
+        self.other_factory = Seller.objects.create(
+            name="other", seller_type="factory", country="KZ", debt="7.00"
+        )
+        self.url = reverse("sellers:seller-rollup")
+
+    def get_table_rows(self):
+        return list(SellerDebtRollup.objects.regroup())
+
+    def get_live_rows(self):
+        return list(Seller.objects.debt_rollup())
+
+    def test_debt_rollup_queryset(self):
+        """Тестирует суммы без умножения задолженности и число различных продуктов."""
+
+        rows = list(Seller.objects.debt_rollup(("network_root",)))
+
+        self.assertEqual(
+            rows,
+            [
+                {
+                    "network_root": self.factory.pk,
+                    "total_debt": Decimal("160.75"),
+                    "sellers_count": 3,
+                    "products_count": 3,
+                },
+                {
+                    "network_root": self.other_factory.pk,
+                    "total_debt": Decimal("7.00"),
+                    "sellers_count": 1,
+                    "products_count": 0,
+                },
+            ],
+        )
+
+    def test_rollup_endpoint(self):
+        """Тестирует эндпоинт сводки с разрезами и фильтром одним запросом."""
+
+        self.client.force_authenticate(user=self.admin_user)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.url, {"group_by": "country", "network_root": self.factory.pk}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            [
+                {
+                    "country": "KZ",
+                    "total_debt": "10.50",
+                    "sellers_count": 1,
+                    "products_count": 0,
+                },
+                {
+                    "country": "RU",
+                    "total_debt": "150.25",
+                    "sellers_count": 2,
+                    "products_count": 3,
+                },
+            ],
+        )
+
+    def test_rollup_invalid_group_by(self):
+        """Тестирует ошибку при недопустимом разрезе."""
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.url, {"group_by": "city"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(SELLERS_DEBT_ROLLUP_TABLE=True)
+    def test_rollup_table_follows_changes(self):
+        """Тестирует пересчет таблицы сводки при изменении задолженности и поставщика."""
+
+        rebuild_debt_rollups()
+        self.assertEqual(self.get_table_rows(), self.get_live_rows())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ip.debt = Decimal("20.00")
+            self.ip.save()
+        self.assertEqual(self.get_table_rows(), self.get_live_rows())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.retail.supplier = self.other_factory
+            self.retail.save()
+        self.assertEqual(self.get_table_rows(), self.get_live_rows())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.retail.products.add(self.products[1])
+        self.assertEqual(self.get_table_rows(), self.get_live_rows())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_factory.delete()
+        self.assertEqual(self.get_table_rows(), self.get_live_rows())
+
+    @override_settings(SELLERS_DEBT_ROLLUP_TABLE=True)
+    def test_rollup_table_applies_deltas(self):
+        """Тестирует, что изменение продавца меняет только строки его группы."""
+
+        rebuild_debt_rollups()
+        other_row = SellerDebtRollup.objects.get(network_root=self.other_factory)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            adjust_debt(self.ip.pk, Decimal("5.00"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.factory.products.clear()
+        refresh_for_sellers([self.ip.pk])
+
+        self.assertEqual(self.get_table_rows(), self.get_live_rows())
+        self.assertEqual(
+            SellerDebtRollup.objects.get(pk=other_row.pk).updated_at,
+            other_row.updated_at,
+        )
+
+    @override_settings(SELLERS_DEBT_ROLLUP_TABLE=True)
+    def test_rollup_table_matches_live_without_root(self):
+        """Тестирует, что продавец без завода не входит в сводку в обоих режимах."""
+
+        Seller.objects.filter(pk=self.ip.pk).update(network_root=None)
+        rebuild_debt_rollups()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.retail.debt = Decimal("1.00")
+            self.retail.save()
+
+        self.assertEqual(self.get_table_rows(), self.get_live_rows())
+        self.assertNotIn(None, [row["network_root"] for row in self.get_live_rows()])
+
+    def test_rollup_table_filled_by_migration(self):
+        """Тестирует заполнение сводки миграцией на исторических моделях."""
+
+        apps = (
+            MigrationLoader(connection)
+            .project_state(("sellers", "0018_fill_seller_rollups"))
+            .apps
+        )
+        rebuild_debt_rollups(apps=apps)
+
+        self.assertEqual(self.get_table_rows(), self.get_live_rows())
+        self.assertEqual(SellerRollupState.objects.count(), 4)
+
+    @override_settings(SELLERS_DEBT_ROLLUP_TABLE=True)
+    def test_rollup_endpoint_uses_table(self):
+        """Тестирует ответ эндпоинта из таблицы сводки."""
+
+        self.client.force_authenticate(user=self.admin_user)
+        with override_settings(SELLERS_DEBT_ROLLUP_TABLE=False):
+            expected = self.client.get(self.url, {"group_by": "network_root"}).json()
+        rebuild_debt_rollups()
+
+        response = self.client.get(self.url, {"group_by": "network_root"})
+
+        self.assertEqual(response.json(), expected)
+
+
+class DebtAdjustmentTestCase(APITestCase):
+    """Класс для тестирования атомарных изменений задолженности."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        self.admin_user = User.objects.create(
+            email="admin@email.com", is_staff=True, is_superuser=True
+        )
+        self.seller = Seller.objects.create(
+            name="factory", seller_type="factory", debt="100.00"
+        )
+        self.other = Seller.objects.create(
+            name="other", seller_type="factory", debt="10.00"
+        )
+        self.url = reverse("sellers:seller-debt-adjustments", args=[self.seller.pk])
+        self.queue_url = reverse("sellers:seller-queue-debt-adjustments")
+        self.client.force_authenticate(user=self.admin_user)
+
+    def get_debt(self, seller):
+        seller.refresh_from_db(fields=["debt"])
+        return seller.debt
+
+    def test_adjust_debt(self):
+        """Тестирует увеличение и уменьшение задолженности с записью в журнал."""
+
+        response = self.client.post(self.url, {"amount": "25.50", "reason": "поставка"})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["debt"], "125.50")
+        self.assertEqual(response.json()["status"], DebtAdjustment.APPLIED)
+
+        response = self.client.post(self.url, {"amount": "-125.50"})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.get_debt(self.seller), Decimal("0.00"))
+        self.assertEqual(self.seller.debt_adjustments.count(), 2)
+
+    def test_adjust_debt_overdraft(self):
+        """Тестирует отказ при уходе задолженности в минус."""
+
+        response = self.client.post(self.url, {"amount": "-100.01"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("amount", response.json())
+        self.assertEqual(self.get_debt(self.seller), Decimal("100.00"))
+        self.assertFalse(self.seller.debt_adjustments.exists())
+
+    def test_adjust_debt_zero_amount(self):
+        """Тестирует отказ при нулевой сумме изменения."""
+
+        response = self.client.post(self.url, {"amount": "0"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_adjust_debt_overflow(self):
+        """Тестирует отдельное сообщение при переполнении задолженности."""
+
+        with patch("sellers.debts.Seller.objects.filter") as filter_sellers:
+            filter_sellers.return_value.update.side_effect = DataError
+            response = self.client.post(self.url, {"amount": "1.00"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"amount": [DEBT_OVERFLOW_MESSAGE]})
+        self.assertFalse(self.seller.debt_adjustments.exists())
+
+    def test_negative_debt_constraint(self):
+        """Тестирует ограничение БД на отрицательную задолженность."""
+
+        with self.assertRaises(IntegrityError):
+            Seller.objects.filter(pk=self.seller.pk).update(debt=-1)
+
+    def test_adjust_debt_idempotent(self):
+        """Тестирует, что повтор с тем же external_id не меняет задолженность."""
+
+        data = {"amount": "10.00", "external_id": "invoice-1"}
+        first = self.client.post(self.url, data)
+        second = self.client.post(self.url, data)
+
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.json()["id"], second.json()["id"])
+        self.assertEqual(self.get_debt(self.seller), Decimal("110.00"))
+
+    def test_adjust_debt_external_id_conflict(self):
+        """Тестирует отказ при external_id, занятом другим изменением."""
+
+        self.client.post(self.url, {"amount": "10.00", "external_id": "X1"})
+        other_url = reverse("sellers:seller-debt-adjustments", args=[self.other.pk])
+
+        for url, data in (
+            (other_url, {"amount": "10.00", "external_id": "X1"}),
+            (self.url, {"amount": "20.00", "external_id": "X1"}),
+        ):
+            response = self.client.post(url, data)
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("external_id", response.json())
+
+        self.assertEqual(self.get_debt(self.seller), Decimal("110.00"))
+        self.assertEqual(self.get_debt(self.other), Decimal("10.00"))
+
+        response = self.client.post(
+            self.queue_url,
+            [
+                {"seller": self.other.pk, "amount": "10.00", "external_id": "X1"},
+                {"seller": self.other.pk, "amount": "1.00", "external_id": "X2"},
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("external_id", response.json())
+        self.assertEqual(DebtAdjustment.objects.count(), 1)
+
+        response = self.client.post(
+            self.queue_url,
+            [{"seller": self.seller.pk, "amount": "10.00", "external_id": "X1"}],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(DebtAdjustment.objects.count(), 1)
+
+    def test_list_debt_adjustments(self):
+        """Тестирует вывод журнала изменений продавца."""
+
+        self.client.post(self.url, {"amount": "1.00"})
+        self.client.post(
+            reverse("sellers:seller-debt-adjustments", args=[self.other.pk]),
+            {"amount": "2.00"},
+        )
+
+        self.client.post(self.url, {"amount": "3.00"})
+
+        # ?ordering= вьюсета продавцов не применяется к журналу
+        response = self.client.get(self.url, {"ordering": "trade_network_level"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["amount"] for item in response.json()["results"]], ["3.00", "1.00"]
+        )
+
+    def test_queue_debt_adjustments(self):
+        """Тестирует очередь: изменения применяются по порядку, перерасход отклоняется."""
+
+        response = self.client.post(
+            self.queue_url,
+            [
+                {"seller": self.seller.pk, "amount": "-60.00"},
+                {"seller": self.other.pk, "amount": "5.00"},
+                {"seller": self.seller.pk, "amount": "-60.00"},
+                {"seller": self.seller.pk, "amount": "10.00"},
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.json(), {"queued": 4})
+        self.assertEqual(self.get_debt(self.seller), Decimal("100.00"))
+
+        self.assertEqual(apply_pending_adjustments(), (3, 1))
+        self.assertEqual(self.get_debt(self.seller), Decimal("50.00"))
+        self.assertEqual(self.get_debt(self.other), Decimal("15.00"))
+        self.assertEqual(
+            list(
+                self.seller.debt_adjustments.order_by("pk").values_list(
+                    "status", flat=True
+                )
+            ),
+            [DebtAdjustment.APPLIED, DebtAdjustment.REJECTED, DebtAdjustment.APPLIED],
+        )
+        self.assertEqual(apply_pending_adjustments(), (0, 0))
+
+    @override_settings(API_CACHE_TIMEOUT=300)
+    def test_queue_resets_cached_journal(self):
+        """Тестирует, что постановка в очередь сбрасывает кэш журнала продавца."""
+
+        cache.clear()
+        self.assertEqual(self.client.get(self.url).json()["results"], [])
+
+        self.client.post(
+            self.queue_url,
+            [{"seller": self.seller.pk, "amount": "5.00"}],
+            format="json",
+        )
+
+        results = self.client.get(self.url).json()["results"]
+        self.assertEqual(
+            [(item["amount"], item["status"]) for item in results],
+            [("5.00", DebtAdjustment.PENDING)],
+        )
+
+    def test_queue_unknown_seller(self):
+        """Тестирует проверку продавцов пакета одним запросом."""
+
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                self.queue_url,
+                [
+                    {"seller": self.seller.pk, "amount": "1.00"},
+                    {"seller": 999, "amount": "1.00"},
+                ],
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(DebtAdjustment.objects.exists())
+
+    def test_admin_clear_debt(self):
+        """Тестирует обнуление задолженности в админке с записью в журнал."""
+
+        self.client.force_login(self.admin_user)
+        self.client.post(
+            reverse("admin:sellers_seller_changelist"),
+            {
+                "action": "clear_debt",
+                "_selected_action": [self.seller.pk, self.other.pk],
+            },
+        )
+
+        self.assertEqual(self.get_debt(self.seller), Decimal("0.00"))
+        self.assertEqual(
+            sorted(DebtAdjustment.objects.values_list("amount", flat=True)),
+            [Decimal("-100.00"), Decimal("-10.00")],
+        )
+
+
+@skipUnless(connection.vendor == "postgresql", "Нужны параллельные соединения")
+class ConcurrentDebtAdjustmentTestCase(TransactionTestCase):
+    """Класс для тестирования параллельных изменений задолженности."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        seed_network(3, depth=1, products_count=1)
+
+    def test_no_lost_updates(self):
+        """Тестирует отсутствие потерянных обновлений в обоих режимах."""
+
+        for mode in ("sync", "queue"):
+            with self.subTest(mode=mode):
+                DebtAdjustment.objects.all().delete()
+                results = run_concurrent_adjustments(
+                    [1, 2, 3], writers=4, adjustments=25, mode=mode
+                )
+                self.assertEqual(results["lost_updates"], 0)
+                self.assertEqual(results["applied"] + results["rejected"], 100)
+
+
+@override_settings(SELLERS_JOB_CHUNK_SIZE=2, SELLERS_JOB_RUNNER="db")
+class SellerBulkJobTestCase(APITestCase):
+    """Класс для тестирования фоновых заданий админки."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        self.admin_user = User.objects.create(
+            email="admin@email.com", is_staff=True, is_superuser=True
+        )
+        self.sellers = [
+            Seller.objects.create(
+                name=f"seller {number}", seller_type="factory", debt="10.00"
+            )
+            for number in range(5)
+        ]
+        self.client.force_login(self.admin_user)
+
+    def get_debts(self):
+        return list(Seller.objects.order_by("pk").values_list("debt", flat=True))
+
+    def test_admin_action_starts_job(self):
+        """Тестирует запуск задания для выборки больше одной части."""
+
+        self.client.post(
+            reverse("admin:sellers_seller_changelist"),
+            {
+                "action": "clear_debt",
+                "_selected_action": [seller.pk for seller in self.sellers[:4]],
+            },
+        )
+
+        job = SellerBulkJob.objects.get()
+        self.assertEqual((job.status, job.total), (SellerBulkJob.PENDING, 4))
+        self.assertEqual(self.get_debts(), [Decimal("10.00")] * 5)
+
+        call_command("run_seller_jobs", stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), (SellerBulkJob.DONE, 4))
+        self.assertEqual(self.get_debts(), [Decimal("0.00")] * 4 + [Decimal("10.00")])
+
+    def test_select_across_keeps_changelist_filters(self):
+        """Тестирует задание для всех продавцов, найденных поиском списка."""
+
+        other = Seller.objects.create(name="other", seller_type="factory", debt="10.00")
+        url = reverse("admin:sellers_seller_changelist")
+        self.client.post(
+            f"{url}?q=seller",
+            {
+                "action": "clear_debt",
+                "select_across": "1",
+                "_selected_action": [self.sellers[0].pk],
+            },
+        )
+
+        job = SellerBulkJob.objects.get()
+        self.assertEqual((job.params, job.total), ({"q": ["seller"]}, 5))
+
+        run_job(job.pk)
+        other.refresh_from_db()
+
+        self.assertEqual(self.get_debts()[:5], [Decimal("0.00")] * 5)
+        self.assertEqual(other.debt, Decimal("10.00"))
+
+    def test_cancel_and_resume(self):
+        """Тестирует отмену задания в очереди и его продолжение из админки."""
+
+        job = start_job("clear_debt", {}, self.admin_user)
+        changelist = reverse("admin:sellers_sellerbulkjob_changelist")
+        self.client.post(changelist, {"action": "cancel", "_selected_action": [job.pk]})
+        run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, SellerBulkJob.CANCELLED)
+        self.assertEqual(self.get_debts(), [Decimal("10.00")] * 5)
+
+        self.client.post(changelist, {"action": "resume", "_selected_action": [job.pk]})
+        run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), (SellerBulkJob.DONE, 5))
+        self.assertEqual(self.get_debts(), [Decimal("0.00")] * 5)
+
+    def test_failed_job_resumes_from_last_chunk(self):
+        """Тестирует продолжение упавшего задания с первого необработанного id."""
+
+        calls = []
+
+        def flaky_action(pks, user=None):
+            calls.append(pks)
+            if len(calls) == 2:
+                raise RuntimeError("сбой")
+            clear_debts(pks, user=user)
+
+        job = start_job("clear_debt", {}, self.admin_user)
+        with patch.dict(JOB_ACTIONS, clear_debt=flaky_action):
+            with self.assertLogs("sellers.jobs", "ERROR"):
+                run_job(job.pk)
+
+            job.refresh_from_db()
+            self.assertEqual(job.status, SellerBulkJob.FAILED)
+            self.assertEqual(job.processed, 2)
+            self.assertEqual(job.last_pk, self.sellers[1].pk)
+
+            resume_jobs(SellerBulkJob.objects.all())
+            run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), (SellerBulkJob.DONE, 5))
+        self.assertEqual(calls[2], [self.sellers[2].pk, self.sellers[3].pk])
+        self.assertEqual(self.get_debts(), [Decimal("0.00")] * 5)
+
+    def test_job_admin_progress(self):
+        """Тестирует вывод прогресса в списке заданий."""
+
+        start_job("clear_debt", {}, self.admin_user)
+        response = self.client.get(reverse("admin:sellers_sellerbulkjob_changelist"))
+
+        self.assertContains(response, "0 из 5 (0%)")
+
+
+class SellerAdminChangelistTestCase(TestCase):
+    """Класс для тестирования списка продавцов в админке."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        self.admin_user = User.objects.create(
+            email="admin@email.com", is_staff=True, is_superuser=True
+        )
+        self.factory = Seller.objects.create(
+            name="factory", seller_type="factory", city="Москва"
+        )
+        Seller.objects.create(
+            name="retail",
+            seller_type="retail network",
+            city="Казань",
+            supplier=self.factory,
+        )
+        self.url = reverse("admin:sellers_seller_changelist")
+        self.client.force_login(self.admin_user)
+        cache.clear()
+
+    def test_city_filter_is_cached(self):
+        """Тестирует, что значения фильтра по городу не запрашиваются повторно."""
+
+        first = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            second = self.client.get(self.url)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertContains(first, "?city=%D0%9A%D0%B0%D0%B7%D0%B0%D0%BD%D1%8C")
+        self.assertFalse(
+            [query for query in context.captured_queries if "DISTINCT" in query["sql"]]
+        )
+
+        response = self.client.get(self.url, {"city": "Казань"})
+        self.assertEqual(response.context["cl"].result_count, 1)
+
+    def test_city_filter_is_invalidated(self):
+        """Тестирует обновление значений фильтра по городу после изменения продавцов."""
+
+        self.client.get(self.url)
+        Seller.objects.create(
+            name="online",
+            seller_type="individual entrepreneur",
+            city="Самара",
+            supplier=self.factory,
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertContains(response, "?city=%D0%A1%D0%B0%D0%BC%D0%B0%D1%80%D0%B0")
+
+        self.factory.city = "Тула"
+        self.factory.save()
+        response = self.client.get(self.url)
+
+        self.assertContains(response, "?city=%D0%A2%D1%83%D0%BB%D0%B0")
+
+    def test_city_filter_kept_on_other_changes(self):
+        """Тестирует, что изменения без смены города не сбрасывают значения фильтра."""
+
+        self.client.get(self.url)
+        adjust_debt(self.factory.pk, Decimal("5.00"))
+        seller = Seller.objects.get(pk=self.factory.pk)
+        seller.name = "factory2"
+        seller.save()
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url)
+
+        self.assertFalse(
+            [query for query in context.captured_queries if "DISTINCT" in query["sql"]]
+        )
+
+    def test_supplier_link(self):
+        """Тестирует ссылку на поставщика в строке покупателя."""
+
+        response = self.client.get(self.url)
+
+        self.assertContains(
+            response,
+            f'<a href="/admin/sellers/seller/{self.factory.pk}/change/">factory</a>',
+            html=True,
+        )
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1000)
+    def test_estimated_count(self):
+        """Тестирует оценку числа строк вместо COUNT(*) выше порога."""
+
+        with patch.object(EstimatedCountPaginator, "get_estimate", return_value=5000):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.url)
+
+        self.assertEqual(response.context["cl"].result_count, 5000)
+        self.assertFalse(
+            [query for query in context.captured_queries if "COUNT(" in query["sql"]]
+        )
+
+        with patch.object(EstimatedCountPaginator, "get_estimate", return_value=10):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.context["cl"].result_count, 2)
+
+    @skipUnless(
+        connection.vendor == "postgresql", "Оценка строк есть только в PostgreSQL"
+    )
+    def test_postgresql_estimate(self):
+        """Тестирует оценку по статистике таблицы и по плану запроса."""
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE sellers_seller")
+
+        self.assertEqual(
+            EstimatedCountPaginator(Seller.objects.all(), 10).get_estimate(), 2
+        )
+        self.assertIsInstance(
+            EstimatedCountPaginator(
+                Seller.objects.filter(city="Москва"), 10
+            ).get_estimate(),
+            int,
+        )
+
+    def test_supplier_autocomplete(self):
+        """Тестирует поиск поставщика виджетом автодополнения."""
+
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "app_label": "sellers",
+                "model_name": "seller",
+                "field_name": "supplier",
+                "term": "fact",
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": str(self.factory.pk), "text": "factory"}],
+        )
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class SellerAsyncViewTestCase(APITestCase):
+    """Класс для тестирования асинхронных представлений продавцов."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        self.user = User.objects.create(email="user@email.com")
+        self.product = Product.objects.create(name="test1", model="1")
+        self.factory = Seller.objects.create(
+            name="factory", seller_type="factory", country="RU", debt="12.50"
+        )
+        self.factory.products.add(self.product)
+        self.sellers = [self.factory] + [
+            Seller.objects.create(
+                name=f"retail {number}",
+                seller_type="retail network",
+                country="KZ",
+                supplier=self.factory,
+            )
+            for number in range(3)
+        ]
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+        self.url = reverse("sellers:seller-async-list")
+        self.client.force_authenticate(user=self.user)
+
+    async def test_list_matches_sync_list(self):
+        """Тестирует совпадение ответа со списком синхронного вьюсета."""
+
+        response = await self.async_client.get(self.url, headers=self.headers)
+        expected = await sync_to_async(self.client.get)(reverse("sellers:seller-list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"], expected.json()["results"])
+
+    async def test_list_pagination_and_filters(self):
+        """Тестирует курсор, ?page_size=, ?fields= и фильтры."""
+
+        response = await self.async_client.get(
+            self.url,
+            {"page_size": 2, "fields": "id,name", "country": "KZ"},
+            headers=self.headers,
+        )
+        data = response.json()
+
+        self.assertEqual(
+            data["results"],
+            [{"id": seller.pk, "name": seller.name} for seller in self.sellers[1:3]],
+        )
+        response = await self.async_client.get(data["next"], headers=self.headers)
+        self.assertEqual(
+            response.json(),
+            {
+                "next": None,
+                "previous": None,
+                "results": [{"id": self.sellers[3].pk, "name": "retail 2"}],
+            },
+        )
+
+        response = await self.async_client.get(
+            self.url, {"trade_network_level": "x"}, headers=self.headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_retrieve(self):
+        """Тестирует детальный просмотр и ответ 404."""
+
+        url = reverse("sellers:seller-async-detail", args=[self.factory.pk])
+        response = await self.async_client.get(url, headers=self.headers)
+        expected = await sync_to_async(self.client.get)(
+            reverse("sellers:seller-detail", args=[self.factory.pk])
+        )
+
+        self.assertEqual(response.json(), expected.json())
+
+        url = reverse("sellers:seller-async-detail", args=[999])
+        response = await self.async_client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_authentication(self):
+        """Тестирует ответ 401 без токена и с неверным токеном."""
+
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", response.headers)
+
+        response = await self.async_client.get(
+            self.url, headers={"Authorization": "Bearer invalid"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(API_CACHE_TIMEOUT=300)
+    async def test_cache_follows_changes(self):
+        """Тестирует сброс кэша асинхронного списка при изменении продавца."""
+
+        await cache.aclear()
+        await self.async_client.get(self.url, headers=self.headers)
+        self.factory.name = "renamed"
+        await self.factory.asave()
+
+        response = await self.async_client.get(self.url, headers=self.headers)
+
+        self.assertEqual(response.json()["results"][0]["name"], "renamed")
+
+
+@override_settings(
+    API_CACHE_TIMEOUT=0,
+    DATABASE_REPLICAS=["default"],
+    DATABASE_ROUTERS=["config.db_routers.ReplicaRouter"],
+    MIDDLEWARE=[*settings.MIDDLEWARE, "config.middleware.ReplicaPinningMiddleware"],
+)
+class ReplicaRoutingTestCase(APITestCase):
+    """Класс для тестирования чтения с реплик."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        self.admin_user = User.objects.create(email="admin@email.com", is_staff=True)
+        self.seller = Seller.objects.create(name="factory", seller_type="factory")
+        self.client.force_authenticate(user=self.admin_user)
+        self.routes = []
+        # реплика в тестах — сама тестовая БД, поэтому запоминаем решения роутера:
+        # "default" — чтение с реплики, None — с основной БД
+        db_for_read = ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            self.routes.append(db_for_read(router, model, **hints))
+            return self.routes[-1]
+
+        patcher = patch.object(ReplicaRouter, "db_for_read", record)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_list_reads_from_replica(self):
+        """Тестирует чтение списка и объекта с реплики."""
+
+        for url in (
+            reverse("sellers:seller-list"),
+            reverse("sellers:seller-detail", args=(self.seller.pk,)),
+            reverse("products:product-list"),
+        ):
+            self.routes.clear()
+            response = self.client.get(url)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn("default", self.routes)
+            self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_write_pins_client_to_primary(self):
+        """Тестирует чтение с основной БД после записи."""
+
+        response = self.client.patch(
+            reverse("sellers:seller-detail", args=(self.seller.pk,)),
+            {"name": "renamed"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.cookies[PIN_COOKIE]["max-age"], settings.DB_REPLICA_PIN_SECONDS
+        )
+        self.assertTrue(cache.get(pin_key(self.admin_user.pk)))
+
+        # тот же пользователь без cookie узнается по отметке в кэше
+        self.client.cookies.clear()
+        self.routes.clear()
+        response = self.client.get(reverse("sellers:seller-list"))
+
+        self.assertEqual(response.json()["results"][0]["name"], "renamed")
+        self.assertNotIn("default", self.routes)
+
+    def test_pin_cookie_reads_from_primary(self):
+        """Тестирует чтение с основной БД по cookie после записи."""
+
+        self.client.cookies[PIN_COOKIE] = "1"
+        response = self.client.get(reverse("sellers:seller-list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("default", self.routes)
+
+    @override_settings(API_CACHE_TIMEOUT=300, API_CONDITIONAL_GET=True)
+    def test_cached_response_reads_from_primary(self):
+        """Тестирует, что кэш и ETag заполняются только данными основной БД."""
+
+        url = reverse("sellers:seller-list")
+        response = self.client.get(url)
+        routes = list(self.routes)
+        self.routes.clear()
+        cached_response = self.client.get(url)
+
+        self.assertNotIn("default", routes)
+        self.assertIn("ETag", response)
+        self.assertEqual(self.routes, [])
+        self.assertEqual(cached_response["ETag"], response["ETag"])
+
+    @override_settings(API_CONDITIONAL_GET=True)
+    def test_replica_response_without_etag(self):
+        """Тестирует, что ответ, прочитанный с реплики, не получает ETag."""
+
+        response = self.client.get(
+            reverse("sellers:seller-detail", args=(self.seller.pk,))
+        )
+
+        self.assertIn("default", self.routes)
+        self.assertNotIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+
+    def test_writes_and_migrations_use_primary(self):
+        """Тестирует запись и миграции только в основной БД."""
+
+        router = ReplicaRouter()
+
+        self.assertEqual(router.db_for_write(Seller), "default")
+        self.assertIsNone(router.db_for_read(Seller))
+        self.assertFalse(router.allow_migrate("default", "sellers"))
+        self.assertIsNone(router.allow_migrate("other", "sellers"))
+
+
+@override_settings(
+    API_CACHE_TIMEOUT=0,
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {
+            "user": "10/min",
+            "ip": None,
+            "list": "2/min",
+            "export": "1/min",
+            "detail": "3/min",
+            "login": "1/min",
+        },
+    },
+)
+class ThrottlingTestCase(APITestCase):
+    """Класс для тестирования ограничения частоты запросов."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        cache.clear()
+        self.user = User.objects.create(email="user@email.com")
+        self.other_user = User.objects.create(email="other@email.com")
+        self.seller = Seller.objects.create(name="factory", seller_type="factory")
+        self.list_url = reverse("sellers:seller-list")
+        self.client.force_authenticate(user=self.user)
+        self.now = 1000.0
+        patcher = patch.object(
+            TokenBucketThrottle, "timer", side_effect=lambda: self.now
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_list_budget_is_separate_from_detail(self):
+        """Тестирует отдельные лимиты списков и запросов объекта."""
+
+        for _ in range(2):
+            self.assertEqual(self.client.get(self.list_url).status_code, 200)
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "30")
+
+        response = self.client.get(
+            reverse("sellers:seller-detail", args=(self.seller.pk,))
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # лимит считается для каждого пользователя отдельно
+        self.client.force_authenticate(user=self.other_user)
+
+        self.assertEqual(self.client.get(self.list_url).status_code, 200)
+
+    def test_bucket_refills_over_time(self):
+        """Тестирует пополнение корзины токенов."""
+
+        self.assertEqual(
+            self.client.get(reverse("sellers:seller-export")).status_code, 200
+        )
+        self.assertEqual(
+            self.client.get(reverse("sellers:seller-export")).status_code, 429
+        )
+
+        self.now += 59
+        response = self.client.get(reverse("sellers:seller-export"))
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "1")
+
+        self.now += 1
+
+        self.assertEqual(
+            self.client.get(reverse("sellers:seller-export")).status_code, 200
+        )
+
+    def test_user_budget_covers_all_endpoints(self):
+        """Тестирует общий лимит пользователя на все эндпоинты."""
+
+        detail_url = reverse("sellers:seller-detail", args=(self.seller.pk,))
+        rates = {"user": "3/min", "list": "100/min", "detail": "100/min"}
+        with override_settings(
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}
+        ):
+            statuses = [
+                self.client.get(url).status_code
+                for url in (detail_url, self.list_url, detail_url, self.list_url)
+            ]
+
+        self.assertEqual(statuses, [200, 200, 200, 429])
+
+    async def test_async_views_and_login_are_throttled(self):
+        """Тестирует лимиты асинхронных представлений и входа."""
+
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+        url = reverse("sellers:seller-async-list")
+        for _ in range(2):
+            response = await self.async_client.get(url, headers=headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = await self.async_client.get(url, headers=headers)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "30")
+
+        login = reverse("users:login")
+        data = {"email": "user@email.com", "password": "wrong"}
+        response = await self.async_client.post(login, data)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = await self.async_client.post(login, data)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "60")
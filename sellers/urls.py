@@ -1,12 +1,18 @@
-from rest_framework.routers import SimpleRouter
+from django.urls import path
 
 from sellers.apps import SellersConfig
+from sellers.async_views import SellerAsyncView
+from sellers.routers import BulkRouter
 from sellers.views import SellerViewSet
 
 app_name = SellersConfig.name
 
-router = SimpleRouter()
+router = BulkRouter()
 router.register("", SellerViewSet)
 
-urlpatterns = []
+# асинхронные list и retrieve для ASGI стоят перед маршрутами вьюсета
+urlpatterns = [
+    path("async/", SellerAsyncView.as_view(), name="seller-async-list"),
+    path("async/<int:pk>/", SellerAsyncView.as_view(), name="seller-async-detail"),
+]
 urlpatterns += router.urls
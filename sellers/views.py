@@ -1,19 +1,258 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
-from sellers.models import Seller
-from sellers.serializers import SellerSerializer, SellerUpdateSerializer
+from config.cache import CachedResponseMixin, ConditionalGetMixin
+from config.db_routers import ReplicaReadMixin
+from config.sparse_fields import SparseFieldsetViewMixin
+from config.values_list import ValuesListMixin
+from products.models import Product
+from sellers.debts import adjust_debt, enqueue_debt_adjustments
+from sellers.export import EXPORT_CONTENT_TYPES, EXPORT_FORMATS, iter_export
+from sellers.filters import SellerDebtRollupFilter, SellerRollupFilter
+from sellers.models import ROLLUP_GROUPS, DebtAdjustment, Seller, SellerDebtRollup
+from sellers.paginators import (
+    DebtAdjustmentCursorPagination,
+    SellerCursorPagination,
+    SellerDescendantsCursorPagination,
+)
+from sellers.serializers import (
+    DebtAdjustmentQueueSerializer,
+    DebtAdjustmentSerializer,
+    SellerDebtRollupSerializer,
+    SellerSerializer,
+    SellerUpdateSerializer,
+)
 
 
-class SellerViewSet(ModelViewSet):
+class SellerViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    SparseFieldsetViewMixin,
+    ValuesListMixin,
+    ModelViewSet,
+):
     """Вьюсет для модели продавца."""
 
     queryset = Seller.objects.all()
     serializer_class = SellerSerializer
-    filter_backends = [DjangoFilterBackend]
-    filterset_fields = ("country",)
+    pagination_class = SellerCursorPagination
+    prefetch_fields = (
+        Prefetch("products", queryset=Product.objects.only("id").order_by("pk")),
+    )
+    always_loaded_fields = ("id", "created_at")
+    cache_namespace = "sellers"
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ("country", "trade_network_level")
+    ordering_fields = ("trade_network_level",)
+    replica_actions = ("list", "retrieve", "export", "rollup")
+    throttle_scopes = {
+        "list": "list",
+        "descendants": "list",
+        "ancestors": "list",
+        "rollup": "list",
+        "export": "export",
+    }
 
     def get_serializer_class(self):
-        if self.action in ["update", "partial_update"]:
+        if self.action in ["update", "partial_update", "bulk_partial_update"]:
             return SellerUpdateSerializer
         return self.serializer_class
+
+    def create(self, request, *args, **kwargs):
+        """Создает одного продавца или пакет продавцов, если передан список."""
+
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=settings.SELLERS_BULK_BATCH_SIZE
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def bulk_partial_update(self, request, *args, **kwargs):
+        """Частично обновляет пакет продавцов: PATCH /sellers/ со списком объектов с id."""
+
+        if not isinstance(request.data, list):
+            raise ValidationError({"non_field_errors": ["Ожидался список объектов."]})
+
+        ids = [item.get("id") for item in request.data if isinstance(item, dict)]
+        sellers = Seller.objects.filter(pk__in=[pk for pk in ids if str(pk).isdigit()])
+        serializer = self.get_serializer(
+            sellers,
+            data=request.data,
+            many=True,
+            partial=True,
+            max_length=settings.SELLERS_BULK_BATCH_SIZE,
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+
+    def get_max_depth(self):
+        """Возвращает ограничение глубины обхода из параметра ?depth=."""
+
+        depth = self.request.query_params.get("depth")
+        if depth is None:
+            return None
+        if not depth.isdigit() or int(depth) < 1:
+            raise ValidationError({"depth": "Укажите целое число больше нуля."})
+        return int(depth)
+
+    @action(detail=True)
+    def descendants(self, request, pk=None):
+        """Возвращает покупателей продавца по всей цепочке поставок."""
+
+        return self.cached_response(self.list_descendants, request)
+
+    def list_descendants(self, request):
+        seller = self.get_object()
+        queryset = self.filter_queryset(
+            self.get_queryset().descendants(seller, self.get_max_depth())
+        )
+        paginator = SellerDescendantsCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True)
+    def ancestors(self, request, pk=None):
+        """Возвращает поставщиков продавца вплоть до завода."""
+
+        return self.cached_response(self.list_ancestors, request)
+
+    def list_ancestors(self, request):
+        seller = self.get_object()
+        queryset = self.filter_queryset(
+            self.get_queryset().ancestors(seller, self.get_max_depth())
+        )
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    def get_rollup_groups(self):
+        """Возвращает разрезы сводки из параметра ?group_by=."""
+
+        group_by = self.request.query_params.get("group_by")
+        if not group_by:
+            return ROLLUP_GROUPS
+        groups = tuple(name.strip() for name in group_by.split(",") if name.strip())
+        if not groups or set(groups) - set(ROLLUP_GROUPS):
+            raise ValidationError(
+                {"group_by": f"Допустимые разрезы: {', '.join(ROLLUP_GROUPS)}."}
+            )
+        return groups
+
+    @action(detail=False)
+    def rollup(self, request):
+        """Возвращает задолженность, число продавцов и продуктов по заводу, уровню и стране."""
+
+        return self.cached_response(self.list_rollup, request)
+
+    def list_rollup(self, request):
+        groups = self.get_rollup_groups()
+        if settings.SELLERS_DEBT_ROLLUP_TABLE:
+            filterset = SellerDebtRollupFilter(
+                request.query_params, SellerDebtRollup.objects.all()
+            )
+        else:
+            filterset = SellerRollupFilter(request.query_params, Seller.objects.all())
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+
+        if settings.SELLERS_DEBT_ROLLUP_TABLE:
+            rows = filterset.qs.regroup(groups)
+        else:
+            rows = filterset.qs.debt_rollup(groups)
+        return Response(SellerDebtRollupSerializer(rows, many=True).data)
+
+    @action(detail=True, methods=["get", "post"], url_path="debt-adjustments")
+    def debt_adjustments(self, request, pk=None):
+        """
+        Журнал изменений задолженности продавца (GET) или новое изменение (POST).
+
+        POST сразу применяет сумму amount одним атомарным UPDATE: параллельные
+        изменения не теряются, а уход задолженности в минус отклоняется.
+        """
+
+        if request.method == "GET":
+            return self.cached_response(self.list_debt_adjustments, request)
+
+        seller = self.get_object()
+        serializer = DebtAdjustmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            adjustment = adjust_debt(
+                seller.pk, user=request.user, **serializer.validated_data
+            )
+        except Seller.DoesNotExist:
+            raise NotFound
+        except DjangoValidationError as error:
+            raise ValidationError(error.message_dict)
+        data = DebtAdjustmentSerializer(adjustment).data
+        data["debt"] = str(
+            Seller.objects.filter(pk=adjustment.seller_id)
+            .values_list("debt", flat=True)
+            .get()
+        )
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    def list_debt_adjustments(self, request):
+        seller = self.get_object()
+        queryset = DebtAdjustment.objects.filter(seller=seller)
+        paginator = DebtAdjustmentCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = DebtAdjustmentSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=["post"], url_path="debt-adjustments")
+    def queue_debt_adjustments(self, request):
+        """
+        Ставит пакет изменений задолженности в очередь.
+
+        Изменения применяет команда apply_debt_adjustments. Повторы уже известных
+        изменений пропускаются, а external_id, занятый изменением другого продавца
+        или на другую сумму, отклоняет весь пакет.
+        """
+
+        serializer = DebtAdjustmentQueueSerializer(
+            data=request.data,
+            many=True,
+            max_length=settings.SELLERS_BULK_BATCH_SIZE,
+        )
+        serializer.is_valid(raise_exception=True)
+        enqueue_debt_adjustments(serializer.validated_data, user=request.user)
+        return Response(
+            {"queued": len(serializer.validated_data)},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @action(detail=False)
+    def export(self, request):
+        """Потоково выгружает продавцов в NDJSON или CSV (?export_format=csv)."""
+
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError(
+                {"export_format": f"Допустимые форматы: {', '.join(EXPORT_FORMATS)}."}
+            )
+
+        queryset = self.filter_queryset(Seller.objects.all())
+        response = StreamingHttpResponse(
+            iter_export(queryset, export_format),
+            content_type=EXPORT_CONTENT_TYPES[export_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="sellers.{export_format}"'
+        )
+        return response
@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from users.tokens import USER_CLAIMS
+
+
+class UserCache:
+    """
+    LRU-кэш пользователей процесса на JWT_USER_CACHE_TIMEOUT секунд.
+
+    Хранит не больше JWT_USER_CACHE_SIZE записей. Ключ — id пользователя и флаги
+    из токена, поэтому токен с новыми флагами не получит старого пользователя.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        if not settings.JWT_USER_CACHE_TIMEOUT:
+            return
+        with self._lock:
+            self._entries[key] = (
+                time.monotonic() + settings.JWT_USER_CACHE_TIMEOUT,
+                user,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.JWT_USER_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без запроса пользователя к БД.
+
+    Если в токене есть флаги USER_CLAIMS (токены от UserTokenObtainPairSerializer),
+    пользователь строится из подписанных флагов: остальные поля отложены
+    и читаются из БД только при обращении к ним. Пользователь из токена без
+    флагов читается из БД. Оба варианта хранятся в user_cache, записи
+    пользователя удаляются из кэша при его сохранении.
+    """
+
+    def get_user(self, validated_token):
+        key = self.get_cache_key(validated_token)
+        user = user_cache.get(key)
+        if user is None:
+            user = self.user_from_claims(key)
+            if user is None:
+                user = self.load_user(key[0])
+            user_cache.set(key, user)
+        return self.check_user(user)
+
+    def get_cache_key(self, validated_token):
+        try:
+            user_id = str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        if all(claim in validated_token for claim in USER_CLAIMS):
+            return user_id, tuple(bool(validated_token[claim]) for claim in USER_CLAIMS)
+        return user_id, None
+
+    def user_from_claims(self, key):
+        user_id, claims = key
+        if claims is None:
+            return None
+        id_field = self.user_model._meta.get_field(api_settings.USER_ID_FIELD)
+        values = {id_field.attname: id_field.to_python(user_id)}
+        values.update(zip(USER_CLAIMS, claims))
+        # from_db ожидает значения в порядке полей модели
+        field_names = [
+            field.attname
+            for field in self.user_model._meta.concrete_fields
+            if field.attname in values
+        ]
+        return self.user_model.from_db(
+            DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names]
+        )
+
+    def load_user(self, user_id):
+        try:
+            return self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            ) from e
+
+    @staticmethod
+    def check_user(user):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT-аутентификация для асинхронных представлений.
+
+    Заголовок и подпись токена проверяются как в JWTAuthentication, а пользователь
+    берется как в CachedJWTAuthentication; при промахе кэша без флагов в токене
+    он читается асинхронным aget, поэтому запрос не занимает поток.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        key = self.get_cache_key(validated_token)
+        user = user_cache.get(key)
+        if user is None:
+            user = self.user_from_claims(key)
+            if user is None:
+                user = await self.aload_user(key[0])
+            user_cache.set(key, user)
+        return self.check_user(user)
+
+    async def aload_user(self, user_id):
+        try:
+            return await self.user_model.objects.aget(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            ) from e
@@ -0,0 +1,108 @@
+import asyncio
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from config.benchmark import BENCHMARK_EMAIL, BENCHMARK_PASSWORD, percentile
+from users.models import User
+
+
+def build_scenarios(user):
+    """Возвращает сценарий входа по JWT пользователя замера."""
+
+    login = reverse("users:login")
+    return {
+        "users.login": (
+            lambda: APIClient().post(
+                login,
+                {"email": user.email, "password": BENCHMARK_PASSWORD},
+                format="json",
+            ),
+            200,
+        ),
+    }
+
+
+async def run_logins(email, password, concurrency=50, requests=500):
+    """
+    Выполняет requests входов через /users/login/ из concurrency задач.
+
+    Запросы проходят через ASGI-обработчик тестового клиента в текущем цикле
+    событий, поэтому замер показывает, сколько входов в секунду выдерживает
+    процесс с пулом хеширования PASSWORD_HASH_WORKERS.
+    """
+
+    client = AsyncClient()
+    url = reverse("users:login")
+    payload = {"email": email, "password": password}
+    remaining = iter(range(requests))
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.post(url, payload, content_type="application/json")
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "logins_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "errors": errors,
+    }
+
+
+def compare_password_hashers(concurrency=50, requests=500, hashes=5):
+    """
+    Сравнивает время хеширования и пропускную способность входа для PASSWORD_HASHERS.
+
+    Для каждого алгоритма пароль пользователя замера хешируется им же, затем
+    выполняется run_logins. Алгоритмы без установленной библиотеки пропускаются
+    с описанием ошибки.
+    """
+
+    results = {}
+    for path in settings.PASSWORD_HASHERS:
+        # лимит входов с одного адреса сделал бы замер бессмысленным
+        with override_settings(
+            PASSWORD_HASHERS=[path],
+            REST_FRAMEWORK={
+                **settings.REST_FRAMEWORK,
+                "DEFAULT_THROTTLE_CLASSES": [],
+            },
+        ):
+            hasher = get_hasher()
+            try:
+                if hasher.library:
+                    hasher._load_library()
+            except ValueError as error:
+                results[hasher.algorithm] = {"error": str(error)}
+                continue
+
+            durations = []
+            for _ in range(hashes):
+                started = time.perf_counter()
+                encoded = make_password(BENCHMARK_PASSWORD)
+                durations.append((time.perf_counter() - started) * 1000)
+            user, _ = User.objects.update_or_create(
+                email=BENCHMARK_EMAIL, defaults={"password": encoded}
+            )
+            results[hasher.algorithm] = {
+                "hash_ms": round(statistics.median(durations), 3),
+                **asyncio.run(
+                    run_logins(user.email, BENCHMARK_PASSWORD, concurrency, requests)
+                ),
+            }
+    return results
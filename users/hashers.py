@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    BCryptSHA256PasswordHasher,
+    PBKDF2PasswordHasher,
+)
+from django.db import close_old_connections
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 с числом итераций PASSWORD_PBKDF2_ITERATIONS."""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2 со стоимостью из PASSWORD_ARGON2_* (нужен пакет argon2-cffi)."""
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class TunedBCryptSHA256PasswordHasher(BCryptSHA256PasswordHasher):
+    """bcrypt с числом раундов PASSWORD_BCRYPT_ROUNDS (нужен пакет bcrypt)."""
+
+    @property
+    def rounds(self):
+        return settings.PASSWORD_BCRYPT_ROUNDS
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hash_executor():
+    """Возвращает пул потоков для хеширования паролей, создавая его при первом входе."""
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+        return _executor
+
+
+def _call_in_thread(func, *args):
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+async def run_hashing(func, *args):
+    """
+    Выполняет хеширование в пуле из PASSWORD_HASH_WORKERS потоков.
+
+    Цикл событий ASGI не блокируется, а число одновременно хешируемых паролей
+    в процессе ограничено, поэтому волна входов не занимает все ядра.
+    """
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_hash_executor(), partial(_call_in_thread, func, *args)
+    )
@@ -0,0 +1,34 @@
+import json
+
+from django.core.management import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from users.benchmark import compare_password_hashers
+
+
+class Command(BaseCommand):
+    """
+    Команда для сравнения алгоритмов хеширования паролей по скорости входа.
+
+    Для каждого алгоритма из PASSWORD_HASHERS с текущими настройками стоимости
+    выводит время одного хеширования и число входов в секунду через
+    /users/login/. Замер выполняется в отдельной тестовой БД.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=500)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0)
+        try:
+            results = compare_password_hashers(
+                options["concurrency"], options["requests"]
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
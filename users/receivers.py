@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.authentication import user_cache
+from users.models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_cached_user(sender, instance, **kwargs):
+    """Убирает измененного пользователя из кэша аутентификации процесса."""
+
+    user_cache.evict(instance.pk)
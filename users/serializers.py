@@ -1,9 +1,33 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
 
 from users.models import User
+from users.tokens import UserRefreshToken
 
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = "__all__"
+
+
+class LoginSerializer(serializers.Serializer):
+    """Почта и пароль для AsyncLoginView."""
+
+    email = serializers.CharField()
+    password = serializers.CharField(trim_whitespace=False)
+
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Выдача токенов с флагами пользователя для CachedJWTAuthentication."""
+
+    token_class = UserRefreshToken
+
+
+class UserTokenRefreshSerializer(TokenRefreshSerializer):
+    """Обновление access-токена с актуальными флагами пользователя."""
+
+    token_class = UserRefreshToken
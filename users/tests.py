@@ -0,0 +1,246 @@
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.serializers import TokenObtainSerializer
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.nplusone import assert_queries_do_not_grow
+from users.authentication import user_cache
+from users.benchmark import run_logins
+from users.models import User
+from users.tokens import UserRefreshToken
+
+
+class UserAdminTestCase(APITestCase):
+    """Класс для проверки списка пользователей в админке."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        self.admin_user = User.objects.create(
+            email="admin@email.com", is_staff=True, is_superuser=True
+        )
+
+    def test_user_admin_changelist_queries_do_not_grow(self):
+        """Тестирует, что число запросов списка в админке не зависит от размера."""
+
+        self.client.force_login(self.admin_user)
+        url = reverse("admin:users_user_changelist")
+
+        def add_users():
+            User.objects.bulk_create(
+                User(email=f"user{number}@email.com") for number in range(10)
+            )
+
+        assert_queries_do_not_grow(lambda: self.client.get(url), add_users)
+
+
+class CachedJWTAuthenticationTestCase(APITestCase):
+    """Класс для тестирования JWT-аутентификации без запроса пользователя."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        self.user = User.objects.create(email="user@email.com")
+        self.user.set_password("password")
+        self.user.save()
+        self.url = reverse("sellers:seller-list")
+        user_cache.clear()
+
+    def get_user_queries(self, token):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.url, headers={"Authorization": f"Bearer {token}"}
+            )
+        return response, [
+            query["sql"] for query in queries if '"users_user"' in query["sql"]
+        ]
+
+    def test_login_token_contains_user_claims(self):
+        """Тестирует флаги пользователя в токене и запрос без чтения пользователя."""
+
+        response = self.client.post(
+            reverse("users:login"),
+            {"email": "user@email.com", "password": "password"},
+        )
+        access = AccessToken(response.json()["access"])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIs(access["is_active"], True)
+        self.assertIs(access["is_staff"], False)
+
+        response, queries = self.get_user_queries(access)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, [])
+
+    def test_token_without_claims_is_cached_until_user_saved(self):
+        """Тестирует кэш пользователя для токена без флагов и его сброс."""
+
+        token = AccessToken.for_user(self.user)
+
+        self.assertEqual(len(self.get_user_queries(token)[1]), 1)
+        self.assertEqual(self.get_user_queries(token)[1], [])
+
+        self.user.is_active = False
+        self.user.save()
+        response, queries = self.get_user_queries(token)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(len(queries), 1)
+
+    def test_inactive_claim_is_rejected(self):
+        """Тестирует отказ по флагу is_active из токена."""
+
+        token = UserRefreshToken.for_user(self.user).access_token
+        token["is_active"] = False
+        response, queries = self.get_user_queries(token)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(queries, [])
+
+    def test_refresh_updates_user_claims(self):
+        """Тестирует актуальные флаги в access-токене после обновления."""
+
+        refresh = UserRefreshToken.for_user(self.user)
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        response = self.client.post(
+            reverse("users:token_refresh"), {"refresh": str(refresh)}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIs(AccessToken(response.json()["access"])["is_staff"], True)
+
+    def test_deferred_fields_are_loaded_on_access(self):
+        """Тестирует чтение полей пользователя, которых нет в токене."""
+
+        token = UserRefreshToken.for_user(self.user).access_token
+        response, _ = self.get_user_queries(token)
+        user = response.wsgi_request.user
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.email, "user@email.com")
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class PasswordHashingTestCase(APITestCase):
+    """Класс для тестирования регистрации и входа с хешированием паролей."""
+
+    def setUp(self):
+        """Метод для заполнения первичных данных."""
+
+        self.user = User.objects.create(email="user@email.com")
+        self.user.set_password("password")
+        self.user.save()
+        self.url = reverse("users:login")
+
+    def test_register_writes_user_once(self):
+        """Тестирует создание пользователя одним запросом на запись."""
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("users:register"),
+                {"email": "new@email.com", "password": "new-password"},
+            )
+        writes = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith(("INSERT", "UPDATE"))
+        ]
+        user = User.objects.get(email="new@email.com")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(user.is_active)
+        self.assertTrue(user.check_password("new-password"))
+
+    def test_login(self):
+        """Тестирует выдачу токенов асинхронным входом."""
+
+        response = self.client.post(
+            self.url,
+            {"email": "user@email.com", "password": "password"},
+            format="json",
+        )
+        data = response.json()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(data["access"])["user_id"], str(self.user.pk))
+        self.assertIn("refresh", data)
+
+    def test_login_errors(self):
+        """Тестирует ответы входа с неверными данными."""
+
+        for data in (
+            {"email": "user@email.com", "password": "wrong"},
+            {"email": "missing@email.com", "password": "password"},
+        ):
+            response = self.client.post(self.url, data, format="json")
+
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertEqual(
+                response.json()["detail"],
+                TokenObtainSerializer.default_error_messages["no_active_account"],
+            )
+            self.assertEqual(response["WWW-Authenticate"], 'Bearer realm="api"')
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.post(
+            self.url, {"email": "user@email.com", "password": "password"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post(self.url, {"email": "user@email.com"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("password", response.json())
+
+        response = self.client.post(self.url, "{", content_type="application/json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=2000)
+    def test_login_rehashes_password(self):
+        """Тестирует перехеширование пароля с новой стоимостью при входе."""
+
+        response = self.client.post(
+            self.url, {"email": "user@email.com", "password": "password"}
+        )
+        self.user.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.user.password.split("$")[1], "2000")
+        self.assertTrue(self.user.check_password("password"))
+
+    def test_hasher_is_chosen_by_settings(self):
+        """Тестирует выбор алгоритма и стоимости хеширования из настроек."""
+
+        self.assertEqual(get_hasher().algorithm, "pbkdf2_sha256")
+        self.assertEqual(self.user.password.split("$")[1], "1000")
+        self.assertEqual(
+            settings.PASSWORD_HASHERS[0], "users.hashers.TunedPBKDF2PasswordHasher"
+        )
+
+
+class LoginBenchmarkTestCase(TestCase):
+    """Класс для проверки замера входа."""
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+    async def test_run_logins(self):
+        """Тестирует замер пропускной способности входа."""
+
+        user = await User.objects.acreate(email="login@email.com")
+        user.set_password("password")
+        await user.asave()
+
+        results = await run_logins(user.email, "password", concurrency=3, requests=6)
+
+        self.assertEqual(results["errors"], 0)
+        self.assertGreater(results["logins_per_second"], 0)
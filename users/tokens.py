@@ -0,0 +1,46 @@
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import User
+
+# Флаги пользователя, которые подписываются в токене и проверяются без запроса к БД
+USER_CLAIMS = ("is_active", "is_staff")
+
+
+def set_user_claims(token, user):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+
+
+class UserRefreshToken(RefreshToken):
+    """
+    Refresh-токен с флагами пользователя USER_CLAIMS.
+
+    Флаги каждого access-токена, выпущенного по сохраненному refresh-токену,
+    заново читаются из БД, поэтому изменения is_active и is_staff вступают
+    в силу не позже истечения текущего access-токена (ACCESS_TOKEN_LIFETIME).
+    """
+
+    _user = None
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        set_user_claims(token, user)
+        # при входе пользователь уже загружен, повторно читать его не нужно
+        token._user = user
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user = self._user or (
+            User.objects.filter(
+                **{api_settings.USER_ID_FIELD: self[api_settings.USER_ID_CLAIM]}
+            )
+            .only(*USER_CLAIMS)
+            .first()
+        )
+        if user is not None:
+            set_user_claims(access, user)
+        return access
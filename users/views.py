@@ -1,8 +1,23 @@
+from io import BytesIO
+
+from django.contrib.auth.hashers import make_password, verify_password
+from django.utils import timezone
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
 from rest_framework.generics import CreateAPIView
 from rest_framework.permissions import AllowAny
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainSerializer
+from rest_framework_simplejwt.settings import api_settings
 
+from config.async_views import AsyncReadOnlyView
+from config.parsers import OrjsonParser
+from config.throttling import acheck_throttles
+from users.hashers import run_hashing
 from users.models import User
-from users.serializers import UserSerializer
+from users.serializers import LoginSerializer, UserSerializer
+from users.tokens import UserRefreshToken
 
 
 class UserCreateAPIView(CreateAPIView):
@@ -13,6 +28,82 @@ class UserCreateAPIView(CreateAPIView):
     permission_classes = (AllowAny,)
 
     def perform_create(self, serializer):
-        user = serializer.save(is_active=True)
-        user.set_password(user.password)
-        user.save()
\ No newline at end of file
+        # хешируем пароль до сохранения, чтобы создать пользователя одним INSERT
+        serializer.save(
+            is_active=True,
+            password=make_password(serializer.validated_data["password"]),
+        )
+
+
+class AsyncLoginView(View):
+    """
+    Выдача пары JWT по почте и паролю без блокировки цикла событий ASGI.
+
+    Ответы совпадают с TokenObtainPairView. Пользователь читается асинхронным
+    ORM, а проверка и перехеширование пароля выполняются в ограниченном пуле
+    потоков run_hashing.
+    """
+
+    http_method_names = ["post", "options"]
+    action = "login"
+    throttle_scopes = {"login": "login"}
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def post(self, request):
+        try:
+            await acheck_throttles(request, self)
+            user = await self.authenticate(self.parse(request))
+        except exceptions.APIException as error:
+            response = AsyncReadOnlyView.render_exception(error)
+            if isinstance(error, exceptions.AuthenticationFailed):
+                response["WWW-Authenticate"] = (
+                    f'{api_settings.AUTH_HEADER_TYPES[0]} realm="api"'
+                )
+            return response
+
+        refresh = UserRefreshToken.for_user(user)
+        return AsyncReadOnlyView.render(
+            {"refresh": str(refresh), "access": str(refresh.access_token)}
+        )
+
+    @staticmethod
+    def parse(request):
+        if request.content_type == "application/json":
+            return OrjsonParser().parse(BytesIO(request.body))
+        return request.POST
+
+    async def authenticate(self, data):
+        serializer = LoginSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        password = serializer.validated_data["password"]
+
+        user = await User.objects.filter(
+            **{User.USERNAME_FIELD: serializer.validated_data[User.USERNAME_FIELD]}
+        ).afirst()
+        if user is None:
+            # как ModelBackend: хешируем пароль и для несуществующей почты,
+            # чтобы по времени ответа нельзя было подобрать почты пользователей
+            await run_hashing(make_password, password)
+        else:
+            is_correct, must_update = await run_hashing(
+                verify_password, password, user.password
+            )
+            if is_correct and must_update:
+                user.password = await run_hashing(make_password, password)
+                await user.asave(update_fields=["password"])
+            if not is_correct:
+                user = None
+
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                TokenObtainSerializer.default_error_messages["no_active_account"],
+                "no_active_account",
+            )
+
+        if api_settings.UPDATE_LAST_LOGIN:
+            user.last_login = timezone.now()
+            await user.asave(update_fields=["last_login"])
+        return user